@@ -0,0 +1,615 @@
+#!/usr/bin/env python3
+
+"""Arayüzsüz (headless) komut satırı giriş noktası.
+
+Örnek::
+
+    python -m app.cli process ./gelen --output ./cikti --user-id UID
+    python -m app.cli process manifest.jsonl --workers 4 --summary ozet.json
+    python -m app.cli watch ./tethering --output ./cikti --user-id UID
+    python -m app.cli serve --host 0.0.0.0 --port 8765 --spool ./spool --token GIZLI
+    python -m app.cli queue add ./gelen --priority 5 && python -m app.cli queue work --drain
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, TextIO, Tuple
+
+from app.logger import logger
+from app.services.autotuner import ConcurrencyTuner
+from app.services.credit_service import credit_service
+from app.services.engine_pool import EnginePool, default_worker_count
+from app.services.face_precheck import face_precheck
+from app.services.hot_folder import DEFAULT_SETTLE_SECONDS, HotFolderWatcher, mirror_output_path
+from app.services.http_service import DEFAULT_MAX_QUEUED, DEFAULT_PORT, serve
+from app.services.input_buffer import InputBuffer
+from app.services.job_queue import (
+    DEFAULT_LEASE_SECONDS,
+    DEFAULT_MAX_ATTEMPTS,
+    STATE_FAILED,
+    JobQueue,
+    QueuedJob,
+    new_worker_id,
+)
+from app.services.memory_governor import estimate_job_bytes, memory_governor
+from app.services.photo_processor import PhotoJob, PhotoProcessingError
+from app.utils.file_validation import ALLOWED_EXTENSIONS, validate_image_file
+
+EXIT_OK = 0
+EXIT_FAILURES = 1
+EXIT_USAGE = 2
+# Süren işlerin kirası dolmadan bu aralıkla yenilenir
+LEASE_HEARTBEAT_SECONDS = DEFAULT_LEASE_SECONDS / 3
+
+
+def _emit(stream: TextIO, event: Dict[str, Any]) -> None:
+    stream.write(json.dumps(event, ensure_ascii=False) + "\n")
+    stream.flush()
+
+
+def _precheck_input(path: Path) -> Tuple[Optional[InputBuffer], str]:
+    """Kredi düşülmeden önce umutsuz girdiyi eler; geçerse tamponu ve boş ret nedenini döner."""
+    is_valid, message = validate_image_file(path)
+    if not is_valid:
+        return None, message
+    try:
+        input_buffer = InputBuffer.load(path)
+    except OSError as exc:
+        return None, f"Dosya okunamadı: {exc}"
+    result = face_precheck.check(input_buffer)
+    return (input_buffer, "") if result.ok else (None, result.reason)
+
+
+def _failure_message(exc: Exception) -> str:
+    return str(exc) if isinstance(exc, PhotoProcessingError) else f"{type(exc).__name__}: {exc}"
+
+
+def _manifest_rows(path: Path) -> Iterator[Dict[str, Any]]:
+    if path.suffix.lower() == ".csv":
+        with open(path, newline="", encoding="utf-8-sig") as handle:
+            yield from csv.DictReader(handle)
+        return
+    with open(path, encoding="utf-8") as handle:
+        for line in handle:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def load_jobs(source: Path, photo_type: str, layout_type: str, output_dir: Optional[Path],
+              output_profile: Optional[str]) -> List[PhotoJob]:
+    """Dizinden veya CSV/JSONL manifestinden iş listesi oluşturur.
+
+    Manifest satırları ``input`` alanını zorunlu, ``photo_type``,
+    ``layout_type``, ``output`` ve ``profile`` alanlarını isteğe bağlı tutar.
+    Göreli yollar manifest dosyasının dizinine göre çözülür.
+    """
+    jobs: List[PhotoJob] = []
+    if source.is_dir():
+        for path in sorted(source.iterdir()):
+            if path.is_file() and path.suffix.lower() in ALLOWED_EXTENSIONS:
+                jobs.append(PhotoJob(path, photo_type, layout_type, output_profile=output_profile))
+    else:
+        base_dir = source.parent
+        for row in _manifest_rows(source):
+            input_value = row.get("input") or row.get("input_path")
+            if not input_value:
+                raise ValueError(f"Manifest satırında 'input' alanı yok: {row}")
+            input_path = Path(input_value)
+            output_value = row.get("output") or row.get("output_path")
+            jobs.append(
+                PhotoJob(
+                    input_path=input_path if input_path.is_absolute() else base_dir / input_path,
+                    photo_type=row.get("photo_type") or photo_type,
+                    layout_type=row.get("layout_type") or layout_type,
+                    output_path=Path(output_value) if output_value else None,
+                    output_profile=row.get("profile") or output_profile,
+                )
+            )
+
+    if output_dir is not None:
+        for job in jobs:
+            if job.output_path is not None and not Path(job.output_path).is_absolute():
+                job.output_path = output_dir / job.output_path
+    return jobs
+
+
+def run_batch(
+    jobs: Sequence[PhotoJob],
+    user_id: str,
+    workers: Optional[int],
+    output_dir: Optional[Path],
+    stream: TextIO,
+) -> Dict[str, Any]:
+    """İşleri süreç havuzunda çalıştırır, ilerlemeyi JSON satırları olarak yazar.
+
+    ``workers`` verilmezse eşzamanlılık ``ConcurrencyTuner`` ile ölçülerek
+    ayarlanır.
+    """
+    tuner = ConcurrencyTuner(default_worker_count()) if not workers else None
+    pool_size = workers or tuner.max_limit
+    started = time.perf_counter()
+    total = len(jobs)
+    succeeded = 0
+    failures: List[Dict[str, str]] = []
+    skipped = 0
+    credits_left: Optional[int] = None
+    stop_reason = ""
+
+    _emit(stream, {"event": "start", "total": total, "workers": pool_size, "autotune": tuner is not None})
+
+    def _fail(job: PhotoJob, message: str) -> None:
+        failures.append({"input": str(job.input_path), "error": message})
+        _emit(stream, {"event": "job", "status": "failed", "input": str(job.input_path), "error": message})
+
+    with EnginePool(max_workers=pool_size, base_output_dir=output_dir) as pool:
+        in_flight: Dict[Future, PhotoJob] = {}
+        reserved: Dict[Future, int] = {}
+        queue = list(jobs)
+        queue.reverse()
+
+        def _max_in_flight() -> int:
+            # Sabit sayıda süreçler boş kalmasın diye iki katı kuyruğa alınır;
+            # ayarlayıcı kullanılırken sınır doğrudan eşzamanlı motor sayısıdır
+            return tuner.limit if tuner else pool_size * 2
+
+        # Kredi, iş havuza girmeden hemen önce düşülür; sıra boyunca hepsi peşin alınmaz
+        while queue or in_flight:
+            while queue and len(in_flight) < _max_in_flight() and not stop_reason:
+                job = queue.pop()
+                input_buffer, rejection = _precheck_input(Path(job.input_path))
+                if rejection:
+                    _fail(job, rejection)
+                    continue
+                # Bellek bütçesi dolduysa yeni iş, çalışanlardan biri bitene kadar bekler;
+                # boyut ön kontrolde okunan başlıktan alınır, dosya yeniden açılmaz
+                job_bytes = estimate_job_bytes(input_buffer, job.photo_type)
+                input_buffer = None
+                if not memory_governor.try_reserve(job_bytes):
+                    queue.append(job)
+                    break
+                success, new_credits, message = credit_service.use_credit(user_id)
+                if not success:
+                    memory_governor.release(job_bytes)
+                    stop_reason = message or "Yetersiz kredi"
+                    queue.append(job)
+                    break
+                credits_left = new_credits
+                future = pool.submit(job)
+                in_flight[future] = job
+                reserved[future] = job_bytes
+
+            if stop_reason and queue:
+                skipped += len(queue)
+                queue.clear()
+            if not in_flight:
+                continue
+
+            done, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+            for future in done:
+                job = in_flight.pop(future)
+                memory_governor.release(reserved.pop(future))
+                if tuner:
+                    tuner.record()
+                try:
+                    result = future.result()
+                except Exception as exc:  # noqa: BLE001
+                    message = _failure_message(exc)
+                    logger.warning("CLI işi başarısız (%s): %s", job.input_path, message)
+                    refund_success, refund_credits, _ = credit_service.refund_credit(user_id)
+                    if refund_success:
+                        credits_left = refund_credits
+                    _fail(job, message)
+                    continue
+                succeeded += 1
+                _emit(
+                    stream,
+                    {
+                        "event": "job",
+                        "status": "ok",
+                        "input": str(job.input_path),
+                        "output": str(result.output_path),
+                        "done": succeeded + len(failures),
+                        "total": total,
+                    },
+                )
+
+    if tuner:
+        tuner.close()
+    elapsed = time.perf_counter() - started
+    summary = {
+        "event": "summary",
+        "total": total,
+        "succeeded": succeeded,
+        "failed": len(failures),
+        "skipped": skipped,
+        "elapsed_seconds": round(elapsed, 3),
+        "jobs_per_second": round(succeeded / elapsed, 3) if elapsed > 0 else 0.0,
+        "credits_left": credits_left,
+        "concurrency": tuner.best if tuner else pool_size,
+        "stop_reason": stop_reason,
+        "failures": failures,
+    }
+    _emit(stream, summary)
+    return summary
+
+
+def _cmd_process(args: argparse.Namespace) -> int:
+    user_id = args.user_id or os.getenv("BIYOVES_USER_ID", "")
+    if not user_id:
+        print("Kullanıcı kimliği gerekli (--user-id veya BIYOVES_USER_ID)", file=sys.stderr)
+        return EXIT_USAGE
+
+    source = Path(args.source)
+    if not source.exists():
+        print(f"Kaynak bulunamadı: {source}", file=sys.stderr)
+        return EXIT_USAGE
+
+    output_dir = Path(args.output) if args.output else None
+    try:
+        jobs = load_jobs(source, args.photo_type, args.layout, output_dir, args.profile)
+    except (OSError, ValueError) as exc:
+        print(f"İş listesi okunamadı: {exc}", file=sys.stderr)
+        return EXIT_USAGE
+
+    summary = run_batch(jobs, user_id, args.workers, output_dir, sys.stdout)
+    if args.summary:
+        Path(args.summary).write_text(json.dumps(summary, ensure_ascii=False, indent=2), encoding="utf-8")
+    return EXIT_OK if not summary["failed"] and not summary["skipped"] else EXIT_FAILURES
+
+
+class _StopWatching(Exception):
+    def __init__(self, exit_code: int):
+        super().__init__(exit_code)
+        self.exit_code = exit_code
+
+
+def _cmd_watch(args: argparse.Namespace) -> int:
+    user_id = args.user_id or os.getenv("BIYOVES_USER_ID", "")
+    if not user_id:
+        print("Kullanıcı kimliği gerekli (--user-id veya BIYOVES_USER_ID)", file=sys.stderr)
+        return EXIT_USAGE
+
+    source = Path(args.source).resolve()
+    output_dir = Path(args.output).resolve()
+    if not source.is_dir():
+        print(f"İzlenecek dizin bulunamadı: {source}", file=sys.stderr)
+        return EXIT_USAGE
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    stream = sys.stdout
+    watcher = HotFolderWatcher(
+        source,
+        ignore_dirs=[output_dir],
+        settle_seconds=args.settle,
+        process_existing=args.process_existing,
+    )
+    exit_code = EXIT_OK
+    with EnginePool(max_workers=args.workers, base_output_dir=output_dir, output_profile=args.profile) as pool:
+        pool.warm_up()
+        watcher.start()
+        _emit(stream, {
+            "event": "watching",
+            "source": str(source),
+            "output": str(output_dir),
+            "notifications": watcher.uses_notifications,
+        })
+        in_flight: Dict[Future, PhotoJob] = {}
+        try:
+            while True:
+                for path in watcher.wait_ready(timeout=0.1 if in_flight else None):
+                    job = PhotoJob(
+                        input_path=path,
+                        photo_type=args.photo_type,
+                        layout_type=args.layout,
+                        output_path=mirror_output_path(source, path, output_dir, args.photo_type, args.layout),
+                    )
+                    _, rejection = _precheck_input(path)
+                    if rejection:
+                        _emit(stream, {"event": "job", "status": "rejected", "input": str(path), "error": rejection})
+                        continue
+                    success, new_credits, message = credit_service.use_credit(user_id)
+                    if not success:
+                        _emit(stream, {"event": "credit_error", "input": str(path), "error": message or "Yetersiz kredi"})
+                        raise _StopWatching(EXIT_FAILURES)
+                    in_flight[pool.submit(job)] = job
+                    _emit(stream, {"event": "queued", "input": str(path), "credits_left": new_credits})
+
+                for future in [f for f in in_flight if f.done()]:
+                    job = in_flight.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as exc:  # noqa: BLE001
+                        credit_service.refund_credit(user_id)
+                        _emit(stream, {"event": "job", "status": "failed", "input": str(job.input_path),
+                                       "error": _failure_message(exc)})
+                        continue
+                    _emit(stream, {"event": "job", "status": "ok", "input": str(job.input_path),
+                                   "output": str(result.output_path)})
+        except KeyboardInterrupt:
+            pass
+        except _StopWatching as stop:
+            exit_code = stop.exit_code
+        finally:
+            watcher.stop()
+            for future, job in in_flight.items():
+                try:
+                    future.result()
+                except Exception:  # noqa: BLE001
+                    credit_service.refund_credit(user_id)
+    _emit(stream, {"event": "stopped"})
+    return exit_code
+
+
+def _cmd_serve(args: argparse.Namespace) -> int:
+    spool_dir = Path(args.spool).resolve()
+    token = args.token or os.getenv("BIYOVES_SERVICE_TOKEN", "")
+    try:
+        service, server = serve(
+            spool_dir,
+            args.host,
+            args.port,
+            args.workers,
+            default_user_id=args.user_id or os.getenv("BIYOVES_USER_ID", ""),
+            token=token,
+            max_queued=args.max_queued,
+        )
+    except (OSError, ValueError) as exc:
+        print(f"Servis başlatılamadı: {exc}", file=sys.stderr)
+        return EXIT_USAGE
+
+    host, port = server.server_address[:2]
+    _emit(sys.stdout, {
+        "event": "serving",
+        "url": f"http://{host}:{port}",
+        "spool": str(spool_dir),
+        "workers": service.pool.max_workers,
+        "auth": bool(token),
+    })
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.stop()
+    _emit(sys.stdout, {"event": "stopped"})
+    return EXIT_OK
+
+
+def _open_queue(args: argparse.Namespace) -> JobQueue:
+    return JobQueue(Path(args.db) if args.db else None)
+
+
+def _cmd_queue_add(args: argparse.Namespace) -> int:
+    source = Path(args.source)
+    if not source.exists():
+        print(f"Kaynak bulunamadı: {source}", file=sys.stderr)
+        return EXIT_USAGE
+    output_dir = Path(args.output) if args.output else None
+    try:
+        jobs = load_jobs(source, args.photo_type, args.layout, output_dir, args.profile)
+    except (OSError, ValueError) as exc:
+        print(f"İş listesi okunamadı: {exc}", file=sys.stderr)
+        return EXIT_USAGE
+    if output_dir is not None:
+        for job in jobs:
+            if job.output_path is None:
+                job.output_path = output_dir / f"{Path(job.input_path).stem}_{job.photo_type}_{job.layout_type}.jpg"
+    queue = _open_queue(args)
+    job_ids = queue.enqueue_many(
+        jobs,
+        priority=args.priority,
+        user_id=args.user_id or os.getenv("BIYOVES_USER_ID", ""),
+        max_attempts=args.max_attempts,
+    )
+    _emit(sys.stdout, {"event": "enqueued", "count": len(job_ids), "db": str(queue.db_path)})
+    return EXIT_OK
+
+
+def _cmd_queue_status(args: argparse.Namespace) -> int:
+    queue = _open_queue(args)
+    _emit(sys.stdout, {"event": "status", "db": str(queue.db_path), "counts": queue.counts()})
+    if args.failed:
+        for queued in queue.recent(limit=args.limit, state=STATE_FAILED):
+            _emit(sys.stdout, {"event": "failed", "id": queued.id, "input": str(queued.job.input_path),
+                               "attempts": queued.attempts, "error": queued.error})
+    return EXIT_OK
+
+
+def _cmd_queue_retry(args: argparse.Namespace) -> int:
+    _emit(sys.stdout, {"event": "requeued", "count": _open_queue(args).requeue_failed()})
+    return EXIT_OK
+
+
+def _cmd_queue_purge(args: argparse.Namespace) -> int:
+    removed = _open_queue(args).purge(older_than_seconds=args.older_than * 3600)
+    _emit(sys.stdout, {"event": "purged", "count": removed})
+    return EXIT_OK
+
+
+def _cmd_queue_work(args: argparse.Namespace) -> int:
+    """Kuyruktan iş alıp süreç havuzunda işler; diğer tüketicilerle eşzamanlı çalışabilir."""
+    default_user = args.user_id or os.getenv("BIYOVES_USER_ID", "")
+    queue = _open_queue(args)
+    owner = new_worker_id("cli")
+    stream = sys.stdout
+    output_dir = Path(args.output) if args.output else None
+    succeeded = failed = rejected = 0
+    exit_code = EXIT_OK
+
+    def _settle(future: Future, queued: QueuedJob, user_id: str) -> None:
+        nonlocal succeeded, failed
+        try:
+            result = future.result()
+        except Exception as exc:  # noqa: BLE001
+            message = _failure_message(exc)
+            credit_service.refund_credit(user_id)
+            state = queue.fail(queued.id, owner, message)
+            failed += 1
+            _emit(stream, {"event": "job", "status": "failed", "id": queued.id, "input": str(queued.job.input_path),
+                           "attempt": queued.attempts, "next_state": state, "error": message})
+            return
+        queue.complete(queued.id, owner, result.output_path)
+        succeeded += 1
+        _emit(stream, {"event": "job", "status": "ok", "id": queued.id, "input": str(queued.job.input_path),
+                       "output": str(result.output_path)})
+
+    tuner = ConcurrencyTuner(default_worker_count()) if not args.workers else None
+    pool_size = args.workers or tuner.max_limit
+    _emit(stream, {"event": "working", "db": str(queue.db_path), "owner": owner, "workers": pool_size,
+                   "autotune": tuner is not None})
+    in_flight: Dict[Future, Any] = {}
+    next_heartbeat = time.monotonic() + LEASE_HEARTBEAT_SECONDS
+    with EnginePool(max_workers=pool_size, base_output_dir=output_dir) as pool:
+        try:
+            while True:
+                free = (tuner.limit if tuner else pool_size) - len(in_flight)
+                claimed = queue.claim(owner, limit=free) if free > 0 else []
+                for position, queued in enumerate(claimed):
+                    user_id = queued.user_id or default_user
+                    # Umutsuz girdi kredi düşülmeden kapatılır ve yeniden denenmez
+                    _, rejection = _precheck_input(Path(queued.job.input_path))
+                    if rejection:
+                        queue.reject(queued.id, owner, rejection)
+                        rejected += 1
+                        _emit(stream, {"event": "job", "status": "rejected", "id": queued.id,
+                                       "input": str(queued.job.input_path), "error": rejection})
+                        continue
+                    success, _, message = credit_service.use_credit(user_id)
+                    if not success:
+                        # Havuza verilmemiş tüm kiralar bırakılır; kira süresi dolana kadar askıda kalmazlar
+                        for unsubmitted in claimed[position:]:
+                            queue.release(unsubmitted.id, owner)
+                        _emit(stream, {"event": "credit_error", "id": queued.id, "error": message or "Yetersiz kredi"})
+                        raise _StopWatching(EXIT_FAILURES)
+                    in_flight[pool.submit(queued.job)] = (queued, user_id)
+
+                if in_flight:
+                    done, _ = wait(list(in_flight), timeout=1.0, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        _settle(future, *in_flight.pop(future))
+                        if tuner:
+                            tuner.record()
+                    # Uzun süren işin kirası dolarsa başka tüketici onu yeniden işler ve kredi ikinci kez düşer
+                    if in_flight and time.monotonic() >= next_heartbeat:
+                        for queued, _ in in_flight.values():
+                            if not queue.heartbeat(queued.id, owner):
+                                logger.warning("Kuyruk kirası yenilenemedi, iş artık bu tüketicide değil: %s", queued.id)
+                        next_heartbeat = time.monotonic() + LEASE_HEARTBEAT_SECONDS
+                elif not claimed:
+                    if args.drain and not queue.count_active():
+                        break
+                    time.sleep(args.poll)
+        except KeyboardInterrupt:
+            pass
+        except _StopWatching as stop:
+            exit_code = stop.exit_code
+        finally:
+            for future, (queued, user_id) in in_flight.items():
+                _settle(future, queued, user_id)
+    queue.close()
+    if tuner:
+        tuner.close()
+    _emit(stream, {"event": "summary", "succeeded": succeeded, "failed": failed, "rejected": rejected})
+    return exit_code if exit_code != EXIT_OK else (EXIT_FAILURES if failed or rejected else EXIT_OK)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="BiyoVes arayüzsüz işlem aracı")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    process = subparsers.add_parser("process", help="Bir dizini veya manifesti toplu işler")
+    process.add_argument("source", help="Fotoğraf dizini veya .csv/.jsonl manifest")
+    process.add_argument("--output", "-o", help="Çıkış dizini (varsayılan ~/BiyoVesOutputs)")
+    process.add_argument("--photo-type", default="biyometrik", help="Varsayılan fotoğraf tipi")
+    process.add_argument("--layout", default="2li", help="Varsayılan sayfa düzeni")
+    process.add_argument("--profile", help="Çıktı profili (print, light, png, archive)")
+    process.add_argument("--workers", "-j", type=int,
+                         help="Paralel motor sayısı (verilmezse verime göre otomatik ayarlanır)")
+    process.add_argument("--user-id", help="Kredisi kullanılacak kullanıcı (BIYOVES_USER_ID)")
+    process.add_argument("--summary", help="Özetin ayrıca yazılacağı JSON dosyası")
+    process.set_defaults(handler=_cmd_process)
+
+    watch = subparsers.add_parser("watch", help="Bir dizini izler, düşen fotoğrafları anında işler")
+    watch.add_argument("source", help="İzlenecek dizin")
+    watch.add_argument("--output", "-o", required=True, help="Çıktıların yansıtılacağı dizin")
+    watch.add_argument("--photo-type", default="biyometrik", help="Fotoğraf tipi")
+    watch.add_argument("--layout", default="2li", help="Sayfa düzeni")
+    watch.add_argument("--profile", help="Çıktı profili (print, light, png, archive)")
+    watch.add_argument("--workers", "-j", type=int, default=default_worker_count(), help="Sıcak tutulan motor sayısı")
+    watch.add_argument("--user-id", help="Kredisi kullanılacak kullanıcı (BIYOVES_USER_ID)")
+    watch.add_argument("--settle", type=float, default=DEFAULT_SETTLE_SECONDS,
+                       help="Dosyanın tamamlanmış sayılması için sabit kalma süresi (sn)")
+    watch.add_argument("--process-existing", action="store_true", help="Başlangıçta dizinde olan dosyaları da işle")
+    watch.set_defaults(handler=_cmd_watch)
+
+    serve_parser = subparsers.add_parser("serve", help="Yerel ağ için HTTP işleme servisi başlatır")
+    serve_parser.add_argument("--host", default="127.0.0.1",
+                              help="Dinlenecek adres; yerel ağa açmak için (ör. 0.0.0.0) --token gerekir")
+    serve_parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Dinlenecek port")
+    serve_parser.add_argument("--spool", default=str(Path.home() / ".biyoves" / "service"),
+                              help="İş kayıtları, girdiler ve çıktılar için dizin")
+    serve_parser.add_argument("--workers", "-j", type=int, default=default_worker_count(),
+                              help="Aynı anda çalışan motor sayısı")
+    serve_parser.add_argument("--max-queued", type=int, default=DEFAULT_MAX_QUEUED,
+                              help="Bekleyen iş sınırı; aşılırsa 503 döner")
+    serve_parser.add_argument("--user-id", help="İstekte X-BiyoVes-User yoksa kullanılacak kullanıcı")
+    serve_parser.add_argument("--token", help="Erişim anahtarı (Authorization: Bearer, BIYOVES_SERVICE_TOKEN); "
+                                              "loopback dışı adreslerde zorunlu")
+    serve_parser.set_defaults(handler=_cmd_serve)
+
+    queue_parser = subparsers.add_parser("queue", help="Kalıcı iş kuyruğunu yönetir ve tüketir")
+    queue_commands = queue_parser.add_subparsers(dest="queue_command", required=True)
+
+    def _queue_command(name: str, help_text: str, handler) -> argparse.ArgumentParser:
+        command = queue_commands.add_parser(name, help=help_text)
+        command.add_argument("--db", help="Kuyruk veritabanı (varsayılan ~/.biyoves/jobs.sqlite3)")
+        command.set_defaults(handler=handler)
+        return command
+
+    queue_add = _queue_command("add", "Dizindeki veya manifestteki fotoğrafları kuyruğa ekler", _cmd_queue_add)
+    queue_add.add_argument("source", help="Fotoğraf dizini veya .csv/.jsonl manifest")
+    queue_add.add_argument("--output", "-o", help="Çıkış dizini")
+    queue_add.add_argument("--photo-type", default="biyometrik", help="Varsayılan fotoğraf tipi")
+    queue_add.add_argument("--layout", default="2li", help="Varsayılan sayfa düzeni")
+    queue_add.add_argument("--profile", help="Çıktı profili (print, light, png, archive)")
+    queue_add.add_argument("--priority", type=int, default=0, help="Yüksek öncelikli işler önce alınır")
+    queue_add.add_argument("--max-attempts", type=int, default=DEFAULT_MAX_ATTEMPTS, help="Deneme sınırı")
+    queue_add.add_argument("--user-id", help="Kredisi kullanılacak kullanıcı (BIYOVES_USER_ID)")
+
+    queue_status = _queue_command("status", "Durumlara göre iş sayılarını gösterir", _cmd_queue_status)
+    queue_status.add_argument("--failed", action="store_true", help="Başarısız işleri de listele")
+    queue_status.add_argument("--limit", type=int, default=50, help="Listelenecek en fazla iş")
+
+    _queue_command("retry", "Başarısız işleri yeniden sıraya alır", _cmd_queue_retry)
+
+    queue_purge = _queue_command("purge", "Bitmiş işleri siler", _cmd_queue_purge)
+    queue_purge.add_argument("--older-than", type=float, default=0.0, help="Saat cinsinden en az yaş")
+
+    queue_work = _queue_command("work", "Kuyruktan iş alıp işler", _cmd_queue_work)
+    queue_work.add_argument("--output", "-o", help="Çıkış yolu olmayan işler için dizin")
+    queue_work.add_argument("--workers", "-j", type=int,
+                            help="Paralel motor sayısı (verilmezse verime göre otomatik ayarlanır)")
+    queue_work.add_argument("--user-id", help="Kullanıcısı olmayan işler için kredi hesabı (BIYOVES_USER_ID)")
+    queue_work.add_argument("--drain", action="store_true", help="Kuyruk boşalınca çık")
+    queue_work.add_argument("--poll", type=float, default=1.0, help="Kuyruk boşken bekleme aralığı (sn)")
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,16 +7,22 @@ import tempfile
 import string
 import secrets
 import threading
+import time
 from pathlib import Path
 from datetime import datetime, timezone, timedelta
-from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from contextlib import contextmanager
+from dataclasses import dataclass
 
 import firebase_admin
 from firebase_admin import credentials, auth, firestore
+from firebase_admin import exceptions as firebase_exceptions
+from google.api_core import exceptions as google_exceptions
 from google.cloud.firestore import Transaction
 import bcrypt
 
 from app.logger import logger
+from app.metrics import metrics
+from app.utils.single_flight import SingleFlightCache
 
 
 class EmailConfig:
@@ -51,6 +57,39 @@ SERVICE_ACCOUNT_JSON_DICT = {
 }
 
 
+@dataclass(frozen=True)
+class UserProfile:
+    """Oturum açan kullanıcının kimlik ve hesap bilgileri"""
+
+    uid: str
+    email: str
+    username: str
+    credits: int
+    email_verified: bool
+
+    @classmethod
+    def from_document(cls, uid, email, user_data):
+        email = email or user_data.get("email", "")
+        return cls(
+            uid=uid,
+            email=email,
+            username=user_data.get("username") or email.split("@")[0],
+            credits=int(user_data.get("credits", 0) or 0),
+            email_verified=bool(user_data.get("emailVerified", False)),
+        )
+
+
+# Önbellekteki kullanıcı belgesine hiç alınmayan gizli alanlar
+_UNCACHED_USER_FIELDS = ("password_hash",)
+
+
+def _cacheable_user_data(user_data):
+    """Kullanıcı belgesinin önbelleğe yazılabilecek, gizli alanlardan arındırılmış kopyası"""
+    if user_data is None:
+        return None
+    return {key: value for key, value in user_data.items() if key not in _UNCACHED_USER_FIELDS}
+
+
 class FirebaseManager:
     _instance = None
     _initialized = False
@@ -65,10 +104,18 @@ class FirebaseManager:
             self.db = None
             self._initialized = True
             self._temp_cred_file = None
-            self._executor = ThreadPoolExecutor(max_workers=5, thread_name_prefix="firebase")
+            # Tek bir RPC denemesinin süresi; Auth HTTP çağrıları da aynı sınırı kullanır
             self.FIRESTORE_TIMEOUT = 10
+            # Yeniden denemeler dahil bir çağrının toplam süresi
+            self.FIRESTORE_DEADLINE = 20
             self.FIRESTORE_MAX_RETRIES = 3
             self.FIRESTORE_RETRY_DELAY = 0.5
+            self._rpc_lock = threading.Lock()
+            self._rpc_in_flight = 0
+            self._rpc_peak = 0
+            # Aynı kullanıcı belgesi için eşzamanlı okumalar tek RPC'yi paylaşır
+            self.USER_CACHE_TTL = 5.0
+            self._user_docs = SingleFlightCache("firestore_user_doc", self.USER_CACHE_TTL)
 
     def initialize(self):
         """Public initializer to make sure Firebase is ready."""
@@ -107,27 +154,41 @@ class FirebaseManager:
                     self._temp_cred_file = tf.name
                 cred = credentials.Certificate(self._temp_cred_file)
 
-            firebase_admin.initialize_app(cred)
+            firebase_admin.initialize_app(cred, {"httpTimeout": self.FIRESTORE_TIMEOUT})
             self.db = firestore.client()
         except Exception as e:
             logger.exception("Firebase initialization hatası: %s", e)
             raise
 
-    def _execute_with_retry(self, func, *args, **kwargs):
+    def _execute_with_retry(self, func):
+        """RPC'yi çağıran thread'de, gerçek bir süre sınırıyla çalıştırır.
+
+        ``func`` tek argüman alır: RPC metoduna ``**rpc`` ile aktarılacak
+        ``{"retry": None, "timeout": ...}``. Süre sınırı sunucuya iletilir;
+        süresi dolan çağrı arka planda çalışmaya devam etmez. Yeniden
+        denemeler ``FIRESTORE_DEADLINE`` içinde kalan süreyi paylaşır.
+        """
         last_exception = None
+        call_seconds = metrics.histogram("firestore_call_seconds", "Firestore çağrı gidiş-dönüş süresi")
+        deadline = time.monotonic() + self.FIRESTORE_DEADLINE
         for attempt in range(1, self.FIRESTORE_MAX_RETRIES + 1):
-            future = self._executor.submit(func, *args, **kwargs)
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            if attempt > 1:
+                metrics.counter("firestore_retries_total", "Yeniden denenen Firestore çağrıları").inc()
+            started = time.perf_counter()
             try:
-                return future.result(timeout=self.FIRESTORE_TIMEOUT)
-            except FutureTimeoutError as exc:
-                logger.warning(
-                    "Firestore timeout (attempt %s/%s)",
-                    attempt,
-                    self.FIRESTORE_MAX_RETRIES,
-                )
-                last_exception = exc
+                with self._tracked_rpc():
+                    result = func({"retry": None, "timeout": min(self.FIRESTORE_TIMEOUT, remaining)})
+                call_seconds.observe(time.perf_counter() - started)
+                return result
             except Exception as exc:  # noqa: BLE001
                 last_exception = exc
+                if self._is_timeout_error(exc):
+                    metrics.counter("firestore_timeouts_total", "Zaman aşımına uğrayan Firestore çağrıları").inc()
+                else:
+                    metrics.counter("firestore_errors_total", "Hata dönen Firestore çağrıları").inc()
                 if not self._is_retryable_error(exc):
                     break
                 logger.warning(
@@ -137,10 +198,37 @@ class FirebaseManager:
                     exc,
                 )
             if attempt < self.FIRESTORE_MAX_RETRIES:
-                threading.Event().wait(self.FIRESTORE_RETRY_DELAY)
+                threading.Event().wait(min(self.FIRESTORE_RETRY_DELAY, max(0.0, deadline - time.monotonic())))
         if last_exception:
             raise last_exception
-        raise RuntimeError("Firestore işlemi başarısız oldu")
+        raise TimeoutError("Firestore işlemi süre sınırı içinde tamamlanamadı")
+
+    @contextmanager
+    def _tracked_rpc(self):
+        with self._rpc_lock:
+            self._rpc_in_flight += 1
+            self._rpc_peak = max(self._rpc_peak, self._rpc_in_flight)
+            in_flight, peak = self._rpc_in_flight, self._rpc_peak
+        metrics.gauge("firestore_in_flight", "Süren Firestore/Auth çağrıları").set(in_flight)
+        metrics.gauge("firestore_in_flight_peak", "Aynı anda süren en fazla Firestore/Auth çağrısı").set(peak)
+        try:
+            yield
+        finally:
+            with self._rpc_lock:
+                self._rpc_in_flight -= 1
+                in_flight = self._rpc_in_flight
+            metrics.gauge("firestore_in_flight", "Süren Firestore/Auth çağrıları").set(in_flight)
+
+    def rpc_stats(self):
+        """Tanılama için süren ve aynı anda görülen en fazla çağrı sayısı."""
+        with self._rpc_lock:
+            return {"in_flight": self._rpc_in_flight, "peak": self._rpc_peak}
+
+    @staticmethod
+    def _is_timeout_error(exc: Exception) -> bool:
+        return isinstance(
+            exc, (google_exceptions.DeadlineExceeded, firebase_exceptions.DeadlineExceededError, TimeoutError)
+        )
 
     @staticmethod
     def _is_retryable_error(exc: Exception) -> bool:
@@ -165,10 +253,11 @@ class FirebaseManager:
         """Yeni kullanıcı oluşturur"""
         self._ensure_initialized()
         try:
-            user = auth.create_user(email=email, password=password, email_verified=False)
+            with self._tracked_rpc():
+                user = auth.create_user(email=email, password=password, email_verified=False)
             password_hash = self._hash_password(password)
 
-            def _create_user_doc():
+            def _create_user_doc(rpc):
                 self.db.collection("users").document(user.uid).set(
                     {
                         "email": email,
@@ -177,7 +266,8 @@ class FirebaseManager:
                         "createdAt": datetime.now(timezone.utc),
                         "username": email.split("@")[0],
                         "password_hash": password_hash,
-                    }
+                    },
+                    **rpc,
                 )
 
             self._execute_with_retry(_create_user_doc)
@@ -190,14 +280,15 @@ class FirebaseManager:
             raise
 
     def sign_in_user(self, email, password):
-        """Kullanıcı girişi yapar"""
+        """Kullanıcı girişi yapar; krediler dahil ``UserProfile`` döndürür"""
         self._ensure_initialized()
         try:
             # Kullanıcıyı email ile bul
-            user = auth.get_user_by_email(email)
+            with self._tracked_rpc():
+                user = auth.get_user_by_email(email)
             
             # Firestore'dan kullanıcı bilgilerini al
-            user_doc = self._execute_with_retry(lambda: self.db.collection("users").document(user.uid).get())
+            user_doc = self._execute_with_retry(lambda rpc: self.db.collection("users").document(user.uid).get(**rpc))
             if not user_doc.exists:
                 raise Exception("Kullanıcı kaydı bulunamadı")
             
@@ -215,7 +306,9 @@ class FirebaseManager:
             if not user_data.get("emailVerified", False):
                 raise Exception("EMAIL_NOT_VERIFIED")
             
-            return user
+            # Şifre kontrolü için okunan belge, şifre hash'i çıkarılarak önbelleğe de yazılır; ana ekran yeniden okumaz
+            self._user_docs.put(user.uid, _cacheable_user_data(user_data))
+            return UserProfile.from_document(user.uid, user.email, user_data)
         except auth.UserNotFoundError:
             raise Exception("Kullanıcı bulunamadı")
         except Exception as e:
@@ -240,7 +333,9 @@ class FirebaseManager:
                 "createdAt": datetime.now(timezone.utc),
             }
             
-            doc_ref = self._execute_with_retry(lambda: self.db.collection("verification_codes").add(verification_data))
+            doc_ref = self._execute_with_retry(
+                lambda rpc: self.db.collection("verification_codes").add(verification_data, **rpc)
+            )
             return code, doc_ref[1].id
         except Exception as e:
             logger.exception("Doğrulama kodu oluşturma hatası: %s", e)
@@ -252,9 +347,9 @@ class FirebaseManager:
         try:
             codes_ref = self.db.collection("verification_codes")
 
-            def _fetch_codes():
+            def _fetch_codes(rpc):
                 query = codes_ref.where("code", "==", code).where("email", "==", email).where("used", "==", False)
-                return list(query.stream())
+                return list(query.stream(**rpc))
 
             docs = self._execute_with_retry(_fetch_codes)
             
@@ -270,16 +365,20 @@ class FirebaseManager:
                 return False, "Kod süresi dolmuş"
             
             # Kodu kullanıldı olarak işaretle
-            self._execute_with_retry(lambda: doc.reference.update({"used": True, "usedAt": datetime.now(timezone.utc)}))
+            self._execute_with_retry(
+                lambda rpc: doc.reference.update({"used": True, "usedAt": datetime.now(timezone.utc)}, **rpc)
+            )
             
             # Kullanıcının email'ini doğrula
-            user_obj = auth.get_user_by_email(email)
-            auth.update_user(user_obj.uid, email_verified=True)
+            with self._tracked_rpc():
+                user_obj = auth.get_user_by_email(email)
+                auth.update_user(user_obj.uid, email_verified=True)
             self._execute_with_retry(
-                lambda: self.db.collection("users").document(user_obj.uid).update(
-                    {"emailVerified": True, "verifiedAt": datetime.now(timezone.utc)}
+                lambda rpc: self.db.collection("users").document(user_obj.uid).update(
+                    {"emailVerified": True, "verifiedAt": datetime.now(timezone.utc)}, **rpc
                 )
             )
+            self._invalidate_user(user_obj.uid)
             
             # Email doğrulama bonusu olarak 3 kredi ekle
             success, message, _ = self.add_credits_to_user(user_obj.uid, 3, reason="Email doğrulama bonusu")
@@ -297,25 +396,29 @@ class FirebaseManager:
         try:
             user_ref = self.db.collection("users").document(user_id)
 
-            def _apply_credit():
-                user_doc = user_ref.get()
+            def _apply_credit(rpc):
+                user_doc = user_ref.get(**rpc)
                 if user_doc.exists:
                     current_credits = user_doc.to_dict().get("credits", 0)
                     new_total = current_credits + credits
-                    user_ref.update({"credits": new_total, "lastCreditUpdate": datetime.now(timezone.utc)})
+                    user_ref.update({"credits": new_total, "lastCreditUpdate": datetime.now(timezone.utc)}, **rpc)
                     return True, new_total, False
                 user_ref.set(
                     {
                         "credits": credits,
                         "createdAt": datetime.now(timezone.utc),
                         "lastCreditUpdate": datetime.now(timezone.utc),
-                    }
+                    },
+                    **rpc,
                 )
                 return True, credits, True
 
-            success, new_total, created = self._execute_with_retry(_apply_credit)
+            try:
+                success, new_total, created = self._execute_with_retry(_apply_credit)
+            finally:
+                self._invalidate_user(user_id)
             if success and reason:
-                def _add_history():
+                def _add_history(rpc):
                     self.db.collection("credit_history").add(
                         {
                             "userId": user_id,
@@ -323,7 +426,8 @@ class FirebaseManager:
                             "type": "add",
                             "reason": reason,
                             "timestamp": datetime.now(timezone.utc),
-                        }
+                        },
+                        **rpc,
                     )
                 self._execute_with_retry(_add_history)
             message = f"Yeni kullanıcı oluşturuldu, {credits} kredi eklendi" if created else f"{credits} kredi eklendi"
@@ -337,7 +441,8 @@ class FirebaseManager:
         self._ensure_initialized()
         try:
             try:
-                user = auth.get_user_by_email(email)
+                with self._tracked_rpc():
+                    user = auth.get_user_by_email(email)
             except auth.UserNotFoundError as e:
                 raise Exception(f"{e}")
             
@@ -352,7 +457,9 @@ class FirebaseManager:
                 "type": "password_reset",
             }
             
-            doc_ref = self._execute_with_retry(lambda: self.db.collection("password_reset_codes").add(reset_data))
+            doc_ref = self._execute_with_retry(
+                lambda rpc: self.db.collection("password_reset_codes").add(reset_data, **rpc)
+            )
             return reset_code, doc_ref[1].id
         except Exception as e:
             logger.exception("Şifre sıfırlama kodu oluşturma hatası: %s", e)
@@ -364,9 +471,9 @@ class FirebaseManager:
         try:
             codes_ref = self.db.collection("password_reset_codes")
 
-            def _fetch():
+            def _fetch(rpc):
                 query = codes_ref.where("code", "==", code).where("email", "==", email).where("used", "==", False)
-                return list(query.stream())
+                return list(query.stream(**rpc))
 
             docs = self._execute_with_retry(_fetch)
             
@@ -382,7 +489,9 @@ class FirebaseManager:
                 return False, "Kod süresi dolmuş"
             
             # Kodu kullanıldı olarak işaretle
-            self._execute_with_retry(lambda: doc.reference.update({"used": True, "verifiedAt": datetime.now(timezone.utc)}))
+            self._execute_with_retry(
+                lambda rpc: doc.reference.update({"used": True, "verifiedAt": datetime.now(timezone.utc)}, **rpc)
+            )
             return True, "Kod doğrulandı"
         except Exception as e:
             logger.exception("Şifre sıfırlama kodu doğrulama hatası: %s", e)
@@ -392,29 +501,54 @@ class FirebaseManager:
         """Kullanıcı şifresini sıfırlar"""
         self._ensure_initialized()
         try:
-            user = auth.get_user_by_email(email)
-            auth.update_user(user.uid, password=new_password)
+            with self._tracked_rpc():
+                user = auth.get_user_by_email(email)
+                auth.update_user(user.uid, password=new_password)
             password_hash = self._hash_password(new_password)
             
             self._execute_with_retry(
-                lambda: self.db.collection("users").document(user.uid).update(
-                    {"password_hash": password_hash, "passwordResetAt": datetime.now(timezone.utc)}
+                lambda rpc: self.db.collection("users").document(user.uid).update(
+                    {"password_hash": password_hash, "passwordResetAt": datetime.now(timezone.utc)}, **rpc
                 )
             )
+            self._invalidate_user(user.uid)
             return True, "Şifre başarıyla sıfırlandı"
         except Exception as e:
             logger.exception("Şifre sıfırlama hatası: %s", e)
             return False, str(e)
 
 
+    def _get_user_data(self, user_id):
+        """Kullanıcı belgesini döndürür; kısa süreli önbellekten ya da süren okumadan paylaşılır."""
+
+        def _load():
+            user_doc = self._execute_with_retry(lambda rpc: self.db.collection("users").document(user_id).get(**rpc))
+            return _cacheable_user_data(user_doc.to_dict()) if user_doc.exists else None
+
+        user_data = self._user_docs.get(user_id, _load)
+        return dict(user_data) if user_data is not None else None
+
+    def get_user_profile(self, user_id, email=None):
+        """Kayıtlı oturum ve doğrulama sonrası girişler için ``UserProfile`` döndürür"""
+        self._ensure_initialized()
+        if email is None:
+            with self._tracked_rpc():
+                email = auth.get_user(user_id).email
+        user_data = self._get_user_data(user_id)
+        if user_data is None:
+            raise Exception("Kullanıcı kaydı bulunamadı")
+        return UserProfile.from_document(user_id, email, user_data)
+
+    def _invalidate_user(self, user_id):
+        """Kullanıcı belgesine yazıldıktan sonra önbellekteki kopyayı düşürür."""
+        self._user_docs.invalidate(user_id)
+
     def get_user_credits(self, user_id):
         """Kullanıcının kredi sayısını döndürür"""
         self._ensure_initialized()
         try:
-            user_doc = self._execute_with_retry(lambda: self.db.collection("users").document(user_id).get())
-            if user_doc.exists:
-                return user_doc.to_dict().get("credits", 0)
-            return 0
+            user_data = self._get_user_data(user_id)
+            return user_data.get("credits", 0) if user_data else 0
         except Exception as e:
             logger.exception("Kredi okuma hatası: %s", e)
             return 0
@@ -430,7 +564,7 @@ class FirebaseManager:
 
             @firestore.transactional
             def update_in_transaction(transaction: Transaction):
-                snapshot = user_ref.get(transaction=transaction)
+                snapshot = user_ref.get(transaction=transaction, timeout=self.FIRESTORE_TIMEOUT)
                 if not snapshot.exists:
                     return False, 0, "Kullanıcı bulunamadı"
 
@@ -445,19 +579,25 @@ class FirebaseManager:
                 )
                 return True, new_credits, ""
 
+            # İşlem yeniden denemesi kütüphaneye bırakılır; belirsiz bir commit iki kez düşülmesin
             transaction = self.db.transaction()
-            success, new_credits, message = update_in_transaction(transaction)
+            try:
+                with self._tracked_rpc():
+                    success, new_credits, message = update_in_transaction(transaction)
+            finally:
+                self._invalidate_user(user_id)
             if success:
                 try:
                     self._execute_with_retry(
-                        lambda: self.db.collection("credit_history").add(
+                        lambda rpc: self.db.collection("credit_history").add(
                             {
                                 "userId": user_id,
                                 "amount": -amount,
                                 "type": "use",
                                 "reason": "Hak kullanımı",
                                 "timestamp": datetime.now(timezone.utc),
-                            }
+                            },
+                            **rpc,
                         )
                     )
                 except Exception as history_error:
@@ -479,9 +619,9 @@ class FirebaseManager:
                 return False, "Kod gerekli", 0
             codes_ref = self.db.collection("credit_codes")
 
-            def _fetch_codes():
+            def _fetch_codes(rpc):
                 query = codes_ref.where("code", "==", code.upper()).where("used", "==", False)
-                return list(query.stream())
+                return list(query.stream(**rpc))
 
             docs = self._execute_with_retry(_fetch_codes)
             if not docs:
@@ -497,7 +637,9 @@ class FirebaseManager:
                     return False, "Kod süresi dolmuş", 0
 
             self._execute_with_retry(
-                lambda: doc.reference.update({"used": True, "usedBy": user_id, "usedAt": datetime.now(timezone.utc)})
+                lambda rpc: doc.reference.update(
+                    {"used": True, "usedBy": user_id, "usedAt": datetime.now(timezone.utc)}, **rpc
+                )
             )
             credits_to_add = doc_data.get("credits", 0)
             success, message, _ = self.add_credits_to_user(user_id, credits_to_add, reason=f"Kod: {code.upper()}")
@@ -1,25 +1,165 @@
 #!/usr/bin/env python3
 
-"""Centralized logging configuration."""
+"""Centralized logging configuration.
+
+Records are handed to a bounded in-memory queue and written to stderr and
+a rotating log file by a single listener thread, so processing and network
+threads never block on log I/O or traceback formatting.
+"""
 
 from __future__ import annotations
 
+import atexit
+import copy
 import logging
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from pathlib import Path
+from typing import List, Optional
 
 LOG_FORMAT = "%(asctime)s | %(levelname)s | %(name)s | %(message)s"
+DEFAULT_LOG_DIR = Path.home() / ".biyoves" / "logs"
+LOG_FILE_NAME = "biyoves.log"
+LOG_FILE_MAX_BYTES = 5 * 1024 * 1024
+LOG_FILE_BACKUP_COUNT = 3
+DEFAULT_QUEUE_SIZE = 10000
+
+_listener: Optional["_BlockingSentinelListener"] = None
+_queue_handler: Optional["BoundedQueueHandler"] = None
+
+
+class BoundedQueueHandler(QueueHandler):
+    """Queue handler that drops records instead of blocking when the queue is full."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Only merge the message here; tracebacks are formatted on the listener thread.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += 1
+
+
+class _BlockingSentinelListener(QueueListener):
+    """Listener whose stop sentinel waits for room in a full queue."""
+
+    def enqueue_sentinel(self) -> None:
+        self.queue.put(self._sentinel)
+
+
+def _level_from_env(default: int) -> int:
+    value = os.getenv("BIYOVES_LOG_LEVEL", "").strip()
+    if not value:
+        return default
+    if value.isdigit():
+        return int(value)
+    level = logging.getLevelName(value.upper())
+    return level if isinstance(level, int) else default
+
+
+def _queue_size_from_env() -> int:
+    try:
+        return max(1, int(os.getenv("BIYOVES_LOG_QUEUE_SIZE", DEFAULT_QUEUE_SIZE)))
+    except ValueError:
+        return DEFAULT_QUEUE_SIZE
+
+
+def _log_file_from_env() -> Optional[Path]:
+    value = os.getenv("BIYOVES_LOG_FILE", "").strip()
+    if value.lower() in {"0", "off", "none", "false"}:
+        return None
+    return Path(value) if value else DEFAULT_LOG_DIR / LOG_FILE_NAME
+
+
+def _build_sinks(formatter: logging.Formatter) -> List[logging.Handler]:
+    sinks: List[logging.Handler] = []
+    # Windowed (frozen) builds have no stderr
+    if sys.stderr is not None:
+        stream_handler = logging.StreamHandler(sys.stderr)
+        stream_handler.setFormatter(formatter)
+        sinks.append(stream_handler)
+
+    # Spawned engine processes log to stderr only; several processes rotating
+    # the same file is unsupported and fails on Windows.
+    log_file = _log_file_from_env() if multiprocessing.parent_process() is None else None
+    if log_file is not None:
+        try:
+            log_file.parent.mkdir(parents=True, exist_ok=True)
+            file_handler = RotatingFileHandler(
+                log_file,
+                maxBytes=LOG_FILE_MAX_BYTES,
+                backupCount=LOG_FILE_BACKUP_COUNT,
+                encoding="utf-8",
+                delay=True,
+            )
+        except OSError:
+            pass
+        else:
+            file_handler.setFormatter(formatter)
+            sinks.append(file_handler)
+    return sinks
 
 
 def configure_logging(level: int | None = None) -> None:
     """Configure root logging only once."""
+    global _listener, _queue_handler
     if getattr(configure_logging, "_configured", False):
         return
-    logging.basicConfig(
-        level=level or logging.INFO,
-        format=LOG_FORMAT,
-    )
+
+    formatter = logging.Formatter(LOG_FORMAT)
+    _queue_handler = BoundedQueueHandler(queue.Queue(maxsize=_queue_size_from_env()))
+    _listener = _BlockingSentinelListener(_queue_handler.queue, *_build_sinks(formatter), respect_handler_level=True)
+
+    root = logging.getLogger()
+    root.setLevel(_level_from_env(level or logging.INFO))
+    root.addHandler(_queue_handler)
+    _listener.start()
+    atexit.register(shutdown_logging)
     configure_logging._configured = True  # type: ignore[attr-defined]
 
 
+def shutdown_logging() -> None:
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    listener, _listener = _listener, None
+    if listener is None:
+        return
+    listener.stop()
+    if _queue_handler is not None and _queue_handler.dropped:
+        for handler in listener.handlers:
+            handler.handle(
+                logging.makeLogRecord(
+                    {
+                        "name": "biyoves",
+                        "levelno": logging.WARNING,
+                        "levelname": "WARNING",
+                        "msg": f"Log kuyruğu dolu olduğu için {_queue_handler.dropped} kayıt atlandı",
+                    }
+                )
+            )
+    for handler in listener.handlers:
+        handler.close()
+
+
+def dropped_log_records() -> int:
+    return _queue_handler.dropped if _queue_handler is not None else 0
+
+
 configure_logging()
 
 # Expose module-level logger helper
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+
+"""Lightweight in-process metrics (counters, gauges, histograms, spans).
+
+Hot paths only take a per-metric lock and a ``perf_counter`` call; the
+registry can be dumped as JSON or Prometheus text for local scraping.
+"""
+
+from __future__ import annotations
+
+import bisect
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterator, List, Optional, Sequence, Tuple
+
+METRIC_PREFIX = "biyoves_"
+DEFAULT_BUCKETS: Tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+RATE_WINDOW_SECONDS = 60
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str = ""):
+        self.name = name
+        self.help = help_text
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"value": self._value}
+
+
+class Gauge:
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str = ""):
+        self.name = name
+        self.help = help_text
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def set(self, value: float) -> None:
+        with self._lock:
+            self._value = value
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.inc(-amount)
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"value": self._value}
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str = "", buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._count = 0
+        self._sum = 0.0
+        self._max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._count += 1
+            self._sum += value
+            if value > self._max:
+                self._max = value
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    @property
+    def sum(self) -> float:
+        return self._sum
+
+    def quantile(self, q: float) -> float:
+        """Bucket-resolution quantile estimate (upper bound of the bucket)."""
+        with self._lock:
+            counts = list(self._counts)
+            total = self._count
+            maximum = self._max
+        if not total:
+            return 0.0
+        target = q * total
+        running = 0
+        for index, bucket_count in enumerate(counts):
+            running += bucket_count
+            if running >= target:
+                return min(self.buckets[index], maximum) if index < len(self.buckets) else maximum
+        return maximum
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = list(self._counts)
+            total = self._count
+            total_sum = self._sum
+            maximum = self._max
+        cumulative = 0
+        buckets = {}
+        for bound, bucket_count in zip(self.buckets, counts):
+            cumulative += bucket_count
+            buckets[str(bound)] = cumulative
+        return {
+            "count": total,
+            "sum": total_sum,
+            "mean": total_sum / total if total else 0.0,
+            "max": maximum,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "buckets": buckets,
+        }
+
+
+class Meter:
+    """Events per second over a sliding window."""
+
+    kind = "meter"
+
+    def __init__(self, name: str, help_text: str = "", window: int = RATE_WINDOW_SECONDS):
+        self.name = name
+        self.help = help_text
+        self.window = window
+        self._events: Deque[List[float]] = deque()
+        self._total = 0
+        self._lock = threading.Lock()
+
+    def mark(self, count: int = 1) -> None:
+        now = int(time.monotonic())
+        with self._lock:
+            self._total += count
+            if self._events and self._events[-1][0] == now:
+                self._events[-1][1] += count
+            else:
+                self._events.append([now, count])
+            self._trim(now)
+
+    def rate(self) -> float:
+        now = int(time.monotonic())
+        with self._lock:
+            self._trim(now)
+            if not self._events:
+                return 0.0
+            events = sum(count for _, count in self._events)
+            elapsed = max(1, now - self._events[0][0] + 1)
+        return events / elapsed
+
+    def _trim(self, now: int) -> None:
+        while self._events and self._events[0][0] <= now - self.window:
+            self._events.popleft()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"total": self._total, "rate_per_second": self.rate()}
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._started = time.time()
+
+    def _get_or_create(self, cls, name: str, help_text: str, **kwargs):
+        metric = self._metrics.get(name)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get(name)
+                if metric is None:
+                    metric = cls(name, help_text, **kwargs)
+                    self._metrics[name] = metric
+        return metric
+
+    def counter(self, name: str, help_text: str = "") -> Counter:
+        return self._get_or_create(Counter, name, help_text)
+
+    def gauge(self, name: str, help_text: str = "") -> Gauge:
+        return self._get_or_create(Gauge, name, help_text)
+
+    def histogram(self, name: str, help_text: str = "", buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, help_text, buckets=buckets)
+
+    def meter(self, name: str, help_text: str = "") -> Meter:
+        return self._get_or_create(Meter, name, help_text)
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        """Time the block into the ``<name>_seconds`` histogram."""
+        histogram = self.histogram(f"{name}_seconds")
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            histogram.observe(time.perf_counter() - started)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            metrics = dict(self._metrics)
+        return {
+            "uptime_seconds": time.time() - self._started,
+            "metrics": {
+                name: {"type": metric.kind, **metric.snapshot()}
+                for name, metric in sorted(metrics.items())
+            },
+        }
+
+    def to_json(self, indent: Optional[int] = 2) -> str:
+        return json.dumps(self.snapshot(), indent=indent, ensure_ascii=False)
+
+    def to_prometheus(self) -> str:
+        with self._lock:
+            metrics = dict(self._metrics)
+        lines: List[str] = []
+
+        def _header(series: str, kind: str, help_text: str) -> None:
+            # HELP and TYPE must name the exact series that follows
+            if help_text:
+                lines.append(f"# HELP {series} {help_text}")
+            lines.append(f"# TYPE {series} {kind}")
+
+        for name, metric in sorted(metrics.items()):
+            full_name = METRIC_PREFIX + name
+            if isinstance(metric, Histogram):
+                _header(full_name, "histogram", metric.help)
+                snap = metric.snapshot()
+                for bound, cumulative in snap["buckets"].items():
+                    lines.append(f'{full_name}_bucket{{le="{bound}"}} {cumulative}')
+                lines.append(f'{full_name}_bucket{{le="+Inf"}} {snap["count"]}')
+                lines.append(f"{full_name}_sum {snap['sum']}")
+                lines.append(f"{full_name}_count {snap['count']}")
+            elif isinstance(metric, Meter):
+                _header(f"{full_name}_total", "counter", metric.help)
+                lines.append(f"{full_name}_total {metric.snapshot()['total']}")
+                _header(f"{full_name}_rate", "gauge", f"{metric.help} (per second)" if metric.help else "")
+                lines.append(f"{full_name}_rate {metric.rate()}")
+            else:
+                _header(full_name, metric.kind, metric.help)
+                lines.append(f"{full_name} {metric.value}")
+        return "\n".join(lines) + "\n"
+
+    def write_snapshot(self, path: Path) -> None:
+        """Atomically write a JSON (``.json``) or Prometheus text dump."""
+        path = Path(path)
+        content = self.to_json() if path.suffix.lower() == ".json" else self.to_prometheus()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        tmp_path.write_text(content, encoding="utf-8")
+        os.replace(tmp_path, path)
+
+    def start_file_exporter(self, path: Path, interval: float = 15.0) -> threading.Thread:
+        """Periodically dump metrics to ``path`` (textfile-collector style)."""
+
+        def _loop():
+            while True:
+                try:
+                    self.write_snapshot(path)
+                except OSError:
+                    pass
+                time.sleep(interval)
+
+        thread = threading.Thread(target=_loop, name="metrics-exporter", daemon=True)
+        thread.start()
+        return thread
+
+
+metrics = MetricsRegistry()
+
+
+def start_exporter_from_env() -> None:
+    """Start the file exporter when ``BIYOVES_METRICS_FILE`` is set."""
+    target = os.getenv("BIYOVES_METRICS_FILE", "").strip()
+    if not target:
+        return
+    try:
+        interval = float(os.getenv("BIYOVES_METRICS_INTERVAL", "15"))
+    except ValueError:
+        interval = 15.0
+    metrics.start_file_exporter(Path(target), interval)
@@ -1,8 +1,9 @@
 # Services package
 
 from app.services.email_service import email_sender
-from app.services.photo_processor import PhotoProcessor, PhotoJob, PhotoResult, PhotoProcessingError
-from app.services.processing_workers import SinglePhotoWorker, BatchPhotoWorker
+from app.services.photo_processor import PhotoProcessor, PhotoJob, PhotoResult, PhotoProcessingError, InputRejectedError
+from app.services.isolated_engine import JobTimeoutError
+from app.services.processing_workers import SinglePhotoWorker, SpeculativeWorker, BatchPhotoWorker
 from app.services.credit_service import credit_service
 
 __all__ = [
@@ -11,7 +12,10 @@ __all__ = [
     'PhotoJob',
     'PhotoResult',
     'PhotoProcessingError',
+    'InputRejectedError',
+    'JobTimeoutError',
     'SinglePhotoWorker',
+    'SpeculativeWorker',
     'BatchPhotoWorker',
     'credit_service'
 ]
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+
+"""Motor havuzunun eşzamanlılığını ölçülen verime göre ayarlayan otomatik ayarlayıcı"""
+
+from __future__ import annotations
+
+import json
+import os
+import platform
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from app.logger import logger
+from app.metrics import metrics
+from app.services.memory_governor import MemoryGovernor, memory_governor, system_memory
+
+# Yeni seviye ancak verimi bu orandan fazla artırırsa benimsenir
+MIN_GAIN = 0.05
+# Kararlı durumda her bu kadar ölçümde bir üst seviye yeniden denenir
+REPROBE_WINDOWS = 8
+MIN_WINDOW_JOBS = 4
+
+
+def default_tuning_path() -> Path:
+    return Path.home() / ".biyoves" / "autotune.json"
+
+
+def _on_battery() -> bool:
+    try:
+        import psutil
+    except ImportError:
+        return False
+    try:
+        battery = psutil.sensors_battery()
+    except Exception:  # noqa: BLE001
+        return False
+    return bool(battery is not None and not battery.power_plugged)
+
+
+def machine_key() -> str:
+    """Makineyi ve güç durumunu tanımlayan anahtar; her biri için ayrı değer öğrenilir."""
+    memory = system_memory()
+    total_gb = round(memory[1] / 1024 ** 3) if memory else 0
+    power = "battery" if _on_battery() else "ac"
+    return f"{platform.node()}|{platform.machine()}|{os.cpu_count() or 0}cpu|{total_gb}gb|{power}"
+
+
+class ConcurrencyTuner:
+    """Tepe tırmanma ile en yüksek verimi veren eşzamanlılığı arar.
+
+    Havuz ``max_limit`` süreçle açılır; ayarlayıcı aynı anda kaç işin
+    verileceğini (``limit``) belirler. Her seviyede, önceki seviyeden
+    kalan işler boşaldıktan sonra ``limit * 2`` tamamlanan iş üzerinden
+    verim ölçülür. Verim artmaya devam ettikçe seviye yükseltilir, artış
+    durunca en iyi seviyeye dönülür. Bellek azaldığında seviye düşürülür
+    ve o seviyenin üstü denenmez. En iyi değer makine başına saklanır ve
+    sonraki oturum oradan başlar.
+    """
+
+    def __init__(
+        self,
+        max_limit: int,
+        min_limit: int = 1,
+        store_path: Optional[Path] = None,
+        governor: Optional[MemoryGovernor] = None,
+        key: Optional[str] = None,
+    ):
+        self.max_limit = max(1, max_limit)
+        self.min_limit = max(1, min(min_limit, self.max_limit))
+        self.store_path = Path(store_path) if store_path else default_tuning_path()
+        self.governor = governor or memory_governor
+        self.key = key or machine_key()
+        self._lock = threading.Lock()
+        self._rates: Dict[int, float] = {}
+        self._ceiling = self.max_limit
+        self._direction = 1
+        self._settled = False
+        self._windows_since_probe = 0
+        self._best_saved: Optional[int] = None
+
+        stored = self._load().get(self.key, {})
+        start = stored.get("concurrency")
+        if isinstance(start, int):
+            self._best_saved = start
+            self._settled = True
+        else:
+            start = min(2, self.max_limit)
+        self._limit = self._clamp(start)
+        self._start_window()
+
+    @property
+    def limit(self) -> int:
+        return self._limit
+
+    @property
+    def best(self) -> int:
+        if not self._rates:
+            return self._limit
+        return max(self._rates, key=self._rates.get)
+
+    def record(self, completed: int = 1) -> None:
+        """Tamamlanan (başarılı ya da başarısız) işleri bildirir."""
+        with self._lock:
+            if self._skip > 0:
+                self._skip -= completed
+                if self._skip <= 0:
+                    self._window_started = time.perf_counter()
+                return
+            self._window_done += completed
+            if self._window_done < self._window_jobs:
+                return
+            elapsed = time.perf_counter() - self._window_started
+            if elapsed > 0:
+                self._evaluate(self._window_done / elapsed)
+            self._start_window()
+
+    def close(self) -> None:
+        """Öğrenilen en iyi değeri kaydeder."""
+        with self._lock:
+            if self._rates:
+                self._save(self.best)
+
+    def _evaluate(self, rate: float) -> None:
+        level = self._limit
+        previous = self._rates.get(level)
+        # Aynı seviyenin eski ölçümleriyle yumuşatılır; tek bir yavaş girdi kararı bozmasın
+        self._rates[level] = rate if previous is None else previous * 0.5 + rate * 0.5
+        metrics.gauge("autotune_throughput", "Güncel seviyede ölçülen iş/sn").set(self._rates[level])
+
+        if self.governor.low_memory:
+            self._ceiling = max(self.min_limit, level - 1)
+            self._settled = True
+            self._move(self._ceiling, "bellek azaldı")
+            return
+
+        if self._settled:
+            self._windows_since_probe += 1
+            if self._windows_since_probe >= REPROBE_WINDOWS and level < self._ceiling:
+                self._windows_since_probe = 0
+                self._direction = 1
+                self._settled = False
+                self._move(level + 1, "yeniden deneme")
+            return
+
+        target = level + self._direction
+        neighbour_rate = self._rates.get(level - self._direction)
+        if neighbour_rate is not None and self._rates[level] < neighbour_rate * (1 + MIN_GAIN):
+            # Son adım kazanç getirmedi: en iyi seviyeye dönülür
+            self._settled = True
+            self._windows_since_probe = 0
+            self._move(self.best, "en iyi seviye")
+            self._save(self.best)
+            return
+        if target < self.min_limit or target > self._ceiling:
+            self._settled = True
+            self._save(self.best)
+            return
+        self._move(target, "verim arttı" if neighbour_rate is not None else "ilk ölçüm")
+
+    def _move(self, level: int, reason: str) -> None:
+        level = self._clamp(level)
+        if level != self._limit:
+            logger.info("Eşzamanlılık %d -> %d (%s)", self._limit, level, reason)
+            self._limit = level
+        metrics.gauge("autotune_concurrency", "Otomatik ayarlanan eşzamanlı iş sayısı").set(self._limit)
+
+    def _start_window(self) -> None:
+        # Önceki seviyeden kalan işler bitene kadar ölçüm başlamaz
+        self._skip = self._limit
+        self._window_done = 0
+        self._window_jobs = max(MIN_WINDOW_JOBS, self._limit * 2)
+        self._window_started = time.perf_counter()
+
+    def _clamp(self, level: int) -> int:
+        return max(self.min_limit, min(level, self._ceiling))
+
+    def _load(self) -> Dict[str, Dict]:
+        try:
+            data = json.loads(self.store_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def _save(self, level: int) -> None:
+        if level == self._best_saved:
+            return
+        data = self._load()
+        data[self.key] = {
+            "concurrency": level,
+            "throughput": round(self._rates.get(level, 0.0), 4),
+            "updated_at": time.time(),
+        }
+        try:
+            self.store_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.store_path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+            os.replace(tmp_path, self.store_path)
+        except OSError as exc:
+            logger.warning("Ayar kaydedilemedi: %s", exc)
+            return
+        self._best_saved = level
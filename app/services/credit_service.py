@@ -5,6 +5,7 @@
 from typing import Tuple
 
 from app.config import firebase_manager
+from app.metrics import metrics
 
 
 class CreditService:
@@ -15,19 +16,22 @@ class CreditService:
         if not user_id or amount <= 0:
             return False, 0, "Geçersiz parametre"
         try:
-            return firebase_manager.use_credits(user_id, amount)
+            with metrics.span("credit_charge"):
+                return firebase_manager.use_credits(user_id, amount)
         except Exception as exc:  # noqa: BLE001
             return False, 0, str(exc)
 
     def refund_credit(self, user_id: str, reason: str = "İşlem başarısız - iade") -> Tuple[bool, int, str]:
         if not user_id:
             return False, 0, "Kullanıcı bulunamadı"
+        metrics.counter("credit_refunds_total", "Başarısız işlemler için yapılan iadeler").inc()
         try:
-            success, message, new_credits = firebase_manager.add_credits_to_user(
-                user_id,
-                1,
-                reason=reason,
-            )
+            with metrics.span("credit_refund"):
+                success, message, new_credits = firebase_manager.add_credits_to_user(
+                    user_id,
+                    1,
+                    reason=reason,
+                )
             return success, new_credits, message
         except Exception as exc:  # noqa: BLE001
             return False, firebase_manager.get_user_credits(user_id), str(exc)
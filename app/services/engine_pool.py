@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+
+"""Ayrı süreçlerde çalışan BiyoVes motor havuzu"""
+
+from __future__ import annotations
+
+import os
+import queue
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Union
+
+from app.services.isolated_engine import DEFAULT_JOB_TIMEOUT, IsolatedEngine
+from app.services.output_profiles import OutputProfile
+from app.services.photo_processor import PhotoJob, PhotoResult
+
+
+def default_worker_count() -> int:
+    return max(1, (os.cpu_count() or 2) - 1)
+
+
+class EnginePool:
+    """Her biri kalıcı bir ``PhotoProcessor`` tutan motor süreçlerinden oluşan havuz.
+
+    GIL nedeniyle thread'lerle paralelleşmeyen motor çağrıları ayrı
+    süreçlerde çalışır; süreçler ilk işten sonra sıcak kalır. Her iş
+    ``job_timeout`` saniyeyle sınırlıdır: süreyi aşan iş yalnızca kendi
+    sürecini öldürür, future'ı ``JobTimeoutError`` ile biter ve o süreç
+    yenisiyle değiştirilir; diğer süreçler çalışmaya devam eder.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        base_output_dir: Optional[Path] = None,
+        output_profile: Optional[Union[str, OutputProfile]] = None,
+        job_timeout: float = DEFAULT_JOB_TIMEOUT,
+    ):
+        self.max_workers = max_workers or default_worker_count()
+        self._engines: List[IsolatedEngine] = [
+            IsolatedEngine(base_output_dir, output_profile, timeout=job_timeout) for _ in range(self.max_workers)
+        ]
+        # Son bırakılan (sıcak) motor önce alınır; ayarlayıcı eşzamanlılığı düşük tuttuğunda
+        # kullanılmayan süreçler hiç başlatılmaz ve model yüklemez
+        self._idle: "queue.LifoQueue[IsolatedEngine]" = queue.LifoQueue()
+        for engine in reversed(self._engines):
+            self._idle.put(engine)
+        # Her thread iş süresince bir motor sürecini ödünç alır ve yanıtını bekler
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="biyoves-engine")
+
+    def submit(self, job: PhotoJob) -> "Future[PhotoResult]":
+        return self._executor.submit(self._run_job, job)
+
+    def _run_job(self, job: PhotoJob) -> PhotoResult:
+        engine = self._idle.get()
+        try:
+            return engine.run(job)
+        finally:
+            self._idle.put(engine)
+
+    def warm_up(self) -> None:
+        """Tüm süreçleri şimdi başlatır; ilk iş motor yükleme süresini beklemez."""
+        futures = [self._executor.submit(engine.warm_up) for engine in self._engines]
+        for future in futures:
+            future.result()
+
+    def shutdown(self, wait: bool = True, cancel_pending: bool = False) -> None:
+        self._executor.shutdown(wait=wait, cancel_futures=cancel_pending)
+        for engine in self._engines:
+            engine.close()
+
+    def __enter__(self) -> "EnginePool":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.shutdown()
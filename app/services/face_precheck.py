@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+
+"""Kredi düşülmeden önce girdide yüz olup olmadığını hızlıca denetleyen ön kontrol"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from PIL import Image, ImageOps
+
+from app.logger import logger
+from app.metrics import metrics
+from app.services.input_buffer import InputBuffer
+
+try:
+    import cv2
+    import numpy as np
+except ImportError:  # pragma: no cover - OpenCV isteğe bağlıdır
+    cv2 = None
+    np = None
+
+# Algılama bu uzun kenara küçültülmüş gri görüntüde yapılır
+DETECT_SIZE = 320
+# Bundan küçük girdilerden baskı kalitesinde fotoğraf çıkmaz
+MIN_INPUT_SIDE = 240
+# Vesikalık karelerde yüz büyüktür; kısa kenarın en az bu oranı kadar aranır
+MIN_FACE_FRACTION = 0.12
+# Önce varsayılan kaskat denenir; yüz bulunamazsa daha hoşgörülü ikinci geçiş yapılır
+CASCADES = (("haarcascade_frontalface_default.xml", 4), ("haarcascade_frontalface_alt2.xml", 3))
+
+
+@dataclass(frozen=True)
+class PrecheckResult:
+    ok: bool
+    reason: str = ""
+    faces: Optional[int] = None
+    elapsed: float = 0.0
+
+
+class FacePrecheck:
+    """Düşük çözünürlükte Haar kaskatlarıyla yüz arar.
+
+    Yalnızca umutsuz girdiler reddedilir: çözülemeyen ya da çok küçük
+    görüntüler. Yüz bulunamaması yalnızca uyarıdır; sonuç ``faces=0`` ve
+    bir nedenle geçer, çünkü kaskatlar eğik ya da kısmen kapalı yüzleri
+    kaçırabilir. OpenCV yüklü değilse, algılama ``BIYOVES_FACE_PRECHECK=0``
+    ile kapatılmışsa ya da beklenmedik biçimde başarısız olursa girdi yine
+    geçer; son karar motorundur.
+    """
+
+    def __init__(
+        self,
+        detect_size: int = DETECT_SIZE,
+        min_input_side: int = MIN_INPUT_SIDE,
+        detect_faces: Optional[bool] = None,
+    ):
+        self.detect_size = detect_size
+        self.min_input_side = min_input_side
+        if detect_faces is None:
+            detect_faces = os.getenv("BIYOVES_FACE_PRECHECK", "1") != "0"
+        self.detect_faces = detect_faces
+        # CascadeClassifier thread'ler arasında paylaşılamaz
+        self._local = threading.local()
+
+    @property
+    def detector_available(self) -> bool:
+        # OpenCV 5 Haar kaskatlarını ana paketten çıkardı
+        return cv2 is not None and hasattr(cv2, "CascadeClassifier")
+
+    def check(self, source: InputBuffer) -> PrecheckResult:
+        started = time.perf_counter()
+        with metrics.span("photo_precheck"):
+            result = self._check(source)
+        result = PrecheckResult(result.ok, result.reason, result.faces, time.perf_counter() - started)
+        if not result.ok:
+            metrics.counter("precheck_rejected_total", "Ön kontrolde reddedilen girdiler").inc()
+        elif result.faces == 0:
+            metrics.counter("precheck_no_face_total", "Ön kontrolde yüz bulunamayan ama geçirilen girdiler").inc()
+            logger.info("Ön kontrolde yüz bulunamadı, karar motora bırakıldı: %s", source.path)
+        return result
+
+    def _check(self, source: InputBuffer) -> PrecheckResult:
+        try:
+            width, height = source.probe().size
+        except Exception:  # noqa: BLE001
+            return PrecheckResult(False, "Görüntü okunamadı")
+        if min(width, height) < self.min_input_side:
+            return PrecheckResult(False, f"Görüntü çok küçük ({width}x{height})")
+        if not (self.detect_faces and self.detector_available):
+            return PrecheckResult(True)
+
+        try:
+            gray = self._load_gray(source)
+        except Exception:  # noqa: BLE001
+            return PrecheckResult(False, "Görüntü okunamadı")
+        try:
+            faces = self._detect(gray)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Yüz ön kontrolü yapılamadı: %s", exc)
+            return PrecheckResult(True)
+        if faces == 0:
+            return PrecheckResult(True, "Fotoğrafta yüz bulunamadı", faces=0)
+        return PrecheckResult(True, faces=faces)
+
+    def _load_gray(self, source: InputBuffer) -> "np.ndarray":
+        with source.open_image() as image:
+            # JPEG'ler DCT ölçeklemesiyle doğrudan küçük çözülür
+            image.draft("L", (self.detect_size, self.detect_size))
+            working = ImageOps.exif_transpose(image).convert("L")
+            working.thumbnail((self.detect_size, self.detect_size), Image.Resampling.BILINEAR)
+            return np.asarray(working)
+
+    def _detect(self, gray: "np.ndarray") -> int:
+        equalized = cv2.equalizeHist(gray)
+        min_face = max(24, int(min(gray.shape[:2]) * MIN_FACE_FRACTION))
+        for index, (_, min_neighbors) in enumerate(CASCADES):
+            faces = self._cascade(index).detectMultiScale(
+                equalized,
+                scaleFactor=1.15,
+                minNeighbors=min_neighbors,
+                minSize=(min_face, min_face),
+            )
+            if len(faces):
+                return len(faces)
+        return 0
+
+    def _cascade(self, index: int) -> "cv2.CascadeClassifier":
+        cascades: Optional[Dict[int, "cv2.CascadeClassifier"]] = getattr(self._local, "cascades", None)
+        if cascades is None:
+            cascades = self._local.cascades = {}
+        cascade = cascades.get(index)
+        if cascade is None:
+            cascade = cv2.CascadeClassifier(cv2.data.haarcascades + CASCADES[index][0])
+            if cascade.empty():
+                raise RuntimeError(f"Haar kaskatı yüklenemedi: {CASCADES[index][0]}")
+            cascades[index] = cascade
+        return cascade
+
+
+face_precheck = FacePrecheck()
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+
+"""Sıcak klasör izleme: klasöre düşen fotoğrafları yazımı bitince teslim eder"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from app.logger import logger
+from app.utils.file_validation import ALLOWED_EXTENSIONS, validate_image_file
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # pragma: no cover - watchdog isteğe bağlı
+    FileSystemEventHandler = object
+    Observer = None
+
+DEFAULT_SETTLE_SECONDS = 0.4
+DEFAULT_POLL_INTERVAL = 0.2
+TEMP_SUFFIXES = {".part", ".tmp", ".crdownload", ".partial"}
+
+
+def mirror_output_path(source_root: Path, input_path: Path, output_root: Path, photo_type: str, layout_type: str) -> Path:
+    """Girdinin kaynak kökteki göreli konumunu çıkış kökünde yansıtır."""
+    try:
+        relative_dir = input_path.parent.relative_to(source_root)
+    except ValueError:
+        relative_dir = Path()
+    return output_root / relative_dir / f"{input_path.stem}_{photo_type}_{layout_type}.jpg"
+
+
+class _EventHandler(FileSystemEventHandler):
+    def __init__(self, watcher: "HotFolderWatcher"):
+        super().__init__()
+        self._watcher = watcher
+
+    def on_created(self, event):
+        if not event.is_directory:
+            self._watcher._notify(Path(event.src_path))
+
+    def on_modified(self, event):
+        if not event.is_directory:
+            self._watcher._notify(Path(event.src_path))
+
+    def on_moved(self, event):
+        if not event.is_directory:
+            self._watcher._notify(Path(event.dest_path))
+
+
+class HotFolderWatcher:
+    """Bir dizini izler ve yazımı tamamlanmış yeni fotoğrafları döndürür.
+
+    ``watchdog`` kuruluysa işletim sistemi bildirimleri (inotify,
+    ReadDirectoryChangesW, FSEvents) kullanılır; değilse yalnızca
+    değiştirme zamanı değişen dizinler yeniden listelenir. Bir dosya,
+    boyutu ve değiştirme zamanı ``settle_seconds`` boyunca sabit kalıp
+    okunabilir olduğunda hazır sayılır.
+    """
+
+    def __init__(
+        self,
+        source_dir: Path,
+        ignore_dirs: Iterable[Path] = (),
+        settle_seconds: float = DEFAULT_SETTLE_SECONDS,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        process_existing: bool = False,
+    ):
+        self.source_dir = Path(source_dir).resolve()
+        self.ignore_dirs = [Path(path).resolve() for path in ignore_dirs]
+        self.settle_seconds = settle_seconds
+        self.poll_interval = poll_interval
+        self.process_existing = process_existing
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._pending: Dict[Path, Tuple[int, int, float]] = {}
+        self._seen: Set[Path] = set()
+        self._dir_mtimes: Dict[Path, int] = {}
+        self._observer = None
+
+    @property
+    def uses_notifications(self) -> bool:
+        return self._observer is not None
+
+    def start(self) -> None:
+        for path in self._scan_all():
+            if self.process_existing:
+                self._pending[path] = (-1, -1, 0.0)
+            else:
+                self._seen.add(path)
+        if Observer is not None:
+            try:
+                observer = Observer()
+                observer.schedule(_EventHandler(self), str(self.source_dir), recursive=True)
+                observer.start()
+                self._observer = observer
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("Dosya sistemi bildirimleri kullanılamıyor, yoklamaya geçiliyor: %s", exc)
+
+    def stop(self) -> None:
+        observer, self._observer = self._observer, None
+        if observer is not None:
+            observer.stop()
+            observer.join()
+        self._wakeup.set()
+
+    def wait_ready(self, timeout: Optional[float] = None) -> List[Path]:
+        """Hazır dosyaları döndürür; yoksa en fazla ``timeout`` saniye bekler."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            if self._observer is None:
+                self._rescan_changed_dirs()
+            ready = self._collect_ready()
+            if ready:
+                return ready
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return []
+            wait_for = self.poll_interval if remaining is None else min(self.poll_interval, remaining)
+            self._wakeup.wait(wait_for)
+            self._wakeup.clear()
+
+    def _notify(self, path: Path) -> None:
+        if not self._is_candidate(path):
+            return
+        with self._lock:
+            if path not in self._seen and path not in self._pending:
+                self._pending[path] = (-1, -1, 0.0)
+        self._wakeup.set()
+
+    def _is_candidate(self, path: Path) -> bool:
+        name = path.name
+        if name.startswith((".", "~")):
+            return False
+        suffix = path.suffix.lower()
+        if suffix in TEMP_SUFFIXES or suffix not in ALLOWED_EXTENSIONS:
+            return False
+        return not any(ignored == path or ignored in path.parents for ignored in self.ignore_dirs)
+
+    def _scan_all(self) -> List[Path]:
+        found: List[Path] = []
+        stack = [self.source_dir]
+        while stack:
+            directory = stack.pop()
+            if any(ignored == directory for ignored in self.ignore_dirs):
+                continue
+            try:
+                self._dir_mtimes[directory] = directory.stat().st_mtime_ns
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(Path(entry.path))
+                        elif self._is_candidate(Path(entry.path)):
+                            found.append(Path(entry.path))
+            except OSError:
+                continue
+        return found
+
+    def _rescan_changed_dirs(self) -> None:
+        """Yoklama modu: yalnızca içeriği değişen dizinleri yeniden listeler."""
+        changed = False
+        for directory, mtime in list(self._dir_mtimes.items()):
+            try:
+                current = directory.stat().st_mtime_ns
+            except OSError:
+                self._dir_mtimes.pop(directory, None)
+                continue
+            if current != mtime:
+                changed = True
+                break
+        if not changed:
+            return
+        for path in self._scan_all():
+            self._notify(path)
+
+    def _collect_ready(self) -> List[Path]:
+        now = time.monotonic()
+        ready: List[Path] = []
+        with self._lock:
+            pending = list(self._pending.items())
+        for path, (size, mtime_ns, since) in pending:
+            try:
+                stat = path.stat()
+            except OSError:
+                with self._lock:
+                    self._pending.pop(path, None)
+                continue
+            signature = (stat.st_size, stat.st_mtime_ns)
+            if signature != (size, mtime_ns):
+                with self._lock:
+                    self._pending[path] = (*signature, now)
+                continue
+            if stat.st_size == 0 or now - since < self.settle_seconds or not self._can_open(path):
+                continue
+            with self._lock:
+                self._pending.pop(path, None)
+                self._seen.add(path)
+            is_valid, message = validate_image_file(path)
+            if not is_valid:
+                logger.warning("Sıcak klasör dosyası atlandı (%s): %s", path.name, message)
+                continue
+            ready.append(path)
+        return ready
+
+    @staticmethod
+    def _can_open(path: Path) -> bool:
+        # Windows'ta yazan uygulama dosyayı kilitli tutuyorsa açılamaz
+        try:
+            with open(path, "rb") as handle:
+                handle.read(1)
+        except OSError:
+            return False
+        return True
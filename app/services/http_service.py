@@ -0,0 +1,445 @@
+#!/usr/bin/env python3
+
+"""Yerel ağ için HTTP işleme servisi.
+
+Ön büro bilgisayarları fotoğrafı bu servise gönderir, ağır motor işi
+servisin çalıştığı makinedeki süreç havuzunda yapılır. İnternet
+gerektirmez; yalnızca kredi işlemleri Firebase'e gider.
+
+Uç noktalar::
+
+    POST /jobs?photo_type=biyometrik&layout=2li&filename=a.jpg&priority=0   (gövde: görüntü)
+    GET  /jobs?state=failed         son işler
+    GET  /jobs/<id>?wait=30         durum (bitene kadar en fazla 30 sn bekler)
+    GET  /jobs/<id>/events          durum değişiklikleri (JSON satırları)
+    GET  /jobs/<id>/result          çıktı dosyası
+    GET  /metrics                   Prometheus metrikleri
+    GET  /health
+"""
+
+from __future__ import annotations
+
+import hmac
+import ipaddress
+import json
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from app.logger import logger
+from app.metrics import metrics
+from app.services.credit_service import credit_service
+from app.services.engine_pool import EnginePool
+from app.services.face_precheck import face_precheck
+from app.services.input_buffer import InputBuffer
+from app.services.job_queue import (
+    DEFAULT_MAX_ATTEMPTS,
+    STATE_DONE,
+    STATE_FAILED,
+    STATE_QUEUED,
+    JobQueue,
+    QueuedJob,
+    new_worker_id,
+)
+from app.services.output_profiles import OUTPUT_PROFILES
+from app.services.photo_processor import LAYOUT_ALIASES, PHOTO_TYPE_ALIASES, PhotoJob, PhotoProcessingError
+from app.utils.file_validation import ALLOWED_EXTENSIONS, MAX_FILE_SIZE, validate_image_file
+
+DEFAULT_PORT = 8765
+DEFAULT_MAX_QUEUED = 200
+MAX_WAIT_SECONDS = 60.0
+USER_HEADER = "X-BiyoVes-User"
+
+_JOB_PATH = re.compile(r"^/jobs/([0-9a-f]{32})(/result|/events)?$")
+
+
+class ServiceError(Exception):
+    """İstemciye HTTP durum koduyla döndürülecek hata"""
+
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def is_loopback_host(host: str) -> bool:
+    if host.lower() == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def _check_bind(host: str, token: str) -> None:
+    # Anahtarsız servis herkesin başka kullanıcı adına iş gönderip çıktıları indirmesine izin verir
+    if not token and not is_loopback_host(host):
+        raise ValueError(f"{host} adresinde dinlemek için erişim anahtarı gerekli (--token / BIYOVES_SERVICE_TOKEN)")
+
+
+def _number_param(params: Dict[str, str], name: str, default: str, cast):
+    try:
+        return cast(params.get(name, default) or default)
+    except ValueError as exc:
+        raise ServiceError(HTTPStatus.BAD_REQUEST, f"Geçersiz {name} değeri") from exc
+
+
+class ProcessingService:
+    """İşleri kabul eder, kredi düşer ve kalıcı kuyruktan motor havuzuna dağıtır.
+
+    Kuyruk ``spool/jobs.sqlite3`` içindedir; servis yeniden başladığında
+    kirası dolan yarım işler kendiliğinden yeniden alınır.
+    """
+
+    def __init__(
+        self,
+        spool_dir: Path,
+        max_workers: Optional[int] = None,
+        default_user_id: str = "",
+        max_queued: int = DEFAULT_MAX_QUEUED,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    ):
+        spool_dir = Path(spool_dir)
+        self.inputs_dir = spool_dir / "inputs"
+        self.outputs_dir = spool_dir / "outputs"
+        for directory in (self.inputs_dir, self.outputs_dir):
+            directory.mkdir(parents=True, exist_ok=True)
+        self.queue = JobQueue(spool_dir / "jobs.sqlite3")
+        self.default_user_id = default_user_id
+        self.max_queued = max_queued
+        self.max_attempts = max_attempts
+        self.owner = new_worker_id("http")
+        self.pool = EnginePool(max_workers=max_workers, base_output_dir=self.outputs_dir)
+        self._slots = threading.BoundedSemaphore(self.pool.max_workers)
+        self._changed = threading.Condition()
+        self._stopping = False
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, name="http-service-dispatch", daemon=True)
+
+    def start(self) -> None:
+        self.pool.warm_up()
+        self._dispatcher.start()
+
+    def stop(self) -> None:
+        with self._changed:
+            self._stopping = True
+            self._changed.notify_all()
+        self._dispatcher.join(timeout=5)
+        self.pool.shutdown(wait=True)
+
+    def submit(self, data: bytes, filename: str, params: Dict[str, str], user_id: str) -> QueuedJob:
+        """Görüntüyü spool'a yazar, krediyi düşer ve işi kuyruğa ekler."""
+        user_id = user_id or self.default_user_id
+        if not user_id:
+            raise ServiceError(HTTPStatus.UNAUTHORIZED, f"Kullanıcı kimliği gerekli ({USER_HEADER} başlığı)")
+        photo_type = params.get("photo_type", "biyometrik")
+        layout_type = params.get("layout", "2li")
+        profile = params.get("profile") or None
+        if photo_type.lower() not in PHOTO_TYPE_ALIASES:
+            raise ServiceError(HTTPStatus.BAD_REQUEST, f"Geçersiz fotoğraf tipi: {photo_type}")
+        if layout_type.lower() not in LAYOUT_ALIASES:
+            raise ServiceError(HTTPStatus.BAD_REQUEST, f"Geçersiz düzen tipi: {layout_type}")
+        if profile and profile not in OUTPUT_PROFILES and profile != "default":
+            raise ServiceError(HTTPStatus.BAD_REQUEST, f"Bilinmeyen çıktı profili: {profile}")
+        if self.queue.count_active() >= self.max_queued:
+            raise ServiceError(HTTPStatus.SERVICE_UNAVAILABLE, "İş kuyruğu dolu, daha sonra tekrar deneyin")
+        try:
+            priority = int(params.get("priority", "0"))
+        except ValueError as exc:
+            raise ServiceError(HTTPStatus.BAD_REQUEST, "Geçersiz öncelik") from exc
+
+        suffix = Path(filename).suffix.lower() or ".jpg"
+        stem = Path(filename).stem or "photo"
+        input_path = self.inputs_dir / f"{uuid.uuid4().hex}{suffix}"
+        input_path.write_bytes(data)
+        is_valid, message = validate_image_file(input_path)
+        if not is_valid:
+            input_path.unlink(missing_ok=True)
+            raise ServiceError(HTTPStatus.BAD_REQUEST, message)
+        # Okunamayan ya da çok küçük girdi kredi düşülmeden geri çevrilir
+        precheck = face_precheck.check(InputBuffer(input_path, data, input_path.stat()))
+        if not precheck.ok:
+            input_path.unlink(missing_ok=True)
+            raise ServiceError(HTTPStatus.UNPROCESSABLE_ENTITY, precheck.reason)
+
+        success, new_credits, message = credit_service.use_credit(user_id)
+        if not success:
+            input_path.unlink(missing_ok=True)
+            raise ServiceError(HTTPStatus.PAYMENT_REQUIRED, message or "Yetersiz kredi")
+
+        job = PhotoJob(
+            input_path=input_path,
+            photo_type=photo_type,
+            layout_type=layout_type,
+            output_path=self.outputs_dir / f"{stem}_{photo_type}_{layout_type}.jpg",
+            output_profile=profile,
+        )
+        job_id = self.queue.enqueue(
+            job,
+            priority=priority,
+            user_id=user_id,
+            max_attempts=self.max_attempts,
+            extra={"filename": filename, "credits_left": new_credits},
+        )
+        metrics.counter("http_jobs_submitted_total", "HTTP servisine gönderilen işler").inc()
+        self._notify()
+        return self.queue.get(job_id)
+
+    def wait_for_change(self, job_id: str, known_state: str, timeout: float) -> Optional[QueuedJob]:
+        """Durum ``known_state``'ten farklı olana ya da süre dolana kadar bekler."""
+        deadline = time.monotonic() + timeout
+        while True:
+            queued = self.queue.get(job_id)
+            remaining = deadline - time.monotonic()
+            if queued is None or queued.state != known_state or remaining <= 0:
+                return queued
+            # Kuyruğu başka bir süreç de tüketebilir; bu yüzden kısa aralıklarla yeniden okunur
+            with self._changed:
+                self._changed.wait(min(remaining, 0.5))
+
+    def _notify(self) -> None:
+        with self._changed:
+            self._changed.notify_all()
+
+    def _dispatch_loop(self) -> None:
+        while not self._stopping:
+            # Havuzdaki süreç sayısı kadar iş aynı anda çalışır; fazlası kuyrukta bekler
+            if not self._slots.acquire(timeout=0.5):
+                continue
+            try:
+                claimed = self.queue.claim(self.owner, limit=1)
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("Kuyruktan iş alınamadı: %s", exc)
+                claimed = []
+            if not claimed:
+                self._slots.release()
+                with self._changed:
+                    if not self._stopping:
+                        self._changed.wait(0.5)
+                continue
+            queued = claimed[0]
+            metrics.gauge("http_jobs_queued", "HTTP servisinde sırada bekleyen işler").set(
+                self.queue.counts().get(STATE_QUEUED, 0)
+            )
+            self._notify()
+            try:
+                future = self.pool.submit(queued.job)
+            except Exception as exc:  # noqa: BLE001
+                self._slots.release()
+                self._finish_failed(queued, exc)
+                continue
+            future.add_done_callback(lambda done, queued=queued: self._on_job_done(queued, done))
+
+    def _on_job_done(self, queued: QueuedJob, future: Future) -> None:
+        self._slots.release()
+        try:
+            result = future.result()
+        except Exception as exc:  # noqa: BLE001
+            self._finish_failed(queued, exc)
+            return
+        self.queue.complete(queued.id, self.owner, result.output_path)
+        self._discard_input(queued)
+        metrics.counter("http_jobs_succeeded_total", "HTTP servisinde tamamlanan işler").inc()
+        self._notify()
+
+    def _finish_failed(self, queued: QueuedJob, exc: Exception) -> None:
+        message = str(exc) if isinstance(exc, PhotoProcessingError) else f"{type(exc).__name__}: {exc}"
+        logger.warning("Servis işi başarısız (%s, deneme %d): %s", queued.id, queued.attempts, message)
+        state = self.queue.fail(queued.id, self.owner, message)
+        if state == STATE_FAILED:
+            # Kredi yalnızca tüm denemeler tükenince iade edilir
+            refund_success, refund_credits, _ = credit_service.refund_credit(queued.user_id)
+            if refund_success:
+                self.queue.update_extra(queued.id, credits_left=refund_credits)
+            self._discard_input(queued)
+            metrics.counter("http_jobs_failed_total", "HTTP servisinde başarısız olan işler").inc()
+        self._notify()
+
+    @staticmethod
+    def _discard_input(queued: QueuedJob) -> None:
+        try:
+            Path(queued.job.input_path).unlink()
+        except OSError:
+            pass
+
+
+def _public_view(queued: QueuedJob) -> Dict[str, Any]:
+    view: Dict[str, Any] = {
+        "id": queued.id,
+        "state": queued.state,
+        "priority": queued.priority,
+        "photo_type": queued.job.photo_type,
+        "layout_type": queued.job.layout_type,
+        "profile": queued.job.output_profile,
+        "attempts": queued.attempts,
+        "created_at": queued.created_at,
+        "updated_at": queued.updated_at,
+        **queued.extra,
+    }
+    if queued.error:
+        view["error"] = queued.error
+    if queued.state == STATE_DONE:
+        view["result_url"] = f"/jobs/{queued.id}/result"
+    return view
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    server_version = "BiyoVesService/1.0"
+    service: ProcessingService
+    token: str = ""
+
+    def log_message(self, format: str, *args) -> None:  # noqa: A002
+        logger.debug("HTTP %s - %s", self.address_string(), format % args)
+
+    def do_GET(self) -> None:  # noqa: N802
+        self._dispatch(self._handle_get)
+
+    def do_POST(self) -> None:  # noqa: N802
+        self._dispatch(self._handle_post)
+
+    def _dispatch(self, handler) -> None:
+        try:
+            if self.token and not hmac.compare_digest(
+                self.headers.get("Authorization", "").encode("utf-8"), f"Bearer {self.token}".encode("utf-8")
+            ):
+                raise ServiceError(HTTPStatus.UNAUTHORIZED, "Geçersiz erişim anahtarı")
+            url = urlsplit(self.path)
+            params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+            handler(url.path.rstrip("/") or "/", params)
+        except ServiceError as exc:
+            self._send_json(exc.status, {"error": str(exc)})
+        except Exception as exc:  # noqa: BLE001
+            logger.exception("HTTP isteği işlenemedi: %s", exc)
+            self._send_json(HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(exc)})
+
+    def _handle_post(self, path: str, params: Dict[str, str]) -> None:
+        if path != "/jobs":
+            raise ServiceError(HTTPStatus.NOT_FOUND, "Bulunamadı")
+        length = int(self.headers.get("Content-Length") or 0)
+        if length <= 0:
+            raise ServiceError(HTTPStatus.BAD_REQUEST, "Boş istek gövdesi")
+        if length > MAX_FILE_SIZE:
+            raise ServiceError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Dosya boyutu 10 MB limitini aşıyor.")
+        filename = Path(params.get("filename") or "photo.jpg").name
+        if Path(filename).suffix.lower() not in ALLOWED_EXTENSIONS:
+            raise ServiceError(HTTPStatus.BAD_REQUEST, f"Desteklenmeyen format: {Path(filename).suffix}")
+        data = self.rfile.read(length)
+        queued = self.service.submit(data, filename, params, self.headers.get(USER_HEADER, ""))
+        self._send_json(HTTPStatus.ACCEPTED, _public_view(queued), location=f"/jobs/{queued.id}")
+
+    def _handle_get(self, path: str, params: Dict[str, str]) -> None:
+        queue = self.service.queue
+        if path == "/health":
+            self._send_json(HTTPStatus.OK, {"status": "ok", "workers": self.service.pool.max_workers,
+                                            "jobs": queue.counts()})
+            return
+        if path == "/metrics":
+            self._send_bytes(HTTPStatus.OK, metrics.to_prometheus().encode("utf-8"), "text/plain; version=0.0.4")
+            return
+        if path == "/jobs":
+            limit = max(1, min(_number_param(params, "limit", "100", int), 1000))
+            jobs = queue.recent(limit, state=params.get("state") or None)
+            self._send_json(HTTPStatus.OK, {"jobs": [_public_view(queued) for queued in jobs]})
+            return
+
+        match = _JOB_PATH.match(path)
+        if not match:
+            raise ServiceError(HTTPStatus.NOT_FOUND, "Bulunamadı")
+        job_id, suffix = match.group(1), match.group(2)
+        queued = queue.get(job_id)
+        if queued is None:
+            raise ServiceError(HTTPStatus.NOT_FOUND, "İş bulunamadı")
+
+        if suffix == "/result":
+            self._send_result(queued)
+        elif suffix == "/events":
+            self._stream_events(queued)
+        else:
+            wait = min(_number_param(params, "wait", "0", float), MAX_WAIT_SECONDS)
+            if wait > 0 and not queued.is_terminal:
+                queued = self._wait_for_terminal(queued, wait)
+            self._send_json(HTTPStatus.OK, _public_view(queued))
+
+    def _wait_for_terminal(self, queued: QueuedJob, timeout: float) -> QueuedJob:
+        deadline = time.monotonic() + timeout
+        while not queued.is_terminal:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            queued = self.service.wait_for_change(queued.id, queued.state, remaining) or queued
+        return queued
+
+    def _stream_events(self, queued: QueuedJob) -> None:
+        # HTTP/1.0: bağlantı kapanana kadar her durum değişikliği bir JSON satırı
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        while True:
+            self.wfile.write((json.dumps(_public_view(queued), ensure_ascii=False) + "\n").encode("utf-8"))
+            self.wfile.flush()
+            if queued.is_terminal:
+                return
+            queued = self.service.wait_for_change(queued.id, queued.state, MAX_WAIT_SECONDS) or queued
+
+    def _send_result(self, queued: QueuedJob) -> None:
+        if queued.state != STATE_DONE or queued.result_path is None:
+            status = HTTPStatus.CONFLICT if not queued.is_terminal else HTTPStatus.GONE
+            raise ServiceError(status, queued.error or "İş henüz tamamlanmadı")
+        output_path = queued.result_path
+        if not output_path.exists():
+            raise ServiceError(HTTPStatus.GONE, "Çıktı dosyası artık mevcut değil")
+        content_type = {".png": "image/png", ".tif": "image/tiff", ".tiff": "image/tiff"}.get(
+            output_path.suffix.lower(), "image/jpeg"
+        )
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(output_path.stat().st_size))
+        self.send_header("Content-Disposition", f'attachment; filename="{output_path.name}"')
+        self.end_headers()
+        with open(output_path, "rb") as handle:
+            while True:
+                chunk = handle.read(1024 * 1024)
+                if not chunk:
+                    break
+                self.wfile.write(chunk)
+
+    def _send_json(self, status: HTTPStatus, payload: Dict[str, Any], location: str = "") -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self._send_bytes(status, body, "application/json; charset=utf-8", location)
+
+    def _send_bytes(self, status: HTTPStatus, body: bytes, content_type: str, location: str = "") -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        if location:
+            self.send_header("Location", location)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def create_server(service: ProcessingService, host: str, port: int, token: str = "") -> ThreadingHTTPServer:
+    """Servise bağlı, her isteği ayrı thread'de işleyen bir HTTP sunucusu döndürür.
+
+    Anahtar verilmemişse yalnızca loopback adresinde dinlenebilir.
+    """
+    _check_bind(host, token)
+    handler = type("BiyoVesRequestHandler", (_RequestHandler,), {"service": service, "token": token})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def serve(spool_dir: Path, host: str, port: int, max_workers: Optional[int], default_user_id: str = "",
+          token: str = "", max_queued: int = DEFAULT_MAX_QUEUED,
+          max_attempts: int = DEFAULT_MAX_ATTEMPTS) -> Tuple[ProcessingService, ThreadingHTTPServer]:
+    """Servisi başlatır; çağıran ``server.serve_forever()`` ile döngüyü çalıştırır."""
+    _check_bind(host, token)
+    service = ProcessingService(spool_dir, max_workers, default_user_id, max_queued, max_attempts)
+    service.start()
+    return service, create_server(service, host, port, token)
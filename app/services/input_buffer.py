@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+
+"""Girdi dosyasını tek okumada belleğe alan ve aşamalar arasında paylaşan tampon"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Tuple
+
+from PIL import Image
+
+from app.metrics import metrics
+
+
+@dataclass(frozen=True)
+class ImageProbe:
+    format: Optional[str]
+    size: Tuple[int, int]
+    mode: str
+
+
+class InputBuffer:
+    """Bir girdinin baytları; hash, başlık okuma ve çözme aynı tamponu kullanır.
+
+    Dosya tek bir okumayla ``bytes`` olarak alınır. ``bytes`` üzerinden
+    açılan ``BytesIO`` veriyi kopyalamaz; her aşama ayrı bir dosya açmadan
+    aynı belleği okur.
+    """
+
+    def __init__(self, path: Path, data: bytes, stat: os.stat_result):
+        self.path = Path(path)
+        self.data = data
+        self.stat = stat
+        self._digest: Optional[str] = None
+        self._probe: Optional[ImageProbe] = None
+
+    @classmethod
+    def load(cls, path: Path) -> "InputBuffer":
+        with metrics.span("photo_read"):
+            with open(path, "rb", buffering=0) as handle:
+                stat = os.fstat(handle.fileno())
+                # FileIO.readall tamponu dosya boyutuna göre bir kez ayırır ve
+                # doğrudan bytes döndürür; ara kopya oluşmaz
+                data = handle.readall()
+        metrics.counter("input_bytes_read_total", "Girdilerden okunan bayt").inc(len(data))
+        return cls(path, data, stat)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    @property
+    def digest(self) -> str:
+        """İçerik hash'i (önbellek anahtarları için, dosya adından bağımsız)."""
+        if self._digest is None:
+            self._digest = hashlib.blake2b(self.data, digest_size=16).hexdigest()
+        return self._digest
+
+    def stream(self) -> io.BytesIO:
+        return io.BytesIO(self.data)
+
+    def open_image(self) -> Image.Image:
+        return Image.open(self.stream())
+
+    def probe(self) -> ImageProbe:
+        """Yalnızca başlığı okuyarak biçim ve boyutu döndürür."""
+        if self._probe is None:
+            with self.open_image() as image:
+                self._probe = ImageProbe(image.format, image.size, image.mode)
+        return self._probe
+
+    def shares_device_with(self, directory: Path) -> bool:
+        try:
+            return os.stat(directory).st_dev == self.stat.st_dev
+        except OSError:
+            return False
+
+    def write_to(self, target: Path) -> Path:
+        with open(target, "wb") as handle:
+            handle.write(self.data)
+        return target
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+
+"""Motora verilmeden önce büyük girdilerin çözünürlüğünü sınırlayan aşama"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Tuple
+
+from PIL import ImageOps
+
+from app.metrics import metrics
+from app.services.input_buffer import InputBuffer
+
+PRINT_DPI = 300
+# Baskı ölçüleri (mm, genişlik × yükseklik)
+PHOTO_TYPE_PRINT_MM: Dict[str, Tuple[float, float]] = {
+    "biyometrik": (50, 60),
+    "vesikalik": (45, 60),
+    "abd_vizesi": (51, 51),
+    "schengen": (35, 45),
+}
+# Girdi karesi baskıdan geniştir (omuzlar, arka plan); yüz alanının baskı
+# çözünürlüğünde kalması için uzun kenar baskı boyutunun bu katı kadar tutulur
+FRAMING_HEADROOM = 4.0
+JPEG_SUFFIXES = {".jpg", ".jpeg"}
+
+
+def max_working_size(photo_type: str, headroom: float = FRAMING_HEADROOM) -> int:
+    """Fotoğraf tipi için izin verilen en uzun kenar (piksel)."""
+    width_mm, height_mm = PHOTO_TYPE_PRINT_MM.get(photo_type, PHOTO_TYPE_PRINT_MM["biyometrik"])
+    return math.ceil(max(width_mm, height_mm) / 25.4 * PRINT_DPI * headroom)
+
+
+@dataclass(frozen=True)
+class NormalizedInput:
+    path: Path
+    original_size: Tuple[int, int]
+    size: Tuple[int, int]
+
+    @property
+    def downscaled(self) -> bool:
+        return self.size != self.original_size
+
+
+class InputNormalizer:
+    """Girdiyi fotoğraf tipinin gerektirdiği çalışma çözünürlüğüne indirir.
+
+    Yeniden örnekleme yapılmaz: JPEG'ler ``draft`` ile DCT ölçeklemesi
+    kullanılarak doğrudan küçük çözülür (1/2, 1/4, 1/8), diğer biçimler
+    tam sayı katsayılı ``reduce`` ile küçültülür. Sonuçta uzun kenar sınır
+    ile sınırın iki katı arasında kalır; sınırın altındaki girdiler olduğu
+    gibi döndürülür.
+    """
+
+    def __init__(self, headroom: float = FRAMING_HEADROOM, jpeg_quality: int = 95):
+        self.headroom = headroom
+        self.jpeg_quality = jpeg_quality
+
+    def normalize(self, source: InputBuffer, photo_type: str, staging_path: Path) -> NormalizedInput:
+        """Gerekirse ``staging_path``'e küçültülmüş bir kopya yazar."""
+        limit = max_working_size(photo_type, self.headroom)
+        original_size = source.probe().size
+        if max(original_size) < limit * 2:
+            return NormalizedInput(source.path, original_size, original_size)
+
+        with source.open_image() as image:
+            with metrics.span("photo_normalize"):
+                if image.format == "JPEG":
+                    scale = limit / max(original_size)
+                    image.draft("RGB", (math.ceil(original_size[0] * scale), math.ceil(original_size[1] * scale)))
+                icc_profile = image.info.get("icc_profile")
+                working = image
+                factor = max(working.size) // limit
+                if factor > 1:
+                    working = working.reduce(factor)
+                # Yönlendirme küçültmeden sonra uygulanır; döndürülen piksel sayısı azalır
+                working = ImageOps.exif_transpose(working)
+                if working.mode not in ("RGB", "L"):
+                    working = working.convert("RGB")
+
+                save_options = {"icc_profile": icc_profile} if icc_profile else {}
+                if staging_path.suffix.lower() in JPEG_SUFFIXES:
+                    save_options.update(quality=self.jpeg_quality, subsampling=0)
+                else:
+                    # Ara dosya yalnızca motor tarafından bir kez okunur; sıkıştırma süresi boşa gider
+                    save_options.update(compress_level=1)
+                working.save(staging_path, **save_options)
+                size = working.size
+
+        metrics.counter("inputs_downscaled_total", "Motordan önce küçültülen girdiler").inc()
+        return NormalizedInput(Path(staging_path), original_size, size)
+
+
+def staging_suffix_for(source: Path) -> str:
+    """Küçültülmüş kopya için uzantı: JPEG girdiler JPEG, diğerleri kayıpsız PNG."""
+    return ".jpg" if Path(source).suffix.lower() in JPEG_SUFFIXES else ".png"
+
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+
+"""Süre sınırı aşıldığında sonlandırılabilen ayrı süreçte motor"""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Union
+
+from app.logger import logger
+from app.metrics import metrics
+from app.services.output_allocator import OutputPathAllocator
+from app.services.output_profiles import OutputProfile
+from app.services.photo_processor import PhotoJob, PhotoProcessingError, PhotoProcessor, PhotoResult
+
+
+def _default_timeout() -> float:
+    try:
+        return float(os.getenv("BIYOVES_JOB_TIMEOUT", "180"))
+    except ValueError:
+        return 180.0
+
+
+DEFAULT_JOB_TIMEOUT = _default_timeout()
+SHUTDOWN_GRACE_SECONDS = 5.0
+# Motorun yüklenmesi iş süresine sayılmaz; ayrı bir sınırla beklenir
+STARTUP_TIMEOUT_SECONDS = 120.0
+
+
+class JobTimeoutError(PhotoProcessingError):
+    """İş süre sınırını aştı; motor süreci sonlandırıldı"""
+
+
+class _ReportingAllocator(OutputPathAllocator):
+    """Ayrılan çıkış adını ebeveyne bildirir; süreç öldürülürse boş rezervasyon silinebilir."""
+
+    def __init__(self, conn):
+        super().__init__()
+        self._conn = conn
+
+    def allocate(self, target: Path) -> Path:
+        path = super().allocate(target)
+        self._conn.send(("reserved", str(path)))
+        return path
+
+
+def _engine_main(
+    conn,
+    base_output_dir: Optional[str],
+    output_profile: Optional[Union[str, OutputProfile]],
+    temp_dir: str,
+) -> None:
+    # Hazırlık dosyaları ebeveynin sahip olduğu dizine yazılır; süreç öldürülse de temizlenir
+    tempfile.tempdir = temp_dir
+    processor = PhotoProcessor(
+        Path(base_output_dir) if base_output_dir else None,
+        output_profile=output_profile,
+        output_allocator=_ReportingAllocator(conn),
+    )
+    conn.send(("ready", os.getpid()))
+    try:
+        while True:
+            try:
+                job = conn.recv()
+            except EOFError:
+                break
+            if job is None:
+                break
+            try:
+                conn.send(("ok", processor.process_single(job)))
+            except Exception as exc:  # noqa: BLE001
+                # İstisna nesnesi her zaman pickle edilemez; yalnızca mesaj gönderilir
+                message = str(exc) if isinstance(exc, PhotoProcessingError) else f"{type(exc).__name__}: {exc}"
+                conn.send(("error", message))
+    finally:
+        processor.close()
+
+
+class IsolatedEngine:
+    """Motoru tek bir yardımcı süreçte çalıştırır ve her işe süre sınırı koyar.
+
+    Süreç ilk işte başlatılır ve sonraki işler için sıcak kalır. İş süre
+    sınırını aşarsa ya da süreç çökerse süreç öldürülür, iş
+    ``PhotoProcessingError`` ile başarısız sayılır ve sonraki iş yeni bir
+    süreçte çalışır; takılan bir görüntü toplu işlemi durduramaz.
+    """
+
+    def __init__(
+        self,
+        base_output_dir: Optional[Path] = None,
+        output_profile: Optional[Union[str, OutputProfile]] = None,
+        timeout: float = DEFAULT_JOB_TIMEOUT,
+    ):
+        self.base_output_dir = base_output_dir
+        self.output_profile = output_profile
+        self.timeout = timeout
+        # Qt uygulamasında fork güvenli değildir
+        self._context = multiprocessing.get_context("spawn")
+        self._process = None
+        self._conn = None
+        self._temp_dir: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def run(self, job: PhotoJob, timeout: Optional[float] = None) -> PhotoResult:
+        timeout = self.timeout if timeout is None else timeout
+        with self._lock:
+            self._ensure_process()
+            started = time.perf_counter()
+            try:
+                self._conn.send(job)
+            except (OSError, ValueError):
+                self._restart()
+                self._conn.send(job)
+
+            deadline = started + timeout
+            reserved = []
+            while True:
+                if not self._conn.poll(max(0.0, deadline - time.perf_counter())):
+                    self._abandon(reserved)
+                    metrics.counter("engine_timeouts_total", "Süre sınırını aşıp sonlandırılan motor işleri").inc()
+                    logger.warning("İş %.0f sn içinde bitmedi, motor süreci sonlandırıldı: %s", timeout, job.input_path)
+                    raise JobTimeoutError(f"İşlem {timeout:.0f} sn içinde tamamlanmadı")
+                try:
+                    kind, payload = self._conn.recv()
+                except (EOFError, OSError) as exc:
+                    self._abandon(reserved)
+                    metrics.counter("engine_crashes_total", "Beklenmedik şekilde sonlanan motor süreçleri").inc()
+                    raise PhotoProcessingError("Motor süreci beklenmedik şekilde sonlandı") from exc
+                if kind != "reserved":
+                    break
+                reserved.append(payload)
+            metrics.histogram("engine_isolated_job_seconds").observe(time.perf_counter() - started)
+        if kind == "ok":
+            return payload
+        raise PhotoProcessingError(payload)
+
+    def warm_up(self) -> None:
+        with self._lock:
+            self._ensure_process()
+
+    def close(self) -> None:
+        with self._lock:
+            process, conn, temp_dir = self._process, self._conn, self._temp_dir
+            self._process = self._conn = self._temp_dir = None
+        if process is None:
+            return
+        try:
+            conn.send(None)
+        except (OSError, ValueError):
+            pass
+        process.join(SHUTDOWN_GRACE_SECONDS)
+        if process.is_alive():
+            process.kill()
+            process.join()
+        conn.close()
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    def _ensure_process(self) -> None:
+        if self._process is not None and self._process.is_alive():
+            return
+        if self._process is not None:
+            self._kill()
+        parent_conn, child_conn = self._context.Pipe()
+        temp_dir = tempfile.mkdtemp(prefix="biyoves-engine-")
+        process = self._context.Process(
+            target=_engine_main,
+            args=(
+                child_conn,
+                str(self.base_output_dir) if self.base_output_dir else None,
+                self.output_profile,
+                temp_dir,
+            ),
+            name="biyoves-engine",
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        self._process, self._conn, self._temp_dir = process, parent_conn, temp_dir
+        try:
+            ready = parent_conn.poll(STARTUP_TIMEOUT_SECONDS) and parent_conn.recv()[0] == "ready"
+        except (EOFError, OSError):
+            ready = False
+        if not ready:
+            self._kill()
+            raise PhotoProcessingError("Motor süreci başlatılamadı")
+
+    def _restart(self) -> None:
+        self._kill()
+        self._ensure_process()
+
+    def _abandon(self, reserved) -> None:
+        self._kill()
+        # Yarıda kalan işin boş çıkış rezervasyonları bırakılır
+        allocator = OutputPathAllocator()
+        for path in reserved:
+            allocator.release(Path(path))
+
+    def _kill(self) -> None:
+        process, conn, temp_dir = self._process, self._conn, self._temp_dir
+        self._process = self._conn = self._temp_dir = None
+        if process is not None:
+            process.kill()
+            process.join()
+        if conn is not None:
+            conn.close()
+        if temp_dir is not None:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    def __enter__(self) -> "IsolatedEngine":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
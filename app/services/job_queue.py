@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+
+"""SQLite tabanlı kalıcı iş kuyruğu.
+
+Kuyruk WAL modunda çalışır; masaüstü worker'ı, CLI, sıcak klasör ve HTTP
+servisi aynı veritabanını farklı süreçlerden eşzamanlı kullanabilir. İşler
+kira (lease) ile alınır: kirası dolan iş başka bir tüketiciye geçer,
+başarısız olan iş artan bekleme süreleriyle yeniden denenir.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import random
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from app.services.output_profiles import OutputProfile
+from app.services.photo_processor import PhotoJob
+
+STATE_QUEUED = "queued"
+STATE_RUNNING = "running"
+STATE_DONE = "done"
+STATE_FAILED = "failed"
+STATE_CANCELLED = "cancelled"
+STATE_REJECTED = "rejected"
+TERMINAL_STATES = (STATE_DONE, STATE_FAILED, STATE_CANCELLED, STATE_REJECTED)
+
+DEFAULT_LEASE_SECONDS = 300.0
+DEFAULT_MAX_ATTEMPTS = 3
+BACKOFF_BASE_SECONDS = 2.0
+BACKOFF_MAX_SECONDS = 300.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    state TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    input_path TEXT NOT NULL,
+    photo_type TEXT NOT NULL,
+    layout_type TEXT NOT NULL,
+    output_path TEXT,
+    output_profile TEXT,
+    user_id TEXT NOT NULL DEFAULT '',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    available_at REAL NOT NULL,
+    lease_owner TEXT,
+    lease_expires REAL,
+    result_path TEXT,
+    error TEXT,
+    extra TEXT NOT NULL DEFAULT '{}',
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_claim_idx ON jobs (state, priority DESC, available_at, created_at);
+CREATE INDEX IF NOT EXISTS jobs_lease_idx ON jobs (state, lease_expires);
+"""
+
+
+def default_queue_path() -> Path:
+    return Path.home() / ".biyoves" / "jobs.sqlite3"
+
+
+def new_worker_id(prefix: str = "worker") -> str:
+    """Kira sahibini ayırt etmek için makine, süreç ve rastgele ekten oluşan kimlik."""
+    return f"{prefix}@{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+@dataclass
+class QueuedJob:
+    id: str
+    job: PhotoJob
+    state: str
+    priority: int = 0
+    user_id: str = ""
+    attempts: int = 0
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS
+    result_path: Optional[Path] = None
+    error: Optional[str] = None
+    extra: Dict[str, Any] = field(default_factory=dict)
+    created_at: float = 0.0
+    updated_at: float = 0.0
+
+    @property
+    def is_terminal(self) -> bool:
+        return self.state in TERMINAL_STATES
+
+
+class JobQueue:
+    """Öncelikli, yeniden denemeli ve kira tabanlı ``PhotoJob`` kuyruğu.
+
+    Her thread kendi bağlantısını kullanır; yazma işlemleri ``BEGIN
+    IMMEDIATE`` ile alınır, böylece iki tüketici aynı işi talep edemez.
+    """
+
+    def __init__(self, db_path: Optional[Path] = None, busy_timeout: float = 10.0):
+        self.db_path = Path(db_path) if db_path else default_queue_path()
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        self._connection().executescript(_SCHEMA)
+
+    # -- bağlantı -----------------------------------------------------------------
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path), timeout=self.busy_timeout, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout * 1000)}")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    # -- üretici ------------------------------------------------------------------
+
+    def enqueue(
+        self,
+        job: PhotoJob,
+        priority: int = 0,
+        user_id: str = "",
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        extra: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        return self.enqueue_many([job], priority, user_id, max_attempts, extra)[0]
+
+    def enqueue_many(
+        self,
+        jobs: Iterable[PhotoJob],
+        priority: int = 0,
+        user_id: str = "",
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        extra: Optional[Dict[str, Any]] = None,
+    ) -> List[str]:
+        now = time.time()
+        extra_json = json.dumps(extra or {}, ensure_ascii=False)
+        rows = []
+        for job in jobs:
+            profile = job.output_profile.name if isinstance(job.output_profile, OutputProfile) else job.output_profile
+            rows.append((
+                # Kuyruk başka dizinlerden çalışan süreçlerce de okunur; yollar mutlak saklanır
+                uuid.uuid4().hex, STATE_QUEUED, priority, str(Path(job.input_path).resolve()), job.photo_type,
+                job.layout_type, str(Path(job.output_path).resolve()) if job.output_path else None, profile,
+                user_id, max_attempts,
+                now, extra_json, now, now,
+            ))
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT INTO jobs (id, state, priority, input_path, photo_type, layout_type, output_path,"
+                " output_profile, user_id, max_attempts, available_at, extra, created_at, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+        return [row[0] for row in rows]
+
+    # -- tüketici -----------------------------------------------------------------
+
+    def claim(
+        self,
+        owner: str,
+        limit: int = 1,
+        lease_seconds: float = DEFAULT_LEASE_SECONDS,
+        job_ids: Optional[Sequence[str]] = None,
+    ) -> List[QueuedJob]:
+        """Sıradaki işleri öncelik sırasıyla kiralar ve deneme sayısını artırır.
+
+        Kirası dolmuş çalışan işler, deneme hakları kaldıysa yeniden
+        alınabilir; hakkı tükenenler (ör. tüketiciyi her seferinde çökerten
+        iş) başarısız sayılır. ``job_ids`` verilirse yalnızca bu işler
+        arasından seçim yapılır.
+        """
+        now = time.time()
+        query = (
+            "SELECT id FROM jobs WHERE ((state = ? AND available_at <= ?)"
+            " OR (state = ? AND lease_expires < ? AND attempts < max_attempts))"
+        )
+        params: List[Any] = [STATE_QUEUED, now, STATE_RUNNING, now]
+        if job_ids is not None:
+            if not job_ids:
+                return []
+            query += f" AND id IN ({', '.join('?' * len(job_ids))})"
+            params.extend(job_ids)
+        query += " ORDER BY priority DESC, available_at, created_at LIMIT ?"
+        params.append(limit)
+
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE jobs SET state = ?, error = ?, lease_owner = NULL, lease_expires = NULL, updated_at = ?"
+                " WHERE state = ? AND lease_expires < ? AND attempts >= max_attempts",
+                (STATE_FAILED, "Kira süresi doldu, deneme hakkı kalmadı", now, STATE_RUNNING, now),
+            )
+            ids = [row["id"] for row in conn.execute(query, params)]
+            if not ids:
+                return []
+            placeholders = ", ".join("?" * len(ids))
+            conn.execute(
+                f"UPDATE jobs SET state = ?, lease_owner = ?, lease_expires = ?, attempts = attempts + 1,"
+                f" updated_at = ? WHERE id IN ({placeholders})",
+                [STATE_RUNNING, owner, now + lease_seconds, now, *ids],
+            )
+            rows = conn.execute(
+                f"SELECT * FROM jobs WHERE id IN ({placeholders}) ORDER BY priority DESC, available_at, created_at",
+                ids,
+            ).fetchall()
+        return [self._to_queued_job(row) for row in rows]
+
+    def heartbeat(self, job_id: str, owner: str, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> bool:
+        """Kirayı uzatır; iş artık bu sahipte değilse ``False`` döner."""
+        now = time.time()
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET lease_expires = ?, updated_at = ? WHERE id = ? AND state = ? AND lease_owner = ?",
+                (now + lease_seconds, now, job_id, STATE_RUNNING, owner),
+            )
+        return cursor.rowcount == 1
+
+    def complete(self, job_id: str, owner: str, result_path: Optional[Path] = None) -> bool:
+        now = time.time()
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET state = ?, result_path = ?, error = NULL, lease_owner = NULL, lease_expires = NULL,"
+                " updated_at = ? WHERE id = ? AND state = ? AND lease_owner = ?",
+                (STATE_DONE, str(result_path) if result_path else None, now, job_id, STATE_RUNNING, owner),
+            )
+        return cursor.rowcount == 1
+
+    def fail(self, job_id: str, owner: str, error: str, retry: bool = True) -> Optional[str]:
+        """Başarısız denemeyi kaydeder; yeni durumu (``queued`` veya ``failed``) döndürür.
+
+        Deneme hakkı kaldıysa iş üstel bekleme süresiyle sıraya döner.
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT attempts, max_attempts FROM jobs WHERE id = ? AND state = ? AND lease_owner = ?",
+                (job_id, STATE_RUNNING, owner),
+            ).fetchone()
+            if row is None:
+                return None
+            if retry and row["attempts"] < row["max_attempts"]:
+                state, available_at = STATE_QUEUED, now + self.backoff_delay(row["attempts"])
+            else:
+                state, available_at = STATE_FAILED, now
+            conn.execute(
+                "UPDATE jobs SET state = ?, error = ?, available_at = ?, lease_owner = NULL, lease_expires = NULL,"
+                " updated_at = ? WHERE id = ?",
+                (state, error, available_at, now, job_id),
+            )
+        return state
+
+    def reject(self, job_id: str, owner: str, reason: str) -> bool:
+        """Ön kontrolden geçemeyen işi yeniden denenmeyecek biçimde kapatır; kredi düşülmemiştir."""
+        now = time.time()
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET state = ?, error = ?, lease_owner = NULL, lease_expires = NULL, updated_at = ?"
+                " WHERE id = ? AND state = ? AND lease_owner = ?",
+                (STATE_REJECTED, reason, now, job_id, STATE_RUNNING, owner),
+            )
+        return cursor.rowcount == 1
+
+    def release(self, job_id: str, owner: str) -> bool:
+        """İşi deneme hakkı harcamadan sıraya geri bırakır (ör. kapanışta)."""
+        now = time.time()
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET state = ?, attempts = MAX(attempts - 1, 0), lease_owner = NULL,"
+                " lease_expires = NULL, available_at = ?, updated_at = ? WHERE id = ? AND state = ? AND lease_owner = ?",
+                (STATE_QUEUED, now, now, job_id, STATE_RUNNING, owner),
+            )
+        return cursor.rowcount == 1
+
+    @staticmethod
+    def backoff_delay(attempts: int) -> float:
+        delay = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * (2 ** max(0, attempts - 1)))
+        return delay * random.uniform(0.8, 1.2)
+
+    # -- yönetim ------------------------------------------------------------------
+
+    def get(self, job_id: str) -> Optional[QueuedJob]:
+        row = self._connection().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_queued_job(row) if row else None
+
+    def recent(self, limit: int = 100, state: Optional[str] = None) -> List[QueuedJob]:
+        if state:
+            rows = self._connection().execute(
+                "SELECT * FROM jobs WHERE state = ? ORDER BY created_at DESC LIMIT ?", (state, limit)
+            )
+        else:
+            rows = self._connection().execute("SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,))
+        return [self._to_queued_job(row) for row in rows]
+
+    def counts(self) -> Dict[str, int]:
+        rows = self._connection().execute("SELECT state, COUNT(*) AS total FROM jobs GROUP BY state")
+        return {row["state"]: row["total"] for row in rows}
+
+    def count_active(self) -> int:
+        row = self._connection().execute(
+            "SELECT COUNT(*) FROM jobs WHERE state IN (?, ?)", (STATE_QUEUED, STATE_RUNNING)
+        ).fetchone()
+        return row[0]
+
+    def update_extra(self, job_id: str, **values: Any) -> None:
+        with self._transaction() as conn:
+            row = conn.execute("SELECT extra FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return
+            extra = json.loads(row["extra"] or "{}")
+            extra.update(values)
+            conn.execute(
+                "UPDATE jobs SET extra = ?, updated_at = ? WHERE id = ?",
+                (json.dumps(extra, ensure_ascii=False), time.time(), job_id),
+            )
+
+    def cancel(self, job_id: str) -> bool:
+        """Henüz alınmamış işi iptal eder."""
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET state = ?, updated_at = ? WHERE id = ? AND state = ?",
+                (STATE_CANCELLED, time.time(), job_id, STATE_QUEUED),
+            )
+        return cursor.rowcount == 1
+
+    def requeue_failed(self) -> int:
+        """Kalıcı olarak başarısız olan işleri deneme sayacını sıfırlayarak sıraya döndürür."""
+        now = time.time()
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET state = ?, attempts = 0, error = NULL, available_at = ?, updated_at = ?"
+                " WHERE state = ?",
+                (STATE_QUEUED, now, now, STATE_FAILED),
+            )
+        return cursor.rowcount
+
+    def purge(self, older_than_seconds: float = 0.0) -> int:
+        """Bitmiş işleri siler."""
+        cutoff = time.time() - older_than_seconds
+        placeholders = ", ".join("?" * len(TERMINAL_STATES))
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                f"DELETE FROM jobs WHERE state IN ({placeholders}) AND updated_at <= ?",
+                (*TERMINAL_STATES, cutoff),
+            )
+        return cursor.rowcount
+
+    @staticmethod
+    def _to_queued_job(row: sqlite3.Row) -> QueuedJob:
+        job = PhotoJob(
+            input_path=Path(row["input_path"]),
+            photo_type=row["photo_type"],
+            layout_type=row["layout_type"],
+            output_path=Path(row["output_path"]) if row["output_path"] else None,
+            output_profile=row["output_profile"],
+        )
+        return QueuedJob(
+            id=row["id"],
+            job=job,
+            state=row["state"],
+            priority=row["priority"],
+            user_id=row["user_id"],
+            attempts=row["attempts"],
+            max_attempts=row["max_attempts"],
+            result_path=Path(row["result_path"]) if row["result_path"] else None,
+            error=row["error"],
+            extra=json.loads(row["extra"] or "{}"),
+            created_at=row["created_at"],
+            updated_at=row["updated_at"],
+        )
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+
+"""İşlerin bellek bütçesine göre kabul edilmesini sağlayan bellek yöneticisi"""
+
+from __future__ import annotations
+
+import ctypes
+import os
+import sys
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional, Union
+
+from PIL import Image
+
+from app.logger import logger
+from app.metrics import metrics
+from app.services.input_buffer import InputBuffer
+from app.services.input_normalizer import max_working_size
+
+# Çözülmüş RGB görüntü başına motor ara çıktıları (maske, hizalama, kompozit) için kat sayı
+ENGINE_OVERHEAD_FACTOR = 6
+MIN_JOB_BYTES = 64 * 1024 * 1024
+DEFAULT_BUDGET_FRACTION = 0.6
+# Boş bellek bu oranın altına indiğinde önbellekler boşaltılır
+LOW_MEMORY_FRACTION = 0.1
+PRESSURE_CALLBACK_INTERVAL = 5.0
+REFRESH_INTERVAL = 2.0
+
+
+def _read_meminfo() -> Optional[tuple]:
+    try:
+        values = {}
+        with open("/proc/meminfo", encoding="ascii") as handle:
+            for line in handle:
+                key, _, rest = line.partition(":")
+                values[key] = int(rest.split()[0]) * 1024
+        return values["MemAvailable"], values["MemTotal"]
+    except (OSError, KeyError, ValueError, IndexError):
+        return None
+
+
+def _windows_memory() -> Optional[tuple]:
+    class MEMORYSTATUSEX(ctypes.Structure):
+        _fields_ = [
+            ("dwLength", ctypes.c_ulong),
+            ("dwMemoryLoad", ctypes.c_ulong),
+            ("ullTotalPhys", ctypes.c_ulonglong),
+            ("ullAvailPhys", ctypes.c_ulonglong),
+            ("ullTotalPageFile", ctypes.c_ulonglong),
+            ("ullAvailPageFile", ctypes.c_ulonglong),
+            ("ullTotalVirtual", ctypes.c_ulonglong),
+            ("ullAvailVirtual", ctypes.c_ulonglong),
+            ("sullAvailExtendedVirtual", ctypes.c_ulonglong),
+        ]
+
+    status = MEMORYSTATUSEX()
+    status.dwLength = ctypes.sizeof(MEMORYSTATUSEX)
+    if not ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status)):  # type: ignore[attr-defined]
+        return None
+    return status.ullAvailPhys, status.ullTotalPhys
+
+
+def system_memory() -> Optional[tuple]:
+    """``(kullanılabilir, toplam)`` bayt; ölçülemezse ``None``."""
+    try:
+        import psutil
+    except ImportError:
+        psutil = None
+    if psutil is not None:
+        info = psutil.virtual_memory()
+        return info.available, info.total
+    if sys.platform.startswith("linux"):
+        return _read_meminfo()
+    if sys.platform == "win32":
+        return _windows_memory()
+    try:
+        pages = os.sysconf("SC_PHYS_PAGES")
+        page_size = os.sysconf("SC_PAGE_SIZE")
+        available = os.sysconf("SC_AVPHYS_PAGES")
+        return available * page_size, pages * page_size
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def estimate_job_bytes(source: Union[Path, InputBuffer], photo_type: str = "biyometrik") -> int:
+    """Yalnızca başlığı okuyarak bir işin en yüksek bellek kullanımını tahmin eder.
+
+    Ön kontrolün döndürdüğü ``InputBuffer`` verilirse boyut bellekteki
+    baytlardan okunur; dosya diskten ikinci kez açılmaz.
+    """
+    try:
+        if isinstance(source, InputBuffer):
+            width, height = source.probe().size
+        else:
+            with Image.open(source) as image:
+                width, height = image.size
+    except Exception:  # noqa: BLE001
+        return MIN_JOB_BYTES
+    limit = max_working_size(photo_type) * 2
+    if max(width, height) > limit:
+        scale = limit / max(width, height)
+        width, height = int(width * scale), int(height * scale)
+    return max(MIN_JOB_BYTES, width * height * 3 * ENGINE_OVERHEAD_FACTOR)
+
+
+class MemoryGovernor:
+    """Uçuştaki işlerin tahmini bellek kullanımını bütçeyle sınırlar.
+
+    Bütçe, kullanılabilir belleğin ``budget_fraction`` kadarıdır ve
+    periyodik olarak yeniden ölçülür (``BIYOVES_MEMORY_BUDGET_MB`` ile
+    sabitlenebilir). Bütçe doluyken yeni iş beklenir; en az bir iş her
+    zaman kabul edilir. Bellek sıkıştığında kayıtlı geri çağrılar
+    önbellekleri ve tam çözünürlüklü önizlemeleri bırakır.
+    """
+
+    def __init__(self, budget_bytes: Optional[int] = None, budget_fraction: float = DEFAULT_BUDGET_FRACTION):
+        if budget_bytes is None:
+            try:
+                budget_mb = int(os.getenv("BIYOVES_MEMORY_BUDGET_MB", "0"))
+            except ValueError:
+                budget_mb = 0
+            budget_bytes = budget_mb * 1024 * 1024 or None
+        self._fixed_budget = budget_bytes
+        self.budget_fraction = budget_fraction
+        self._condition = threading.Condition()
+        self._in_flight = 0
+        self._budget = budget_bytes or 0
+        self._low_memory = False
+        self._refreshed_at = 0.0
+        self._callbacks: List[Union[weakref.WeakMethod, Callable[[], None]]] = []
+        self._last_pressure = 0.0
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def budget(self) -> int:
+        self._refresh()
+        return self._budget
+
+    @property
+    def low_memory(self) -> bool:
+        self._refresh()
+        return self._low_memory
+
+    def add_pressure_callback(self, callback: Callable[[], None]) -> None:
+        """Bellek baskısında çağrılacak fonksiyonu kaydeder.
+
+        Bağlı metotlar zayıf referansla tutulur; sahibi silinen nesnenin
+        kaydı kendiliğinden düşer.
+        """
+        ref = weakref.WeakMethod(callback) if hasattr(callback, "__self__") else callback
+        with self._condition:
+            self._callbacks.append(ref)
+
+    def remove_pressure_callback(self, callback: Callable[[], None]) -> None:
+        with self._condition:
+            self._callbacks = [ref for ref in self._callbacks if self._resolve(ref) not in (None, callback)]
+
+    @staticmethod
+    def _resolve(ref: Union[weakref.WeakMethod, Callable[[], None]]) -> Optional[Callable[[], None]]:
+        return ref() if isinstance(ref, weakref.WeakMethod) else ref
+
+    def try_reserve(self, nbytes: int) -> bool:
+        """Bütçe yetiyorsa ayırır; yetmiyorsa beklemeden ``False`` döner."""
+        self._refresh()
+        with self._condition:
+            if self._fits(nbytes):
+                self._take(nbytes)
+                return True
+        self._signal_pressure()
+        return False
+
+    def reserve(self, nbytes: int, timeout: Optional[float] = None) -> bool:
+        """Bütçe açılana kadar bekler; süre dolarsa ``False`` döner."""
+        if self.try_reserve(nbytes):
+            return True
+        started = time.perf_counter()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return False
+            with self._condition:
+                self._condition.wait(REFRESH_INTERVAL if remaining is None else min(REFRESH_INTERVAL, remaining))
+            self._refresh()
+            with self._condition:
+                if self._fits(nbytes):
+                    self._take(nbytes)
+                    metrics.histogram("memory_admission_wait_seconds").observe(time.perf_counter() - started)
+                    return True
+
+    def release(self, nbytes: int) -> None:
+        with self._condition:
+            self._in_flight = max(0, self._in_flight - nbytes)
+            metrics.gauge("memory_in_flight_bytes", "Kabul edilmiş işlerin tahmini bellek kullanımı").set(self._in_flight)
+            self._condition.notify_all()
+
+    @contextmanager
+    def admit(self, nbytes: int) -> Iterator[None]:
+        self.reserve(nbytes)
+        try:
+            yield
+        finally:
+            self.release(nbytes)
+
+    def _fits(self, nbytes: int) -> bool:
+        # Hiç iş yokken bütçeyi aşan tek iş de kabul edilir; aksi halde kilitlenir
+        if self._in_flight == 0:
+            return True
+        return not self._low_memory and self._in_flight + nbytes <= self._budget
+
+    def _take(self, nbytes: int) -> None:
+        self._in_flight += nbytes
+        metrics.gauge("memory_in_flight_bytes", "Kabul edilmiş işlerin tahmini bellek kullanımı").set(self._in_flight)
+
+    def _refresh(self) -> None:
+        now = time.monotonic()
+        if now - self._refreshed_at < REFRESH_INTERVAL:
+            return
+        self._refreshed_at = now
+        memory = system_memory()
+        if memory is None:
+            if not self._fixed_budget and not self._budget:
+                self._budget = 2 * 1024 * 1024 * 1024
+            return
+        available, total = memory
+        with self._condition:
+            if not self._fixed_budget:
+                # Uçuştaki işlerin belleği zaten "kullanılabilir"den düşülmüştür
+                self._budget = int((available + self._in_flight) * self.budget_fraction)
+            self._low_memory = available < total * LOW_MEMORY_FRACTION
+            metrics.gauge("memory_budget_bytes", "Bellek yöneticisinin güncel bütçesi").set(self._budget)
+            metrics.gauge("memory_available_bytes", "Sistemde kullanılabilir bellek").set(available)
+            self._condition.notify_all()
+        if self._low_memory:
+            self._signal_pressure()
+
+    def _signal_pressure(self) -> None:
+        now = time.monotonic()
+        with self._condition:
+            if now - self._last_pressure < PRESSURE_CALLBACK_INTERVAL:
+                return
+            self._last_pressure = now
+            callbacks = [self._resolve(ref) for ref in self._callbacks]
+            self._callbacks = [ref for ref, callback in zip(self._callbacks, callbacks) if callback is not None]
+        metrics.counter("memory_pressure_events_total", "Önbelleklerin boşaltıldığı bellek baskısı olayları").inc()
+        for callback in callbacks:
+            if callback is None:
+                continue
+            try:
+                callback()
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("Bellek baskısı geri çağrısı başarısız: %s", exc)
+
+
+memory_governor = MemoryGovernor()
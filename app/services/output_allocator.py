@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+
+"""Çıkış dosyası adlarını çakışmasız ayıran yardımcı"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Set, Tuple
+
+from app.logger import logger
+from app.services.output_writer import is_partial_output
+
+RESERVATION_SUFFIX = ".reserved"
+# Bundan eski rezervasyon işaretleri ve ``.part`` dosyaları çöken ya da öldürülen bir sürecin artığıdır
+STALE_RESERVATION_SECONDS = 3600.0
+
+
+def reservation_path_for(target: Path) -> Path:
+    """Ayrılan adı tutan gizli işaret dosyası; geçerli çıktı sanılmaz."""
+    return target.with_name(f".{target.name}{RESERVATION_SUFFIX}")
+
+
+@dataclass
+class _DirectoryIndex:
+    names: Set[str]
+    next_counter: Dict[Tuple[str, str], int] = field(default_factory=dict)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+def _remove_if_stale(entry: os.DirEntry, stale_before: float) -> bool:
+    try:
+        if entry.stat().st_mtime < stale_before:
+            os.unlink(entry.path)
+            return True
+    except OSError:
+        pass
+    return False
+
+
+class OutputPathAllocator:
+    """Dizin başına tek taramayla benzersiz çıkış yolu ayırır.
+
+    Dizin içeriği ilk kullanımda belleğe alınır; sonraki ayırmalar stat
+    çağrısı yapmaz. Ad, son yol yerine yanında ``O_EXCL`` ile oluşturulan
+    gizli ``.ad.reserved`` işaretiyle rezerve edilir; paralel worker'lar ve
+    süreçler aynı adı alamaz, çökme sonrası çıkış dizininde boş ``.jpg``
+    kalmaz. Çıktı yazılınca ``confirm``, vazgeçilince ``release`` işareti
+    siler. Dizin ilk tarandığında eskimiş işaretler ve yarım kalmış
+    ``.part`` dosyaları temizlenir.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._indexes: Dict[str, _DirectoryIndex] = {}
+
+    def allocate(self, target: Path) -> Path:
+        target = Path(target)
+        index = self._index_for(target.parent)
+        stem = target.stem
+        suffix = target.suffix or ".jpg"
+        counter_key = (os.path.normcase(stem), suffix.lower())
+
+        with index.lock:
+            base = target.with_suffix(suffix)
+            candidate = base
+            counter = index.next_counter.get(counter_key, 1)
+            while True:
+                name_key = os.path.normcase(candidate.name)
+                if name_key not in index.names:
+                    reserved = self._reserve(candidate)
+                    index.names.add(name_key)
+                    if reserved:
+                        if candidate != base:
+                            index.next_counter[counter_key] = counter
+                        return candidate
+                candidate = base.with_name(f"{stem}_{counter}{suffix}")
+                counter += 1
+
+    def confirm(self, path: Path) -> None:
+        """Çıktı son adıyla yazıldı; ad artık dosyanın kendisiyle tutulur."""
+        self._remove_marker(Path(path))
+
+    def release(self, path: Path) -> None:
+        """Kullanılmayan rezervasyonu geri bırakır."""
+        path = Path(path)
+        self._remove_marker(path)
+        if path.exists():
+            return
+        index = self._indexes.get(self._directory_key(path.parent))
+        if index is None:
+            return
+        with index.lock:
+            index.names.discard(os.path.normcase(path.name))
+
+    def forget(self, directory: Path) -> None:
+        with self._lock:
+            self._indexes.pop(self._directory_key(directory), None)
+
+    @staticmethod
+    def _reserve(path: Path) -> bool:
+        # Dizin dışarıdan değişmiş olabilir; ad indekse eklenip sıradaki denenir
+        if os.path.lexists(path):
+            return False
+        try:
+            fd = os.open(reservation_path_for(path), os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+        except FileExistsError:
+            return False
+        os.close(fd)
+        return True
+
+    @staticmethod
+    def _remove_marker(path: Path) -> None:
+        try:
+            reservation_path_for(path).unlink()
+        except FileNotFoundError:
+            pass
+        except OSError as exc:
+            logger.warning("Rezervasyon işareti silinemedi (%s): %s", path, exc)
+
+    @staticmethod
+    def _directory_key(directory: Path) -> str:
+        return os.path.normcase(os.path.abspath(directory))
+
+    def _index_for(self, directory: Path) -> _DirectoryIndex:
+        key = self._directory_key(directory)
+        with self._lock:
+            index = self._indexes.get(key)
+            if index is None:
+                index = _DirectoryIndex(names=self._scan(directory))
+                self._indexes[key] = index
+            return index
+
+    @staticmethod
+    def _scan(directory: Path) -> Set[str]:
+        names: Set[str] = set()
+        stale_before = time.time() - STALE_RESERVATION_SECONDS
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    name = entry.name
+                    if is_partial_output(Path(name)):
+                        _remove_if_stale(entry, stale_before)
+                        continue
+                    if name.startswith(".") and name.endswith(RESERVATION_SUFFIX):
+                        if _remove_if_stale(entry, stale_before):
+                            continue
+                        # Başka bir süreç bu adı hâlâ ayırmış olabilir
+                        names.add(os.path.normcase(name[1:-len(RESERVATION_SUFFIX)]))
+                    names.add(os.path.normcase(name))
+        except FileNotFoundError:
+            pass
+        return names
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+
+"""Çıktı kodlama profilleri (JPEG kalite, PNG/TIFF, baskı DPI)"""
+
+from __future__ import annotations
+
+import io
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Optional
+
+from PIL import Image
+
+SUBSAMPLING_MODES = {
+    "4:4:4": 0,
+    "4:2:2": 1,
+    "4:2:0": 2,
+}
+
+FORMAT_EXTENSIONS = {
+    "JPEG": ".jpg",
+    "PNG": ".png",
+    "TIFF": ".tif",
+}
+
+
+@dataclass(frozen=True)
+class OutputProfile:
+    """Çıktı dosyasının formatı ve kodlama ayarları"""
+
+    name: str
+    format: str = "JPEG"
+    quality: int = 95
+    subsampling: Optional[str] = "4:2:0"
+    progressive: bool = False
+    dpi: Optional[int] = 300
+    optimize: bool = False
+    compression: Optional[str] = None
+
+    @property
+    def extension(self) -> str:
+        return FORMAT_EXTENSIONS[self.format]
+
+    def save_options(self) -> Dict[str, Any]:
+        options: Dict[str, Any] = {}
+        if self.dpi:
+            options["dpi"] = (self.dpi, self.dpi)
+        if self.format == "JPEG":
+            options["quality"] = self.quality
+            options["optimize"] = self.optimize
+            options["progressive"] = self.progressive
+            if self.subsampling:
+                options["subsampling"] = SUBSAMPLING_MODES[self.subsampling]
+        elif self.format == "PNG":
+            options["optimize"] = self.optimize
+        elif self.format == "TIFF":
+            if self.compression:
+                options["compression"] = self.compression
+        return options
+
+
+OUTPUT_PROFILES: Dict[str, OutputProfile] = {
+    # Baskı laboratuvarı: renk alt örneklemesi yok, yüksek kalite
+    "print": OutputProfile(name="print", quality=95, subsampling="4:4:4", optimize=True),
+    # Yükleme ve baskı kuyruğu için küçük dosya
+    "light": OutputProfile(name="light", quality=82, subsampling="4:2:0", progressive=True, optimize=True),
+    "png": OutputProfile(name="png", format="PNG"),
+    # Arşiv: kayıpsız, LZW sıkıştırmalı TIFF
+    "archive": OutputProfile(name="archive", format="TIFF", compression="tiff_lzw"),
+}
+
+
+def resolve_output_profile(profile: Optional[Any]) -> Optional[OutputProfile]:
+    """Profil adını veya nesnesini çözümler; ``None`` motor çıktısını olduğu gibi bırakır."""
+    if profile is None or isinstance(profile, OutputProfile):
+        return profile
+    key = str(profile).strip().lower()
+    if not key or key == "default":
+        return None
+    if key not in OUTPUT_PROFILES:
+        raise ValueError(f"Geçersiz çıktı profili: {profile}")
+    return OUTPUT_PROFILES[key]
+
+
+class ImageEncoder:
+    """Bir profil için tekrar kullanılabilir kodlayıcı.
+
+    Kaydetme seçenekleri bir kez hesaplanır ve her görüntü aynı bellek
+    tamponuna kodlanıp hedefe tek seferde yazılır.
+    """
+
+    def __init__(self, profile: OutputProfile):
+        self.profile = profile
+        self._options = profile.save_options()
+        self._buffer = io.BytesIO()
+
+    def encode(self, source: Path, handle: BinaryIO) -> None:
+        with Image.open(source) as image:
+            image = self._prepare(image)
+            self._buffer.seek(0)
+            self._buffer.truncate()
+            image.save(self._buffer, format=self.profile.format, **self._options)
+        handle.write(self._buffer.getbuffer())
+
+    def _prepare(self, image: Image.Image) -> Image.Image:
+        if self.profile.format == "JPEG" and image.mode not in ("RGB", "L", "CMYK"):
+            return image.convert("RGB")
+        if self.profile.format == "TIFF" and image.mode == "P":
+            return image.convert("RGB")
+        return image
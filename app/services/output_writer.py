@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+
+"""Çıkış dosyalarını atomik ve arka planda yazan servis"""
+
+from __future__ import annotations
+
+import os
+import queue
+import shutil
+import threading
+import uuid
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Optional, Set, Tuple
+
+from app.logger import logger
+from app.metrics import metrics
+from app.services.output_profiles import ImageEncoder
+
+COPY_BUFFER_SIZE = 4 * 1024 * 1024
+PARTIAL_SUFFIX = ".part"
+
+
+def partial_path_for(destination: Path) -> Path:
+    """Hedefle aynı dizinde, geçerli çıktı sanılmayacak geçici dosya adı."""
+    return destination.with_name(f".{destination.name}.{uuid.uuid4().hex[:8]}{PARTIAL_SUFFIX}")
+
+
+def is_partial_output(path: Path) -> bool:
+    return path.name.startswith(".") and path.name.endswith(PARTIAL_SUFFIX)
+
+
+def discard_partial(partial: Path) -> None:
+    try:
+        partial.unlink()
+    except FileNotFoundError:
+        pass
+    except OSError as exc:
+        logger.warning("Geçici çıktı dosyası silinemedi (%s): %s", partial, exc)
+
+
+class OutputWriter:
+    """Hazırlanan çıktıları tek bir yazıcı thread'inde hedefe taşır.
+
+    Her dosya önce hedef dizinde gizli bir ``.part`` dosyasına büyük
+    tamponlarla kopyalanır, istenirse fsync edilir ve ``os.replace`` ile
+    yerine konur; yarım kalan yazma hiçbir zaman son adla görünmez.
+    Kuyruk sınırlı olduğundan disk çok yavaşsa üretici bekletilir.
+    Kodlayıcı verilirse yeniden kodlama da bu thread'de yapılır.
+    """
+
+    def __init__(self, fsync: bool = False, max_pending: int = 32):
+        self.fsync = fsync
+        self._queue: "queue.Queue[Optional[Tuple[Path, Path, Optional[ImageEncoder], Future]]]" = queue.Queue(maxsize=max_pending)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._pending: Set[Future] = set()
+
+    def submit(self, source: Path, destination: Path, encoder: Optional[ImageEncoder] = None) -> Future:
+        """``source`` dosyasını ``destination`` konumuna taşımak üzere kuyruğa alır."""
+        future: Future = Future()
+        with self._lock:
+            self._ensure_thread()
+            self._pending.add(future)
+        future.add_done_callback(self._discard)
+        self._queue.put((Path(source), Path(destination), encoder, future))
+        return future
+
+    def write(self, source: Path, destination: Path, encoder: Optional[ImageEncoder] = None) -> None:
+        self.submit(source, destination, encoder).result()
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        with self._lock:
+            pending = list(self._pending)
+        for future in pending:
+            try:
+                future.result(timeout=timeout)
+            except Exception:  # noqa: BLE001
+                pass
+
+    def close(self) -> None:
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is None:
+            return
+        self._queue.put(None)
+        thread.join()
+
+    def _discard(self, future: Future) -> None:
+        with self._lock:
+            self._pending.discard(future)
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="output-writer", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            source, destination, encoder, future = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                self._commit(source, destination, encoder)
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("Çıktı yazılamadı (%s): %s", destination, exc)
+                future.set_exception(exc)
+            else:
+                future.set_result(destination)
+
+    def _commit(self, source: Path, destination: Path, encoder: Optional[ImageEncoder]) -> None:
+        partial = partial_path_for(destination)
+        try:
+            with metrics.span("photo_write"), open(partial, "wb", buffering=COPY_BUFFER_SIZE) as dst:
+                if encoder is not None:
+                    with metrics.span("photo_encode"):
+                        encoder.encode(source, dst)
+                else:
+                    with open(source, "rb") as src:
+                        shutil.copyfileobj(src, dst, COPY_BUFFER_SIZE)
+                if self.fsync:
+                    dst.flush()
+                    os.fsync(dst.fileno())
+            os.replace(partial, destination)
+        except BaseException:
+            # Yazma, fsync ya da yerine koyma başarısızsa geçici dosya dizinde bırakılmaz
+            discard_partial(partial)
+            raise
+        try:
+            source.unlink()
+        except OSError:
+            pass
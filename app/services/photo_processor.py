@@ -4,12 +4,28 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+import shutil
+import tempfile
+import threading
+import uuid
+from concurrent.futures import Future
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, Optional, Sequence, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple, Union
 
 from biyoves import BiyoVes
 
+from app.logger import logger
+from app.metrics import metrics
+from app.services.face_precheck import FacePrecheck, face_precheck
+from app.services.input_buffer import InputBuffer
+from app.services.input_normalizer import InputNormalizer, staging_suffix_for
+from app.services.memory_governor import memory_governor
+from app.services.output_allocator import OutputPathAllocator
+from app.services.output_writer import OutputWriter
+from app.services.output_profiles import ImageEncoder, OutputProfile, resolve_output_profile
+from app.services.render_cache import DEFAULT_RESULT_CACHE_BYTES, RenderCache, RenderResultCache
+
 
 PHOTO_TYPE_ALIASES = {
     "biometric": "biyometrik",
@@ -36,57 +52,312 @@ class PhotoProcessingError(Exception):
     """Fotoğraf işleme hatası"""
 
 
+class InputRejectedError(PhotoProcessingError):
+    """Girdi ön kontrolden geçemedi; işleme başlanmadı"""
+
+
 @dataclass
 class PhotoJob:
     input_path: Path
     photo_type: str
     layout_type: str
     output_path: Optional[Path] = None
+    output_profile: Optional[Union[str, OutputProfile]] = None
 
 
 @dataclass
 class PhotoResult:
     job: PhotoJob
     output_path: Path
+    pending_write: Optional[Future] = field(default=None, repr=False, compare=False)
+    input_digest: Optional[str] = field(default=None, compare=False)
+
+
+@dataclass
+class Speculation:
+    """Onaydan önce kredisiz çalıştırılan işin kaydı."""
+
+    job: PhotoJob
+    input_buffer: InputBuffer
+    future: Future = field(repr=False)
 
 
 class PhotoProcessor:
     """BiyoVes tabanlı işleme servis katmanı"""
 
-    def __init__(self, base_output_dir: Optional[Path] = None):
+    def __init__(
+        self,
+        base_output_dir: Optional[Path] = None,
+        fsync_outputs: bool = False,
+        output_profile: Optional[Union[str, OutputProfile]] = None,
+        normalize_inputs: bool = True,
+        precheck: Optional[FacePrecheck] = face_precheck,
+        result_cache_bytes: int = DEFAULT_RESULT_CACHE_BYTES,
+        output_allocator: Optional[OutputPathAllocator] = None,
+    ):
         default_dir = Path.home() / "BiyoVesOutputs"
         self.base_output_dir = Path(base_output_dir) if base_output_dir else default_dir
         self.base_output_dir.mkdir(parents=True, exist_ok=True)
+        self.output_profile = resolve_output_profile(output_profile)
+        self._encoders: Dict[OutputProfile, ImageEncoder] = {}
+        self._input_normalizer = InputNormalizer() if normalize_inputs else None
+        self._precheck = precheck
+        self._output_allocator = output_allocator or OutputPathAllocator()
+        self._writer = OutputWriter(fsync=fsync_outputs)
+        self._staging_dir: Optional[Path] = None
+        self._staging_lock = threading.Lock()
+        self.render_cache = RenderCache()
+        self.result_cache = RenderResultCache(result_cache_bytes)
+        memory_governor.add_pressure_callback(self.release_caches)
+
+    def precheck(self, job: PhotoJob) -> InputBuffer:
+        """Kredi düşülmeden önce girdiyi okur ve ucuz denetimlerden geçirir.
 
-    def process_single(self, job: PhotoJob) -> PhotoResult:
+        Umutsuz girdilerde ``InputRejectedError`` yükseltilir. Dönen tampon
+        ``process_single``'a verilirse dosya ikinci kez okunmaz.
+        """
         normalized_job = self._normalize_job(job)
-        output_path = self._resolve_output_path(normalized_job)
+        input_buffer = self._load_input(normalized_job.input_path)
+        if self._precheck is not None:
+            result = self._precheck.check(input_buffer)
+            if not result.ok:
+                raise InputRejectedError(result.reason)
+        return input_buffer
+
+    def process_single(
+        self,
+        job: PhotoJob,
+        write_behind: bool = False,
+        input_buffer: Optional[InputBuffer] = None,
+        remember: bool = False,
+    ) -> PhotoResult:
+        """Fotoğrafı işler; ``write_behind`` ile diske yazma beklenmeden döner.
+
+        Motor çıktıyı yerel bir hazırlık dizinine üretir, yazıcı thread'i
+        dosyayı hedefe atomik olarak taşır. Aynı girdi ve seçenekler için
+        önbellekte ya da spekülatif işte hazır çıktı varsa motor yeniden
+        çalıştırılmaz; ``remember`` ile yeni çıktı da önbelleğe alınır.
+        ``write_behind`` kullanıldığında sonuç ``wait_for_write`` ile
+        kesinleştirilmelidir.
+        """
+        with metrics.span("photo_prepare"):
+            normalized_job = self._normalize_job(job)
+            output_path = self._resolve_output_path(normalized_job)
 
         try:
-            processor = BiyoVes(str(normalized_job.input_path), verbose=False)
-            processor.create_image(
-                normalized_job.photo_type,
-                normalized_job.layout_type,
-                str(output_path)
-            )
-        except Exception as exc:
-            raise PhotoProcessingError(str(exc)) from exc
+            if input_buffer is None:
+                input_buffer = self._load_input(normalized_job.input_path)
+            staged_path = self._take_cached_result(normalized_job, input_buffer)
+            if staged_path is None:
+                staged_path = self._take_speculation(normalized_job, input_buffer)
+            if staged_path is None:
+                staged_path = self._render(normalized_job, input_buffer, remember=remember)
+        except Exception:
+            self._output_allocator.release(output_path)
+            raise
+
+        result = PhotoResult(job=normalized_job, output_path=output_path, input_digest=input_buffer.digest)
+        profile = normalized_job.output_profile
+        encoder = self._encoder_for(profile) if profile else None
+        result.pending_write = self._writer.submit(staged_path, output_path, encoder)
+        if not write_behind:
+            self.wait_for_write(result)
+        return result
 
-        return PhotoResult(job=normalized_job, output_path=output_path)
+    def begin_speculation(self, job: PhotoJob) -> Optional[Speculation]:
+        """Onay beklenirken çalıştırılacak spekülatif işi önbelleğe kaydeder.
+
+        Aynı girdi ve seçenekler için kayıt ya da önbellekte çıktı zaten
+        varsa veya girdi ön kontrolden geçemiyorsa ``None`` döner. Spekülatif işte kredi
+        düşülmez; çıktıyı yalnızca ``process_single`` sahiplenir.
+        """
+        normalized_job = self._normalize_job(job)
+        input_buffer = self._load_input(normalized_job.input_path)
+        if self._precheck is not None and not self._precheck.check(input_buffer).ok:
+            return None
+        key = self._render_key(normalized_job, input_buffer)
+        if key in self.result_cache:
+            return None
+        future = self.render_cache.reserve(key)
+        if future is None:
+            return None
+        return Speculation(normalized_job, input_buffer, future)
+
+    def run_speculation(self, speculation: Speculation) -> None:
+        """Kaydı iptal edilmemişse motoru çalıştırır ve sonucu kayda yazar."""
+        if not speculation.future.set_running_or_notify_cancel():
+            return
+        try:
+            staged_path = self._render(speculation.job, speculation.input_buffer, remember=True)
+        except Exception as exc:  # noqa: BLE001
+            speculation.future.set_exception(exc)
+        else:
+            speculation.future.set_result(staged_path)
+
+    def cancel_speculation(self) -> None:
+        """Bekleyen spekülatif işleri iptal eder, hazır çıktıları siler."""
+        self.render_cache.clear()
+
+    def wait_for_write(self, result: PhotoResult) -> PhotoResult:
+        """Bekleyen çıktı yazımını tamamlar; hata durumunda rezervasyonu bırakır."""
+        pending = result.pending_write
+        if pending is None:
+            return result
+        try:
+            pending.result()
+        except Exception as exc:  # noqa: BLE001
+            self._output_allocator.release(result.output_path)
+            raise PhotoProcessingError(f"Çıktı yazılamadı: {exc}") from exc
+        finally:
+            result.pending_write = None
+        self._output_allocator.confirm(result.output_path)
+        return result
 
     def process_batch(self, jobs: Sequence[PhotoJob]) -> Tuple[List[PhotoResult], List[Tuple[PhotoJob, Exception]]]:
         results: List[PhotoResult] = []
         failures: List[Tuple[PhotoJob, Exception]] = []
+        pending: List[Tuple[PhotoJob, PhotoResult]] = []
 
         for job in jobs:
             try:
-                result = self.process_single(job)
-                results.append(result)
+                pending.append((job, self.process_single(job, write_behind=True)))
+            except Exception as exc:  # noqa: BLE001
+                failures.append((job, exc))
+
+        for job, result in pending:
+            try:
+                results.append(self.wait_for_write(result))
             except Exception as exc:  # noqa: BLE001
                 failures.append((job, exc))
 
         return results, failures
 
+    def release_caches(self) -> None:
+        """Bellek baskısında yeniden oluşturulabilir tamponları bırakır."""
+        self._encoders = {}
+        self.result_cache.clear()
+
+    def close(self) -> None:
+        """Yazıcı thread'ini durdurur ve hazırlık dizinini temizler."""
+        self.render_cache.clear()
+        self._writer.close()
+        with self._staging_lock:
+            staging_dir, self._staging_dir = self._staging_dir, None
+        if staging_dir is not None:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+
+    @staticmethod
+    def _load_input(path: Path) -> InputBuffer:
+        try:
+            return InputBuffer.load(path)
+        except OSError as exc:
+            raise PhotoProcessingError(f"Dosya okunamadı: {path}") from exc
+
+    def _render(self, job: PhotoJob, input_buffer: InputBuffer, remember: bool = False) -> Path:
+        """Motoru çalıştırır; çıktı hazırlık dizininde kalır."""
+        staged_path = self._new_staging_path(self._staged_suffix(job))
+        engine_input = job.input_path
+        try:
+            engine_input = self._prepare_engine_input(job, input_buffer)
+            with metrics.span("photo_engine"):
+                processor = BiyoVes(str(engine_input), verbose=False)
+                processor.create_image(
+                    job.photo_type,
+                    job.layout_type,
+                    str(staged_path)
+                )
+            if not staged_path.exists():
+                raise PhotoProcessingError("Çıktı dosyası oluşturulamadı")
+        except Exception as exc:
+            self._discard_staged(staged_path)
+            if isinstance(exc, PhotoProcessingError):
+                raise
+            raise PhotoProcessingError(str(exc)) from exc
+        finally:
+            if engine_input != job.input_path:
+                self._discard_staged(engine_input)
+        if remember:
+            try:
+                self.result_cache.put(self._render_key(job, input_buffer), staged_path.read_bytes())
+            except OSError as exc:
+                logger.debug("Çıktı önbelleğe alınamadı: %s", exc)
+        return staged_path
+
+    def _take_cached_result(self, job: PhotoJob, input_buffer: InputBuffer) -> Optional[Path]:
+        data = self.result_cache.get(self._render_key(job, input_buffer))
+        if data is None:
+            return None
+        staged_path = self._new_staging_path(self._staged_suffix(job))
+        staged_path.write_bytes(data)
+        return staged_path
+
+    def _take_speculation(self, job: PhotoJob, input_buffer: InputBuffer) -> Optional[Path]:
+        future = self.render_cache.claim(self._render_key(job, input_buffer))
+        # Henüz başlamamış spekülatif iş iptal edilir; motor burada çalışır
+        if future is None or future.cancel():
+            return None
+        try:
+            return future.result()
+        except Exception as exc:  # noqa: BLE001
+            logger.info("Spekülatif işleme başarısız, yeniden işleniyor (%s): %s", job.input_path.name, exc)
+            return None
+
+    def _render_key(self, job: PhotoJob, input_buffer: InputBuffer) -> Tuple[str, str, str, str]:
+        return input_buffer.digest, job.photo_type, job.layout_type, self._staged_suffix(job)
+
+    @staticmethod
+    def _staged_suffix(job: PhotoJob) -> str:
+        # Profil varsa motor kayıpsız PNG üretir, son kodlama yazıcıda yapılır
+        if job.output_profile:
+            return ".png"
+        return (job.output_path.suffix if job.output_path else "") or ".jpg"
+
+    def _prepare_engine_input(self, job: PhotoJob, input_buffer: InputBuffer) -> Path:
+        """Motora verilecek yerel dosyayı hazırlar.
+
+        Girdi bir kez okunur; küçültme bu tampondan yapılır. Küçültme
+        gerekmezse ve dosya hazırlık dizininden farklı bir aygıttaysa (ör.
+        ağ paylaşımı) tampon yerel bir kopyaya yazılır, böylece motor dosyayı
+        ağdan ikinci kez okumaz.
+        """
+        staging_path = self._new_staging_path(staging_suffix_for(job.input_path))
+        if self._input_normalizer is not None:
+            try:
+                normalized = self._input_normalizer.normalize(input_buffer, job.photo_type, staging_path)
+            except Exception as exc:  # noqa: BLE001
+                # Küçültme yalnızca hızlandırmadır; okunamayan girdiyi motor kendisi raporlar
+                logger.warning("Girdi küçültülemedi, orijinal kullanılıyor (%s): %s", job.input_path.name, exc)
+                self._discard_staged(staging_path)
+            else:
+                if normalized.downscaled:
+                    logger.debug("Girdi küçültüldü (%s): %s -> %s", job.input_path.name,
+                                 normalized.original_size, normalized.size)
+                    return normalized.path
+        if input_buffer.shares_device_with(staging_path.parent):
+            return job.input_path
+        return input_buffer.write_to(staging_path.with_suffix(job.input_path.suffix))
+
+    def _encoder_for(self, profile: OutputProfile) -> ImageEncoder:
+        encoder = self._encoders.get(profile)
+        if encoder is None:
+            encoder = ImageEncoder(profile)
+            self._encoders[profile] = encoder
+        return encoder
+
+    def _new_staging_path(self, suffix: str) -> Path:
+        with self._staging_lock:
+            if self._staging_dir is None or not self._staging_dir.exists():
+                self._staging_dir = Path(tempfile.mkdtemp(prefix="biyoves-staging-"))
+            staging_dir = self._staging_dir
+        return staging_dir / f"{uuid.uuid4().hex}{suffix or '.jpg'}"
+
+    @staticmethod
+    def _discard_staged(path: Path) -> None:
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
     def _normalize_job(self, job: PhotoJob) -> PhotoJob:
         input_path = Path(job.input_path)
         if not input_path.exists():
@@ -100,12 +371,18 @@ class PhotoProcessor:
         if not layout_type:
             raise PhotoProcessingError(f"Geçersiz düzen tipi: {job.layout_type}")
 
+        try:
+            output_profile = resolve_output_profile(job.output_profile) if job.output_profile else self.output_profile
+        except ValueError as exc:
+            raise PhotoProcessingError(str(exc)) from exc
+
         output_path = Path(job.output_path) if job.output_path else None
         return PhotoJob(
             input_path=input_path,
             photo_type=photo_type,
             layout_type=layout_type,
-            output_path=output_path
+            output_path=output_path,
+            output_profile=output_profile,
         )
 
     def _resolve_output_path(self, job: PhotoJob) -> Path:
@@ -113,20 +390,11 @@ class PhotoProcessor:
             target = job.output_path
         else:
             target = self.base_output_dir / f"{job.input_path.stem}_{job.photo_type}_{job.layout_type}.jpg"
+        if job.output_profile:
+            target = target.with_suffix(job.output_profile.extension)
 
         target.parent.mkdir(parents=True, exist_ok=True)
         return self._make_unique(target)
 
-    @staticmethod
-    def _make_unique(path: Path) -> Path:
-        if not path.exists():
-            return path
-
-        counter = 1
-        stem = path.stem
-        suffix = path.suffix or ".jpg"
-        while True:
-            candidate = path.with_name(f"{stem}_{counter}{suffix}")
-            if not candidate.exists():
-                return candidate
-            counter += 1
+    def _make_unique(self, path: Path) -> Path:
+        return self._output_allocator.allocate(path)
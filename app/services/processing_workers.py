@@ -4,13 +4,43 @@
 
 from __future__ import annotations
 
-from typing import List, Sequence
+import time
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
 
 from PySide6.QtCore import QThread, Signal
 
-from app.services.photo_processor import PhotoProcessor, PhotoJob, PhotoResult
+from app.services.photo_processor import InputRejectedError, PhotoProcessor, PhotoJob, PhotoResult
 from app.services.credit_service import credit_service
+from app.services.isolated_engine import IsolatedEngine
+from app.services.job_queue import JobQueue, new_worker_id
+from app.services.memory_governor import MemoryGovernor, estimate_job_bytes, memory_governor
+from app.services.scheduler import (
+    LANE_BULK,
+    LANE_INTERACTIVE,
+    LANE_SPECULATIVE,
+    ProcessingScheduler,
+    processing_scheduler,
+)
 from app.logger import logger
+from app.metrics import metrics
+
+JOB_OK = "ok"
+JOB_FAILED = "failed"
+JOB_REJECTED = "rejected"
+# Özetteki hata örnekleri; geri kalanlar yalnızca sayılır
+MAX_FAILURE_SAMPLES = 20
+# Spekülatif iş boş yuva için en fazla bu kadar bekler
+SPECULATION_SLOT_TIMEOUT_SECONDS = 5.0
+
+
+def _record_job_outcome(success: bool) -> None:
+    if success:
+        metrics.counter("photo_jobs_succeeded_total", "Başarıyla işlenen fotoğraflar").inc()
+        metrics.meter("photo_jobs", "Tamamlanan fotoğraf işleri").mark()
+    else:
+        metrics.counter("photo_jobs_failed_total", "Başarısız fotoğraf işleri").inc()
 
 
 class SinglePhotoWorker(QThread):
@@ -20,13 +50,29 @@ class SinglePhotoWorker(QThread):
     credit_error = Signal(str)
     credit_updated = Signal(int)
 
-    def __init__(self, processor: PhotoProcessor, job: PhotoJob, user_id: str):
+    def __init__(
+        self,
+        processor: PhotoProcessor,
+        job: PhotoJob,
+        user_id: str,
+        scheduler: Optional[ProcessingScheduler] = None,
+    ):
         super().__init__()
         self.processor = processor
         self.job = job
         self.user_id = user_id
+        self.scheduler = scheduler or processing_scheduler
 
     def run(self) -> None:  # noqa: D401
+        # Umutsuz girdiler kredi düşülmeden reddedilir; düşme/iade turu yaşanmaz
+        try:
+            input_buffer = self.processor.precheck(self.job)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Girdi ön kontrolden geçemedi: %s", exc)
+            _record_job_outcome(False)
+            self.error.emit(str(exc))
+            return
+
         try:
             success, new_credits, message = credit_service.use_credit(self.user_id)
             if not success:
@@ -36,11 +82,16 @@ class SinglePhotoWorker(QThread):
 
             total = 1
             self.progress.emit(0, total)
-            result = self.processor.process_single(self.job)
+            # Etkileşimli şerit, devam eden toplu işlemin önüne geçer
+            job_bytes = estimate_job_bytes(input_buffer, self.job.photo_type)
+            with self.scheduler.slot(LANE_INTERACTIVE), memory_governor.admit(job_bytes), metrics.span("photo_job"):
+                result = self.processor.process_single(self.job, input_buffer=input_buffer, remember=True)
+            _record_job_outcome(True)
             self.progress.emit(1, total)
             self.finished.emit(result)
         except Exception as exc:  # noqa: BLE001
             logger.exception("Tekli işleme hatası: %s", exc)
+            _record_job_outcome(False)
             refund_success, refund_credits, refund_message = credit_service.refund_credit(
                 self.user_id,
                 reason="İşlem başarısız - iade",
@@ -52,53 +103,316 @@ class SinglePhotoWorker(QThread):
             self.error.emit(str(exc))
 
 
+class SpeculativeWorker(QThread):
+    """Operatör seçenekleri belirlerken çıktıyı kredisiz olarak önceden hazırlar.
+
+    Sonuç ``PhotoProcessor`` önbelleğinde bekler; onaylı ``SinglePhotoWorker``
+    kredisini düşüp hazır çıktıyı sahiplenir. Onay gelmezse iş iptal edilir
+    ya da çıktısı silinir.
+    """
+
+    def __init__(
+        self,
+        processor: PhotoProcessor,
+        job: PhotoJob,
+        scheduler: Optional[ProcessingScheduler] = None,
+        governor: Optional[MemoryGovernor] = None,
+    ):
+        super().__init__()
+        self.processor = processor
+        self.job = job
+        self.scheduler = scheduler or processing_scheduler
+        self.governor = governor or memory_governor
+
+    def run(self) -> None:
+        try:
+            speculation = self.processor.begin_speculation(self.job)
+            if speculation is None or speculation.future.cancelled():
+                return
+            job_bytes = estimate_job_bytes(speculation.input_buffer, self.job.photo_type)
+            # Boş yuva kısa sürede bulunamazsa spekülasyondan vazgeçilir; onaylı iş kendisi işler
+            if not self.scheduler.acquire(LANE_SPECULATIVE, timeout=SPECULATION_SLOT_TIMEOUT_SECONDS):
+                speculation.future.cancel()
+                return
+            try:
+                with self.governor.admit(job_bytes), metrics.span("photo_speculate"):
+                    self.processor.run_speculation(speculation)
+            finally:
+                self.scheduler.release(LANE_SPECULATIVE)
+        except Exception as exc:  # noqa: BLE001
+            # Hata onaylı işlemde yeniden denenir ve orada raporlanır
+            logger.debug("Spekülatif işleme atlandı: %s", exc)
+
+
+@dataclass(frozen=True)
+class BatchJobRecord:
+    """Tek bir toplu işin özeti; istisna ve görüntü nesnesi tutmaz."""
+
+    index: int
+    input_path: Path
+    status: str
+    output_path: Optional[Path] = None
+    error: str = ""
+    elapsed: float = 0.0
+
+
+@dataclass
+class BatchSummary:
+    """Sayaçlardan oluşturulan toplu işlem özeti."""
+
+    total: int
+    succeeded: int = 0
+    failed: int = 0
+    rejected: int = 0
+    skipped: int = 0
+    elapsed: float = 0.0
+    stop_reason: str = ""
+    failure_samples: List[Tuple[str, str]] = field(default_factory=list)
+
+    @property
+    def finished(self) -> int:
+        return self.succeeded + self.failed + self.rejected
+
+    @property
+    def unsuccessful(self) -> int:
+        return self.failed + self.rejected + self.skipped
+
+    def add_failure(self, record: BatchJobRecord) -> None:
+        if record.status == JOB_REJECTED:
+            self.rejected += 1
+        else:
+            self.failed += 1
+        if len(self.failure_samples) < MAX_FAILURE_SAMPLES:
+            self.failure_samples.append((record.input_path.name, record.error))
+
+
 class BatchPhotoWorker(QThread):
+    """Fotoğrafları sırayla işler; her iş bitince ``job_finished`` yayar.
+
+    Sonuçlar ve istisnalar biriktirilmez; uzun çalışmalarda bellek
+    kullanımı iş sayısıyla büyümez. ``completed`` yalnızca
+    ``BatchSummary`` taşır. ``job_timeout`` verildiğinde motor ayrı bir
+    süreçte çalışır; süreyi aşan iş sonlandırılır, başarısız sayılır ve
+    kredisi iade edilir. Bu mod isteğe bağlıdır: alt süreç girdiyi
+    diskten yeniden okur, yazım beklenerek yapılır ve aşama metrikleri
+    alt sürecin kayıt defterinde kalır.
+    """
+
     progress = Signal(int, int)
-    completed = Signal(list, list)
+    job_finished = Signal(object)
+    completed = Signal(object)
     credit_updated = Signal(int)
     credit_error = Signal(str)
 
-    def __init__(self, processor: PhotoProcessor, jobs: Sequence[PhotoJob], user_id: str):
+    def __init__(
+        self,
+        processor: PhotoProcessor,
+        jobs: Sequence[PhotoJob],
+        user_id: str,
+        job_queue: Optional[JobQueue] = None,
+        priority: int = 0,
+        scheduler: Optional[ProcessingScheduler] = None,
+        governor: Optional[MemoryGovernor] = None,
+        job_timeout: Optional[float] = None,
+    ):
         super().__init__()
         self.processor = processor
         self.jobs = list(jobs)
+        self.job_timeout = job_timeout
+        self._engine: Optional[IsolatedEngine] = None
         self.user_id = user_id
+        self.job_queue = job_queue
+        self.priority = priority
+        self.scheduler = scheduler or processing_scheduler
+        self.governor = governor or memory_governor
+        self._processed = 0
+        self._summary = BatchSummary(total=len(self.jobs))
+        self._started_at: Optional[float] = None
+        self._queue_owner = new_worker_id("desktop")
+        self._queue_ids: Dict[int, str] = {}
 
     def run(self) -> None:
-        results: List[PhotoResult] = []
-        failures = []
-        total = len(self.jobs)
-        processed = 0
+        pending: List[Tuple[int, PhotoJob, PhotoResult, float]] = []
+        self._processed = 0
+        self._summary = summary = BatchSummary(total=len(self.jobs))
+        self._started_at = batch_started = time.perf_counter()
+
+        if self.job_timeout:
+            self._engine = IsolatedEngine(
+                self.processor.base_output_dir, self.processor.output_profile, timeout=self.job_timeout
+            )
 
         try:
-            for job in self.jobs:
+            self._enqueue_jobs()
+            for index, job in enumerate(self.jobs):
+                started = time.perf_counter()
+                try:
+                    input_buffer = self.processor.precheck(job)
+                except Exception as exc:  # noqa: BLE001
+                    self._reject_job(index, job, exc, started)
+                    continue
+
+                # Kuyruk kaydı kredi düşülmeden alınır; başka bir tüketici (``queue work``)
+                # işi almışsa fotoğraf burada ikinci kez işlenip ücretlendirilmez
+                if not self._claim_queued(job):
+                    summary.skipped += 1
+                    continue
+
                 credit_success, new_credits, message = credit_service.use_credit(self.user_id)
                 if not credit_success:
-                    error = Exception(message or "Yetersiz kredi")
-                    failures.append((job, error))
-                    self.credit_error.emit(message or "Yetersiz kredi")
+                    summary.stop_reason = message or "Yetersiz kredi"
+                    summary.skipped += len(self.jobs) - index
+                    self.credit_error.emit(summary.stop_reason)
+                    self._release_claimed(job)
+                    self._cancel_queued(self.jobs[index:])
                     break
                 self.credit_updated.emit(new_credits)
 
                 try:
-                    result = self.processor.process_single(job)
-                    results.append(result)
+                    # Çıktı yazımı arka planda sürerken sıradaki işe geçilir
+                    # Bellek bütçesi dolmuşsa (ör. paralel tekli işlem) yer açılana kadar beklenir;
+                    # kilit sırası tekli işle aynıdır (önce yuva, sonra bellek)
+                    job_bytes = estimate_job_bytes(input_buffer, job.photo_type)
+                    with self.scheduler.slot(LANE_BULK), self.governor.admit(job_bytes), metrics.span("photo_job"):
+                        result = self._process(job, input_buffer)
+                    pending.append((index, job, result, started))
                 except Exception as exc:  # noqa: BLE001
-                    logger.exception("Toplu işleme hatası: %s", exc)
-                    refund_success, refund_credits, refund_message = credit_service.refund_credit(
-                        self.user_id,
-                        reason="İşlem başarısız - iade",
-                    )
-                    if refund_success:
-                        self.credit_updated.emit(refund_credits)
-                    else:
-                        self.credit_error.emit(refund_message or "Kredi iadesi başarısız")
-                    failures.append((job, exc))
-                else:
-                    processed += 1
-                    self.progress.emit(processed, total)
+                    self._handle_job_failure(index, job, exc, started)
+                finally:
+                    # Tampon bir sonraki girdi okunurken bellekte kalmasın
+                    input_buffer = None
+                self._settle_writes(pending, block=False)
         except Exception as exc:  # noqa: BLE001
             logger.exception("Toplu işleme beklenmeyen hata: %s", exc)
             self.credit_error.emit(str(exc))
         finally:
-            self.completed.emit(results, failures)
+            self._settle_writes(pending, block=True)
+            if self._engine is not None:
+                self._engine.close()
+                self._engine = None
+            if self.job_queue is not None:
+                self.job_queue.close()
+            summary.elapsed = time.perf_counter() - batch_started
+            self.completed.emit(summary)
+
+    def _process(self, job: PhotoJob, input_buffer) -> PhotoResult:
+        if self._engine is not None:
+            # Yardımcı süreç çıktıyı yazıp döner; bekleyen yazım yoktur
+            return self._engine.run(job)
+        return self.processor.process_single(job, write_behind=True, input_buffer=input_buffer)
+
+    def progress_snapshot(self) -> BatchSummary:
+        """Sayaçların anlık kopyası; arayüz bunu sabit aralıklarla okur, iş thread'i beklemez."""
+        summary = self._summary
+        elapsed = summary.elapsed
+        if not elapsed and self._started_at is not None:
+            elapsed = time.perf_counter() - self._started_at
+        return replace(summary, elapsed=elapsed, failure_samples=list(summary.failure_samples))
+
+    def _settle_writes(self, pending, block: bool) -> None:
+        total = len(self.jobs)
+        while pending:
+            index, job, result, started = pending[0]
+            if not block and result.pending_write is not None and not result.pending_write.done():
+                return
+            pending.pop(0)
+            try:
+                self.processor.wait_for_write(result)
+            except Exception as exc:  # noqa: BLE001
+                self._handle_job_failure(index, job, exc, started)
+            else:
+                _record_job_outcome(True)
+                self._queue_call("complete", job, result.output_path)
+                self._summary.succeeded += 1
+                self._processed += 1
+                self.job_finished.emit(BatchJobRecord(
+                    index, job.input_path, JOB_OK, result.output_path, elapsed=time.perf_counter() - started
+                ))
+                self.progress.emit(self._processed, total)
+
+    def _handle_job_failure(self, index: int, job: PhotoJob, exc: Exception, started: float) -> None:
+        logger.exception("Toplu işleme hatası: %s", exc)
+        _record_job_outcome(False)
+        self._queue_call("fail", job, str(exc), False)
+        refund_success, refund_credits, refund_message = credit_service.refund_credit(
+            self.user_id,
+            reason="İşlem başarısız - iade",
+        )
+        if refund_success:
+            self.credit_updated.emit(refund_credits)
+        else:
+            self.credit_error.emit(refund_message or "Kredi iadesi başarısız")
+        self._finish_failed(BatchJobRecord(
+            index, job.input_path, JOB_FAILED, error=str(exc), elapsed=time.perf_counter() - started
+        ))
+
+    def _reject_job(self, index: int, job: PhotoJob, exc: Exception, started: float) -> None:
+        """Ön kontrolden geçemeyen iş; kredi düşülmediği için iade de yapılmaz."""
+        level = logger.info if isinstance(exc, InputRejectedError) else logger.warning
+        level("Girdi ön kontrolden geçemedi (%s): %s", job.input_path, exc)
+        _record_job_outcome(False)
+        self._claim_queued(job)
+        self._queue_call("fail", job, str(exc), False)
+        self._finish_failed(BatchJobRecord(
+            index, job.input_path, JOB_REJECTED, error=str(exc), elapsed=time.perf_counter() - started
+        ))
+
+    def _finish_failed(self, record: BatchJobRecord) -> None:
+        self._summary.add_failure(record)
+        self.job_finished.emit(record)
+
+    def _enqueue_jobs(self) -> None:
+        """İşleri kalıcı kuyruğa yazar; uygulama kapanırsa ``queue work`` kaldığı yerden sürdürebilir."""
+        if self.job_queue is None:
+            return
+        try:
+            job_ids = self.job_queue.enqueue_many(
+                self.jobs, priority=self.priority, user_id=self.user_id, max_attempts=1
+            )
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("İşler kuyruğa yazılamadı, kuyruksuz devam ediliyor: %s", exc)
+            return
+        self._queue_ids = {id(job): job_id for job, job_id in zip(self.jobs, job_ids)}
+
+    def _claim_queued(self, job: PhotoJob) -> bool:
+        """Kuyruk kaydını kiralar; iş başka bir tüketicideyse ``False`` döner."""
+        job_id = self._queue_ids.get(id(job))
+        if job_id is None:
+            return True
+        try:
+            if not self.job_queue.claim(self._queue_owner, job_ids=[job_id]):
+                logger.warning("Kuyruktaki iş başka bir tüketici tarafından alınmış, atlanıyor: %s", job_id)
+                self._queue_ids.pop(id(job), None)
+                return False
+        except Exception as exc:  # noqa: BLE001
+            # Kuyruk yalnızca kaldığı yerden sürdürmek için tutulur; erişilemezse iş yine işlenir
+            logger.warning("Kuyruk güncellenemedi: %s", exc)
+        return True
+
+    def _release_claimed(self, job: PhotoJob) -> None:
+        """Kiralanıp işlenmeyen kaydı sıraya geri bırakır; ardından iptal edilebilir."""
+        job_id = self._queue_ids.get(id(job))
+        if job_id is None:
+            return
+        try:
+            self.job_queue.release(job_id, self._queue_owner)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Kuyruk güncellenemedi: %s", exc)
+
+    def _cancel_queued(self, jobs: Sequence[PhotoJob]) -> None:
+        for job in jobs:
+            job_id = self._queue_ids.pop(id(job), None)
+            if job_id is not None:
+                try:
+                    self.job_queue.cancel(job_id)
+                except Exception as exc:  # noqa: BLE001
+                    logger.warning("Kuyruk güncellenemedi: %s", exc)
+
+    def _queue_call(self, method: str, job: PhotoJob, *args) -> None:
+        job_id = self._queue_ids.pop(id(job), None)
+        if job_id is None:
+            return
+        try:
+            getattr(self.job_queue, method)(job_id, self._queue_owner, *args)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Kuyruk güncellenemedi: %s", exc)
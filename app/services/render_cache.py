@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+
+"""Spekülatif olarak hazırlanan motor çıktıları için kısa ömürlü önbellek"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Hashable, Optional, Tuple
+
+from app.metrics import metrics
+
+DEFAULT_TTL_SECONDS = 180.0
+DEFAULT_MAX_ENTRIES = 4
+DEFAULT_RESULT_CACHE_BYTES = 64 * 1024 * 1024
+
+
+@dataclass
+class _Entry:
+    future: Future
+    created_at: float
+
+
+class RenderCache:
+    """Girdi hash'i, tip ve düzene göre anahtarlanmış hazırlık çıktıları.
+
+    Her kayıt, sonucu hazırlık dizinindeki bir dosya olan ``Future``'dır.
+    Süresi dolan, yer açmak için atılan ya da iptal edilen kayıtların
+    dosyaları silinir; henüz çalışan bir iş atılırsa dosyası iş bitince
+    silinir. Kayıtların kredisi yoktur, kredi yalnızca ``claim`` eden
+    onaylı işlemde düşülür.
+    """
+
+    def __init__(self, ttl_seconds: float = DEFAULT_TTL_SECONDS, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: Dict[Hashable, _Entry] = {}
+        self._lock = threading.Lock()
+
+    def reserve(self, key: Hashable) -> Optional[Future]:
+        """Anahtar için boş bir ``Future`` açar; kayıt zaten varsa ``None``."""
+        with self._lock:
+            self._evict_expired()
+            if key in self._entries:
+                return None
+            while len(self._entries) >= self.max_entries:
+                oldest = min(self._entries, key=lambda k: self._entries[k].created_at)
+                self._drop(self._entries.pop(oldest))
+            future: Future = Future()
+            self._entries[key] = _Entry(future, time.monotonic())
+            return future
+
+    def claim(self, key: Hashable) -> Optional[Future]:
+        """Kaydı önbellekten çıkarıp döndürür; sonucun sahibi artık çağırandır."""
+        with self._lock:
+            self._evict_expired()
+            entry = self._entries.pop(key, None)
+        metrics.counter(
+            "speculation_hits_total" if entry else "speculation_misses_total",
+            "Onaylı işlemde hazır bulunan spekülatif çıktılar" if entry else "Spekülatif çıktısı olmayan onaylı işlemler",
+        ).inc()
+        return entry.future if entry else None
+
+    def discard(self, key: Hashable) -> None:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        if entry:
+            self._drop(entry)
+
+    def clear(self) -> None:
+        with self._lock:
+            entries, self._entries = list(self._entries.values()), {}
+        for entry in entries:
+            self._drop(entry)
+
+    def keys(self) -> Tuple[Hashable, ...]:
+        with self._lock:
+            return tuple(self._entries)
+
+    def _evict_expired(self) -> None:
+        now = time.monotonic()
+        expired = [key for key, entry in self._entries.items() if now - entry.created_at > self.ttl_seconds]
+        for key in expired:
+            self._drop(self._entries.pop(key))
+
+    @staticmethod
+    def _drop(entry: _Entry) -> None:
+        metrics.counter("speculation_discarded_total", "Kullanılmadan atılan spekülatif işler").inc()
+        # Başlamamış iş hiç çalışmaz; çalışanın çıktısı bitince silinir
+        if not entry.future.cancel():
+            entry.future.add_done_callback(_remove_output)
+
+
+class RenderResultCache:
+    """Tamamlanmış motor çıktılarının baytlarını tutan, bayt sınırlı LRU önbellek.
+
+    Aynı girdinin başka tip/düzen için işlenmiş hali bellekte kalır;
+    müşteri önceki seçeneğe döndüğünde motor yeniden çalıştırılmaz.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_RESULT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, bytes]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+        if data is not None:
+            metrics.counter("render_cache_hits_total", "Önbellekten yeniden kullanılan çıktılar").inc()
+        return data
+
+    def put(self, key: Hashable, data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[key] = data
+            self._size += len(data)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+            self._publish()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            self._publish()
+
+    def _publish(self) -> None:
+        metrics.gauge("render_cache_bytes", "Çıktı önbelleğindeki bayt").set(self._size)
+
+
+def _remove_output(future: Future) -> None:
+    if future.cancelled() or future.exception() is not None:
+        return
+    try:
+        Path(future.result()).unlink()
+    except OSError:
+        pass
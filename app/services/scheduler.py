@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+
+"""Tekli ve toplu işleri ortak motor kapasitesinde sıraya koyan zamanlayıcı"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+from app.metrics import metrics
+
+LANE_INTERACTIVE = "interactive"
+LANE_BULK = "bulk"
+LANE_SPECULATIVE = "speculative"
+LANES = (LANE_INTERACTIVE, LANE_BULK, LANE_SPECULATIVE)
+
+DEFAULT_MAX_CONCURRENCY = 2
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, ""))
+    except ValueError:
+        return default
+
+
+class ProcessingScheduler:
+    """Şeritli (interactive/bulk/speculative) eşzamanlılık sınırlayıcı.
+
+    Boşalan her motor yuvası önce bekleyen etkileşimli işlere verilir.
+    ``interactive_reserved`` kadar yuva toplu işlere hiç verilmez; böylece
+    uzun bir toplu işlem sürerken gelen tekli fotoğraf, çalışan toplu işin
+    bitmesini beklemeden başlar. Çalışan spekülatif işler de bu sınırdan
+    düşülür. Spekülatif işler en düşük önceliklidir:
+    yalnızca başka şeritte bekleyen yokken ve en az bir yuva boş
+    kalacaksa başlar, böylece terk edilen bir spekülasyon onaylı işi
+    bekletmez. Tek yuvalı zamanlayıcıda spekülasyon çalışmaz.
+    """
+
+    def __init__(self, max_concurrency: Optional[int] = None, interactive_reserved: Optional[int] = None):
+        if max_concurrency is None:
+            max_concurrency = _env_int("BIYOVES_MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY)
+        self.max_concurrency = max(1, max_concurrency)
+        if interactive_reserved is None:
+            interactive_reserved = _env_int("BIYOVES_INTERACTIVE_RESERVED", 1 if self.max_concurrency > 1 else 0)
+        self.interactive_reserved = min(max(0, interactive_reserved), self.max_concurrency - 1)
+        self._condition = threading.Condition()
+        self._active: Dict[str, int] = {lane: 0 for lane in LANES}
+        self._waiting: Dict[str, int] = {lane: 0 for lane in LANES}
+
+    @property
+    def bulk_limit(self) -> int:
+        return self.max_concurrency - self.interactive_reserved
+
+    def active(self, lane: Optional[str] = None) -> int:
+        with self._condition:
+            return self._active[lane] if lane else sum(self._active.values())
+
+    def _can_start(self, lane: str) -> bool:
+        total_active = sum(self._active.values())
+        if total_active >= self.max_concurrency:
+            return False
+        if lane == LANE_INTERACTIVE:
+            return True
+        if lane == LANE_SPECULATIVE:
+            if self._waiting[LANE_INTERACTIVE] or self._waiting[LANE_BULK]:
+                return False
+            return total_active < self.max_concurrency - max(1, self.interactive_reserved)
+        # Spekülatif yuvalar da toplu sınırdan düşülür; ayrılmış yuvalar her zaman etkileşimli işe kalır
+        background = self._active[LANE_BULK] + self._active[LANE_SPECULATIVE]
+        return not self._waiting[LANE_INTERACTIVE] and background < self.bulk_limit
+
+    def acquire(self, lane: str, timeout: Optional[float] = None) -> bool:
+        if lane not in LANES:
+            raise ValueError(f"Bilinmeyen şerit: {lane}")
+        started = time.perf_counter()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            self._waiting[lane] += 1
+            try:
+                while not self._can_start(lane):
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        self._condition.notify_all()
+                        return False
+                    self._condition.wait(remaining)
+                self._active[lane] += 1
+            finally:
+                self._waiting[lane] -= 1
+            self._publish()
+        metrics.histogram(f"scheduler_wait_{lane}_seconds").observe(time.perf_counter() - started)
+        return True
+
+    def release(self, lane: str) -> None:
+        with self._condition:
+            self._active[lane] = max(0, self._active[lane] - 1)
+            self._publish()
+            self._condition.notify_all()
+
+    @contextmanager
+    def slot(self, lane: str) -> Iterator[None]:
+        """Şeritte bir motor yuvası alır, blok bitince bırakır."""
+        self.acquire(lane)
+        try:
+            yield
+        finally:
+            self.release(lane)
+
+    def _publish(self) -> None:
+        for lane in LANES:
+            metrics.gauge(f"scheduler_active_{lane}", "Şeritte çalışan iş sayısı").set(self._active[lane])
+
+
+processing_scheduler = ProcessingScheduler()
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+
+"""Toplu işlem sırasında hız, kalan süre ve aşama dağılımını gösteren pano"""
+
+from __future__ import annotations
+
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+from PySide6.QtCore import Qt, QTimer
+from PySide6.QtWidgets import QLabel, QProgressBar, QVBoxLayout, QWidget
+
+from app.config import modern_theme
+from app.metrics import metrics
+from app.services.processing_workers import BatchPhotoWorker, BatchSummary
+
+# Pano saniyede en fazla bu kadar yenilenir; iş sayısı ne olursa olsun olay döngüsü boğulmaz
+FRAME_INTERVAL_MS = 250
+# Hız ve kalan süre bu pencerenin hareketli ortalamasıdır
+RATE_WINDOW_SECONDS = 30.0
+
+# Gösterilen aşamalar: (metrik adı, etiket)
+STAGES: Tuple[Tuple[str, str], ...] = (
+    ("photo_precheck", "Ön kontrol"),
+    ("photo_read", "Okuma"),
+    ("photo_normalize", "Küçültme"),
+    ("photo_engine", "Motor"),
+    ("photo_encode", "Kodlama"),
+    ("photo_write", "Yazma"),
+    ("credit_charge", "Kredi"),
+    ("credit_refund", "İade"),
+)
+
+
+def _format_duration(seconds: float) -> str:
+    seconds = int(round(seconds))
+    hours, remainder = divmod(seconds, 3600)
+    minutes, secs = divmod(remainder, 60)
+    if hours:
+        return f"{hours} sa {minutes:02d} dk"
+    if minutes:
+        return f"{minutes} dk {secs:02d} sn"
+    return f"{secs} sn"
+
+
+class BatchDashboard(QWidget):
+    """Worker sayaçlarını ve aşama metriklerini sabit kare hızında okuyan pano.
+
+    İş başına sinyal dinlenmez; ``FRAME_INTERVAL_MS`` aralıkla
+    ``BatchPhotoWorker.progress_snapshot`` ve aşama histogramları okunur,
+    yalnızca değişen metinler yeniden çizilir.
+    """
+
+    def __init__(self, parent: Optional[QWidget] = None):
+        super().__init__(parent)
+        self._worker: Optional[BatchPhotoWorker] = None
+        self._samples: Deque[Tuple[float, int]] = deque()
+        self._stage_baseline: Dict[str, float] = {}
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(modern_theme.SPACING_XS)
+
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setTextVisible(True)
+        self.progress_bar.setFormat("%v/%m")
+        layout.addWidget(self.progress_bar)
+
+        self.counts_label = self._make_label(modern_theme.TEXT_PRIMARY, layout)
+        self.rate_label = self._make_label(modern_theme.TEXT_SECONDARY, layout)
+        self.stages_label = self._make_label(modern_theme.TEXT_TERTIARY, layout)
+        self.stages_label.setWordWrap(True)
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(FRAME_INTERVAL_MS)
+        self._timer.timeout.connect(self._refresh)
+        self.setVisible(False)
+
+    @staticmethod
+    def _make_label(color: str, layout: QVBoxLayout) -> QLabel:
+        label = QLabel()
+        label.setAlignment(Qt.AlignCenter)
+        label.setStyleSheet(f"color: {color};")
+        layout.addWidget(label)
+        return label
+
+    def start(self, worker: BatchPhotoWorker) -> None:
+        self._worker = worker
+        self._samples.clear()
+        self._stage_baseline = {name: self._stage_seconds(name) for name, _ in STAGES}
+        self.progress_bar.setRange(0, max(1, len(worker.jobs)))
+        self.progress_bar.setValue(0)
+        self.setVisible(True)
+        self._refresh()
+        self._timer.start()
+
+    def stop(self) -> None:
+        """Son durumu çizer ve yenilemeyi durdurur."""
+        if self._worker is not None:
+            self._refresh()
+        self._timer.stop()
+        self._worker = None
+        self.setVisible(False)
+
+    def _refresh(self) -> None:
+        if self._worker is None:
+            return
+        summary = self._worker.progress_snapshot()
+        done = summary.finished
+        now = time.monotonic()
+        self._samples.append((now, done))
+        while len(self._samples) > 2 and now - self._samples[0][0] > RATE_WINDOW_SECONDS:
+            self._samples.popleft()
+
+        if self.progress_bar.value() != done:
+            self.progress_bar.setValue(done)
+        self._set_text(self.counts_label, self._counts_text(summary))
+        self._set_text(self.rate_label, self._rate_text(summary))
+        self._set_text(self.stages_label, self._stages_text(done))
+
+    @staticmethod
+    def _set_text(label: QLabel, text: str) -> None:
+        if label.text() != text:
+            label.setText(text)
+
+    @staticmethod
+    def _counts_text(summary: BatchSummary) -> str:
+        parts = [f"{summary.succeeded} başarılı"]
+        if summary.failed:
+            parts.append(f"{summary.failed} başarısız")
+        if summary.rejected:
+            parts.append(f"{summary.rejected} reddedildi")
+        if summary.skipped:
+            parts.append(f"{summary.skipped} atlandı")
+        return " · ".join(parts)
+
+    def _rate_text(self, summary: BatchSummary) -> str:
+        rate = self._moving_rate()
+        remaining = summary.total - summary.finished - summary.skipped
+        parts = [f"Geçen süre {_format_duration(summary.elapsed)}"]
+        if rate > 0:
+            parts.append(f"{rate:.2f} foto/sn")
+            if remaining > 0:
+                parts.append(f"kalan ~{_format_duration(remaining / rate)}")
+        return " · ".join(parts)
+
+    def _moving_rate(self) -> float:
+        if len(self._samples) < 2:
+            return 0.0
+        (first_time, first_done), (last_time, last_done) = self._samples[0], self._samples[-1]
+        elapsed = last_time - first_time
+        return (last_done - first_done) / elapsed if elapsed > 0 else 0.0
+
+    def _stages_text(self, done: int) -> str:
+        spent: List[Tuple[str, float]] = []
+        for name, label in STAGES:
+            seconds = self._stage_seconds(name) - self._stage_baseline.get(name, 0.0)
+            if seconds > 0:
+                spent.append((label, seconds))
+        total = sum(seconds for _, seconds in spent)
+        if not total or not done:
+            return ""
+        # Aşamalar iş başına ortalama süre ve toplam içindeki payla gösterilir
+        return " · ".join(
+            f"{label} {seconds / done * 1000:.0f} ms ({seconds / total:.0%})" for label, seconds in spent
+        )
+
+    @staticmethod
+    def _stage_seconds(name: str) -> float:
+        return metrics.histogram(f"{name}_seconds").sum
@@ -11,10 +11,15 @@ from PySide6.QtWidgets import (
 from PySide6.QtGui import QFont
 
 from app.config import modern_theme
+from app.logger import logger
+from app.ui.batch_dashboard import BatchDashboard
 from app.ui.widgets import ModernButton, ModernCard, PreviewLabel, show_styled_message
+from app.services.isolated_engine import DEFAULT_JOB_TIMEOUT
+from app.services.job_queue import JobQueue
 from app.services.photo_processor import PhotoProcessor, PhotoJob
-from app.services.processing_workers import BatchPhotoWorker
+from app.services.processing_workers import BatchPhotoWorker, BatchSummary
 from app.utils.file_validation import validate_image_file
+from app.utils.duplicate_detection import DuplicateDetector
 from app.ui.components import WelcomeInfo
 
 
@@ -37,6 +42,7 @@ class BatchProcessingPage(QWidget):
         self.photo_entries: List[Dict[str, Any]] = []
         self.output_folder: Optional[Path] = None
         self.batch_worker: Optional[BatchPhotoWorker] = None
+        self.duplicate_detector = DuplicateDetector(use_perceptual_hash=True)
         self.get_credit_balance = credit_balance_getter
         self._current_credits = 0
         self._current_credits = self._safe_get_balance()
@@ -143,11 +149,8 @@ class BatchProcessingPage(QWidget):
         card_layout.addWidget(scroll_area)
         panel_layout.addWidget(list_card)
 
-        self.progress_label = QLabel()
-        self.progress_label.setAlignment(Qt.AlignCenter)
-        self.progress_label.setStyleSheet(f"color: {modern_theme.TEXT_SECONDARY};")
-        self.progress_label.setVisible(False)
-        panel_layout.addWidget(self.progress_label)
+        self.dashboard = BatchDashboard()
+        panel_layout.addWidget(self.dashboard)
 
         parent_layout.addWidget(panel_frame, 1)
 
@@ -160,6 +163,7 @@ class BatchProcessingPage(QWidget):
         )
         if not files:
             return
+        skipped_duplicates: List[str] = []
         for file_path in files:
             if not file_path:
                 continue
@@ -168,8 +172,42 @@ class BatchProcessingPage(QWidget):
             if not is_valid:
                 show_styled_message(self, "Dosya", f"{path.name}: {message}", QMessageBox.Warning)
                 continue
-            self._create_photo_row(file_path)
+            if not self._register_unique_photo(path):
+                skipped_duplicates.append(path.name)
+                continue
+            if not self._create_photo_row(file_path):
+                self.duplicate_detector.remove(path)
         self._update_placeholder()
+        if skipped_duplicates:
+            shown = skipped_duplicates[:5]
+            lines = ["Aşağıdaki fotoğraflar listede zaten olduğu için eklenmedi:"]
+            lines.extend(f"- {name}" for name in shown)
+            if len(skipped_duplicates) > len(shown):
+                lines.append("...")
+            show_styled_message(self, "Kopya Fotoğraf", "\n".join(lines), QMessageBox.Warning)
+
+    def _register_unique_photo(self, path: Path) -> bool:
+        """Kopya fotoğrafları kredi harcanmadan önce işaretler."""
+        try:
+            match = self.duplicate_detector.add(path)
+        except OSError:
+            return True
+        if match is None:
+            return True
+        if match.exact:
+            return False
+        answer = show_styled_message(
+            self,
+            "Benzer Fotoğraf",
+            f"{path.name}, listedeki {match.original.name} ile neredeyse aynı görünüyor.\n"
+            "Yine de eklensin mi?",
+            QMessageBox.Question,
+            QMessageBox.Yes | QMessageBox.No,
+        )
+        if answer == QMessageBox.Yes:
+            self.duplicate_detector.force_add(path)
+            return True
+        return False
 
     def _select_output_folder(self):
         folder = QFileDialog.getExistingDirectory(self, "Çıkış klasörü seç")
@@ -211,15 +249,30 @@ class BatchProcessingPage(QWidget):
             jobs.append(PhotoJob(input_path=input_path, photo_type=photo_type, layout_type=layout_type, output_path=output_path))
 
         self._set_processing_state(True)
-        self.progress_label.setText(f"0/{len(jobs)} photos processed")
-        self.progress_label.setVisible(True)
 
-        self.batch_worker = BatchPhotoWorker(self.processor, jobs, self.user.uid)
-        self.batch_worker.progress.connect(self._update_batch_progress)
+        # Motor ayrı süreçte çalışır; takılan bir iş süre dolunca sonlandırılır ve kredisi iade edilir
+        # (BIYOVES_JOB_TIMEOUT=0 motoru yeniden bu süreçte çalıştırır)
+        self.batch_worker = BatchPhotoWorker(
+            self.processor,
+            jobs,
+            self.user.uid,
+            job_queue=self._open_job_queue(),
+            job_timeout=DEFAULT_JOB_TIMEOUT,
+        )
         self.batch_worker.completed.connect(self._on_batch_completed)
         self.batch_worker.credit_updated.connect(self.credits_updated.emit)
         self.batch_worker.credit_error.connect(self._on_batch_credit_error)
         self.batch_worker.start()
+        self.dashboard.start(self.batch_worker)
+
+    @staticmethod
+    def _open_job_queue() -> Optional[JobQueue]:
+        """İşler paylaşılan kuyruğa da yazılır; uygulama kapanırsa ``queue work`` kaldığı yerden sürdürür."""
+        try:
+            return JobQueue()
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("İş kuyruğu açılamadı, kuyruksuz devam ediliyor: %s", exc)
+            return None
 
     def _return_to_main_page(self):
         if self.batch_worker and self.batch_worker.isRunning():
@@ -227,7 +280,7 @@ class BatchProcessingPage(QWidget):
             return
         self.return_to_main.emit()
 
-    def _create_photo_row(self, file_path: str):
+    def _create_photo_row(self, file_path: str) -> bool:
         row_frame = QFrame()
         row_frame.setStyleSheet(f"""
             QFrame {{
@@ -245,13 +298,13 @@ class BatchProcessingPage(QWidget):
         )
         row_layout.setSpacing(modern_theme.SPACING_MD)
 
-        thumb = PreviewLabel("Önizleme")
+        thumb = PreviewLabel("Önizleme", max_source_dimension=192)
         thumb.setFixedSize(96, 96)
         thumb.setSizePolicy(QSizePolicy.Fixed, QSizePolicy.Fixed)
         if not thumb.set_image_from_path(file_path):
             show_styled_message(self, "Önizleme", f"{Path(file_path).name} yüklenemedi.", QMessageBox.Warning)
             row_frame.deleteLater()
-            return
+            return False
         row_layout.addWidget(thumb)
 
         info_widget = QWidget()
@@ -326,10 +379,12 @@ class BatchProcessingPage(QWidget):
 
         self.photo_entries.append(entry)
         self.photo_list_layout.addWidget(row_frame)
+        return True
 
     def _remove_photo(self, entry):
         if entry in self.photo_entries:
             self.photo_entries.remove(entry)
+            self.duplicate_detector.remove(Path(entry["path"]))
             entry["frame"].deleteLater()
             self._update_placeholder()
 
@@ -347,33 +402,32 @@ class BatchProcessingPage(QWidget):
         for btn in self.action_buttons:
             btn.setEnabled(not processing)
 
-    def _on_batch_completed(self, results, failures):
+    def _on_batch_completed(self, summary: BatchSummary):
         self._cleanup_batch_worker()
-        if failures:
-            summary_text = self._build_summary_text(results, failures)
+        if summary.unsuccessful:
+            summary_text = self._build_summary_text(summary)
             show_styled_message(self, "Toplu İşlem", summary_text)
         else:
             show_styled_message(self, "", "İşlem başarıyla tamamlandı.", QMessageBox.NoIcon)
         self._set_processing_state(False)
 
     def _cleanup_batch_worker(self):
+        self.dashboard.stop()
         if self.batch_worker:
             self.batch_worker.deleteLater()
             self.batch_worker = None
-        self.progress_label.setVisible(False)
-        self.progress_label.clear()
-
-    def _update_batch_progress(self, processed: int, total: int):
-        self.progress_label.setText(f"{processed}/{total} photos processed")
-
-    def _build_summary_text(self, results, failures) -> str:
-        summary_lines = [f"{len(results)} fotoğraf başarıyla işlendi."]
-        if failures:
-            summary_lines.append(f"{len(failures)} fotoğraf başarısız oldu:")
-            for failed_job, error in failures[:5]:
-                summary_lines.append(f"- {failed_job.input_path.name}: {error}")
-            if len(failures) > 5:
+
+    def _build_summary_text(self, summary: BatchSummary) -> str:
+        summary_lines = [f"{summary.succeeded} fotoğraf başarıyla işlendi."]
+        failed = summary.failed + summary.rejected
+        if failed:
+            summary_lines.append(f"{failed} fotoğraf başarısız oldu:")
+            for name, error in summary.failure_samples[:5]:
+                summary_lines.append(f"- {name}: {error}")
+            if failed > 5:
                 summary_lines.append("...")
+        if summary.skipped:
+            summary_lines.append(f"{summary.skipped} fotoğraf işlenmedi: {summary.stop_reason}")
         return "\n".join(summary_lines)
 
     def _on_batch_credit_error(self, message: str):
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+
+"""İşleme metriklerini gösteren tanılama penceresi"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import List, Optional
+
+from PySide6.QtCore import QTimer
+from PySide6.QtGui import QFont
+from PySide6.QtWidgets import QDialog, QFileDialog, QHBoxLayout, QMessageBox, QPlainTextEdit, QVBoxLayout, QWidget
+
+from app.config import modern_theme
+from app.metrics import metrics
+from app.ui.widgets import ModernButton, show_styled_message
+
+REFRESH_INTERVAL_MS = 1000
+
+
+class DiagnosticsDialog(QDialog):
+    """Aşama süreleri, kredi gidiş-dönüş süreleri ve sayaçların canlı özeti"""
+
+    def __init__(self, parent: Optional[QWidget] = None):
+        super().__init__(parent)
+        self.setWindowTitle("Tanılama")
+        self.setMinimumSize(640, 480)
+        self.setStyleSheet(f"background-color: {modern_theme.BACKGROUND};")
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(
+            modern_theme.SPACING_LG, modern_theme.SPACING_LG,
+            modern_theme.SPACING_LG, modern_theme.SPACING_LG
+        )
+        layout.setSpacing(modern_theme.SPACING_MD)
+
+        self.summary_view = QPlainTextEdit()
+        self.summary_view.setReadOnly(True)
+        self.summary_view.setFont(QFont("Consolas", modern_theme.FONT_SIZE_BODY_SMALL))
+        self.summary_view.setStyleSheet(f"""
+            QPlainTextEdit {{
+                background-color: {modern_theme.BACKGROUND_SECONDARY};
+                color: {modern_theme.TEXT_PRIMARY};
+                border: 1px solid {modern_theme.BORDER_LIGHT};
+                border-radius: {modern_theme.RADIUS_MD}px;
+            }}
+        """)
+        layout.addWidget(self.summary_view, 1)
+
+        button_row = QHBoxLayout()
+        button_row.setSpacing(modern_theme.SPACING_SM)
+        buttons = [
+            ("JSON Kaydet", lambda: self._export("json"), "secondary"),
+            ("Prometheus Kaydet", lambda: self._export("prom"), "secondary"),
+            ("Kapat", self.accept, "primary"),
+        ]
+        for text, handler, variant in buttons:
+            btn = ModernButton(text, variant=variant, size="sm")
+            btn.clicked.connect(handler)
+            button_row.addWidget(btn)
+        layout.addLayout(button_row)
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(REFRESH_INTERVAL_MS)
+        self._timer.timeout.connect(self._refresh)
+        self._timer.start()
+        self._refresh()
+
+    def _refresh(self) -> None:
+        self.summary_view.setPlainText(self._build_summary())
+
+    @staticmethod
+    def _build_summary() -> str:
+        snapshot = metrics.snapshot()
+        lines: List[str] = [f"Çalışma süresi: {snapshot['uptime_seconds']:.0f} sn", ""]
+        histograms = []
+        for name, data in snapshot["metrics"].items():
+            kind = data["type"]
+            if kind == "histogram":
+                histograms.append((name, data))
+            elif kind == "meter":
+                lines.append(f"{name}: toplam {data['total']}, {data['rate_per_second']:.2f}/sn (son 60 sn)")
+            else:
+                lines.append(f"{name}: {data['value']:g}")
+
+        if histograms:
+            lines.append("")
+            lines.append(f"{'Aşama':<28}{'adet':>8}{'ort (ms)':>12}{'p95 (ms)':>12}{'max (ms)':>12}")
+            for name, data in histograms:
+                lines.append(
+                    f"{name:<28}{data['count']:>8}{data['mean'] * 1000:>12.1f}"
+                    f"{data['p95'] * 1000:>12.1f}{data['max'] * 1000:>12.1f}"
+                )
+        return "\n".join(lines)
+
+    def _export(self, fmt: str) -> None:
+        if fmt == "json":
+            default_name, file_filter = "biyoves-metrics.json", "JSON (*.json)"
+        else:
+            default_name, file_filter = "biyoves-metrics.prom", "Prometheus (*.prom *.txt)"
+        file_path, _ = QFileDialog.getSaveFileName(self, "Metrikleri Kaydet", default_name, file_filter)
+        if not file_path:
+            return
+        try:
+            metrics.write_snapshot(Path(file_path))
+        except OSError as exc:
+            show_styled_message(self, "Tanılama", f"Kaydedilemedi: {exc}", QMessageBox.Warning)
@@ -732,10 +732,10 @@ class LoginWindow(QWidget):
         self.main_button.setEnabled(True)
         self.main_button.setText("Doğrula")
         
-        # Kullanıcıyı tekrar al (email doğrulandı)
+        # Kullanıcıyı tekrar al (email doğrulandı, bonus krediler eklendi)
         try:
-            user = firebase_auth.get_user_by_email(self.pending_email)
-            self.login_success.emit(user)
+            record = firebase_auth.get_user_by_email(self.pending_email)
+            self.login_success.emit(firebase_manager.get_user_profile(record.uid, record.email))
         except Exception as e:
             self._show_error("Kullanıcı bilgisi alınamadı")
 
@@ -5,14 +5,14 @@ from PySide6.QtWidgets import (
     QFrame, QScrollArea, QButtonGroup,
     QFileDialog, QMessageBox, QSizePolicy, QGridLayout, QDialog, QLineEdit, QStackedWidget
 )
-from PySide6.QtCore import Qt, Signal, QThread
-from PySide6.QtGui import QFont, QCloseEvent
+from PySide6.QtCore import Qt, Signal, QThread, QTimer
+from PySide6.QtGui import QFont, QCloseEvent, QKeySequence, QShortcut
 
 import webbrowser
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 
-from app.config import firebase_manager, modern_theme
+from app.config import UserProfile, firebase_manager, modern_theme
 from app.ui.widgets import (
     ModernButton,
     ModernCard,
@@ -21,13 +21,17 @@ from app.ui.widgets import (
     show_styled_message
 )
 from app.ui.batch_window import BatchProcessingPage
+from app.ui.diagnostics_window import DiagnosticsDialog
 from app.services.photo_processor import PhotoProcessor, PhotoJob
-from app.services.processing_workers import SinglePhotoWorker
+from app.services.processing_workers import SinglePhotoWorker, SpeculativeWorker
 from app.utils.file_validation import validate_image_file
-from app.logger import logger
 from app.ui.components import WelcomeInfo
 
 
+SPECULATION_DELAY_MS = 400
+SPECULATION_SHUTDOWN_WAIT_MS = 10000
+
+
 class CodeInputDialog(QDialog):
     """Kod girişi için özel dialog"""
 
@@ -129,32 +133,28 @@ class MainWindow(QMainWindow):
     close_signal = Signal()
     logout_signal = Signal()
     
-    def __init__(self, user):
+    def __init__(self, user: UserProfile):
         super().__init__()
         self.user = user
-        self.user_credits = 0
+        # Krediler giriş ya da oturum yüklemesinde okunan profilden gelir
+        self.user_credits = user.credits
         self.input_path: Optional[str] = None
         self.photo_type = "biyometrik"
         self.layout_type = "2li"
         self.photo_processor = PhotoProcessor()
         self.output_dir: Optional[Path] = None
         self.single_worker: Optional[SinglePhotoWorker] = None
+        self._speculative_workers: List[SpeculativeWorker] = []
+        # Seçenekler art arda değiştirilirken her tıklamada motor başlatılmaz
+        self._speculation_timer = QTimer(self)
+        self._speculation_timer.setSingleShot(True)
+        self._speculation_timer.setInterval(SPECULATION_DELAY_MS)
+        self._speculation_timer.timeout.connect(self._start_speculation)
         self.single_controls_enabled = True
         self._credit_code_thread: Optional[CreditCodeThread] = None
         
-        # Kullanıcı kredilerini al
-        self._load_user_credits()
-        
         self._setup_ui()
     
-    def _load_user_credits(self):
-        """Kullanıcı kredilerini yükle"""
-        try:
-            self.user_credits = firebase_manager.get_user_credits(self.user.uid)
-        except Exception as e:
-            logger.exception("Kredi yükleme hatası: %s", e)
-            self.user_credits = 0
-    
     def _setup_ui(self):
         self.setWindowTitle("BiyoVes")
         self.setMinimumSize(modern_theme.WINDOW_MIN_WIDTH, modern_theme.WINDOW_MIN_HEIGHT)
@@ -199,6 +199,10 @@ class MainWindow(QMainWindow):
         self.page_stack.addWidget(self.batch_page)
 
         self.page_stack.setCurrentWidget(self.main_page)
+
+        # Tanılama paneli yalnızca kısayolla açılır
+        self.diagnostics_shortcut = QShortcut(QKeySequence("Ctrl+Shift+D"), self)
+        self.diagnostics_shortcut.activated.connect(self._show_diagnostics)
     
     def _center_window(self):
         """Pencereyi ekranın ortasına yerleştirir"""
@@ -559,10 +563,12 @@ class MainWindow(QMainWindow):
     def _on_photo_type_changed(self, value):
         """Fotoğraf tipi değiştiğinde"""
         self.photo_type = value
+        self._schedule_speculation()
     
     def _on_layout_type_changed(self, value):
         """Düzen tipi değiştiğinde"""
         self.layout_type = value
+        self._schedule_speculation()
     
     def _select_file(self):
         """Dosya seçme dialogu"""
@@ -585,6 +591,33 @@ class MainWindow(QMainWindow):
             if not self.preview_label.set_image_from_path(str(path)):
                 show_styled_message(self, "Önizleme", "Seçtiğiniz fotoğraf yüklenemedi.", QMessageBox.Warning)
             self._update_process_button_state()
+            self._start_speculation()
+
+    def _schedule_speculation(self):
+        if self.input_path:
+            self._speculation_timer.start()
+
+    def _start_speculation(self):
+        """Seçili fotoğrafı onay beklenirken kredisiz olarak arka planda işler."""
+        self._speculation_timer.stop()
+        # Önceki seçim için bekleyen iş artık kullanılmayacak
+        self.photo_processor.cancel_speculation()
+        if not self.input_path or self.user_credits <= 0:
+            return
+        job = PhotoJob(
+            input_path=Path(self.input_path),
+            photo_type=self.photo_type,
+            layout_type=self.layout_type,
+        )
+        worker = SpeculativeWorker(self.photo_processor, job)
+        worker.finished.connect(lambda w=worker: self._on_speculation_finished(w))
+        self._speculative_workers.append(worker)
+        worker.start()
+
+    def _on_speculation_finished(self, worker: SpeculativeWorker):
+        if worker in self._speculative_workers:
+            self._speculative_workers.remove(worker)
+        worker.deleteLater()
 
     def _select_output_dir(self):
         folder = QFileDialog.getExistingDirectory(self, "Çıkış klasörü seç")
@@ -649,6 +682,11 @@ class MainWindow(QMainWindow):
         dialog.input_field.returnPressed.connect(_start_redeem)
         dialog.exec()
     
+    def _show_diagnostics(self):
+        """İşleme metriklerini gösterir"""
+        dialog = DiagnosticsDialog(self)
+        dialog.exec()
+
     def _open_multi_process(self):
         """Çoklu işlem sayfasına geçiş"""
         self.page_stack.setCurrentWidget(self.batch_page)
@@ -686,6 +724,7 @@ class MainWindow(QMainWindow):
             output_path=self._build_single_output_path(Path(self.input_path))
         )
 
+        self._speculation_timer.stop()
         self._set_single_controls_enabled(False)
         self.single_progress_label.setText("0/1 photos processed")
         self.single_progress_label.setVisible(True)
@@ -762,5 +801,10 @@ class MainWindow(QMainWindow):
     
     def closeEvent(self, event: QCloseEvent):
         """Pencere kapatıldığında sinyal gönder"""
+        self._speculation_timer.stop()
+        self.photo_processor.cancel_speculation()
+        for worker in list(self._speculative_workers):
+            worker.wait(SPECULATION_SHUTDOWN_WAIT_MS)
+        self.photo_processor.close()
         self.close_signal.emit()
         event.accept()
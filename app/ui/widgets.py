@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 
+import weakref
 from typing import Optional
 
 from PySide6.QtWidgets import (
@@ -11,10 +12,11 @@ from PySide6.QtWidgets import (
     QWidget,
     QMessageBox
 )
-from PySide6.QtCore import Qt
-from PySide6.QtGui import QFont, QPixmap
+from PySide6.QtCore import QObject, QSize, Qt, Signal
+from PySide6.QtGui import QFont, QImageReader, QPixmap
 
 from app.config import modern_theme
+from app.services.memory_governor import memory_governor
 
 
 class ModernButton(QPushButton):
@@ -201,37 +203,99 @@ class ChoiceButton(QPushButton):
         """)
 
 
+class _MemoryPressureRelay(QObject):
+    """Bellek yöneticisinin worker thread'inden gelen uyarıyı GUI thread'ine taşır."""
+
+    pressure = Signal()
+
+    def __init__(self):
+        super().__init__()
+        self.labels: "weakref.WeakSet[PreviewLabel]" = weakref.WeakSet()
+        # Sinyal, alıcı GUI thread'inde olduğundan kuyruklu bağlantıyla iletilir
+        self.pressure.connect(self._release_previews)
+        memory_governor.add_pressure_callback(self._emit_pressure)
+
+    def _emit_pressure(self):
+        self.pressure.emit()
+
+    def _release_previews(self):
+        for label in list(self.labels):
+            label.release_full_resolution()
+
+
+_pressure_relay: Optional[_MemoryPressureRelay] = None
+
+
 class PreviewLabel(QLabel):
     """Önizleme görüntüsünü boyuta göre ölçekleyen etiket."""
 
-    def __init__(self, placeholder_text="", parent=None):
+    def __init__(self, placeholder_text="", parent=None, max_source_dimension: Optional[int] = None):
         super().__init__(parent)
         self.placeholder_text = placeholder_text
+        self.max_source_dimension = max_source_dimension
         self._pixmap: Optional[QPixmap] = None
+        self._source_path: Optional[str] = None
+        self._reduced = False
         self.setAlignment(Qt.AlignCenter)
         if placeholder_text:
             self.setText(placeholder_text)
+        global _pressure_relay
+        if _pressure_relay is None:
+            _pressure_relay = _MemoryPressureRelay()
+        _pressure_relay.labels.add(self)
 
     def set_image_from_path(self, file_path: str) -> bool:
-        pixmap = QPixmap(file_path)
+        pixmap = self._load_pixmap(file_path)
         if pixmap.isNull():
             self.clear_image("Görsel yüklenemedi")
             return False
         self._pixmap = pixmap
+        self._source_path = file_path
+        self._reduced = False
         self._update_scaled_pixmap()
         self.setText("")
         return True
 
     def clear_image(self, placeholder: str | None = None):
         self._pixmap = None
+        self._source_path = None
+        self._reduced = False
         self.setPixmap(QPixmap())
         self.setText(placeholder or self.placeholder_text)
 
+    def release_full_resolution(self):
+        """Yalnızca ekrandaki ölçekli görüntüyü tutar; büyütülürse dosyadan yeniden yüklenir."""
+        if self._pixmap is None or self._reduced or not self._source_path:
+            return
+        shown = self.pixmap()
+        if shown is None or shown.isNull() or shown.width() >= self._pixmap.width():
+            return
+        self._pixmap = shown
+        self._reduced = True
+
     def resizeEvent(self, event):
         super().resizeEvent(event)
         if self._pixmap is not None and not self._pixmap.isNull():
+            if self._reduced and self._source_path and self._needs_more_pixels():
+                self._pixmap = self._load_pixmap(self._source_path)
+                self._reduced = False
             self._update_scaled_pixmap()
 
+    def _needs_more_pixels(self) -> bool:
+        return self.width() > self._pixmap.width() and self.height() > self._pixmap.height()
+
+    def _load_pixmap(self, file_path: str) -> QPixmap:
+        if not self.max_source_dimension:
+            return QPixmap(file_path)
+        # Küçük önizlemeler için görüntü, tam boyutta çözülmeden okunurken küçültülür
+        reader = QImageReader(file_path)
+        size = reader.size()
+        limit = self.max_source_dimension
+        if size.isValid() and max(size.width(), size.height()) > limit:
+            reader.setScaledSize(size.scaled(QSize(limit, limit), Qt.KeepAspectRatio))
+        image = reader.read()
+        return QPixmap.fromImage(image) if not image.isNull() else QPixmap()
+
     def _update_scaled_pixmap(self):
         if not self._pixmap:
             return
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+
+"""Duplicate photo detection for batch ingestion."""
+
+from __future__ import annotations
+
+import hashlib
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from PIL import Image
+except ImportError:  # pragma: no cover - Pillow is optional
+    Image = None
+
+PREFILTER_CHUNK_SIZE = 64 * 1024
+FULL_HASH_CHUNK_SIZE = 1024 * 1024
+PERCEPTUAL_HASH_SIZE = 8
+PERCEPTUAL_HASH_THRESHOLD = 4
+
+
+@dataclass
+class _Fingerprint:
+    path: Path
+    size: int
+    partial_hash: str
+    full_hash: Optional[str] = None
+    perceptual_hash: Optional[int] = None
+
+
+@dataclass
+class DuplicateMatch:
+    """Result of a duplicate lookup."""
+
+    path: Path
+    original: Path
+    exact: bool
+
+
+def _partial_hash(path: Path, size: int) -> str:
+    """Hash the head and tail of a file; cheap enough for every ingest."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as handle:
+        digest.update(handle.read(PREFILTER_CHUNK_SIZE))
+        if size > PREFILTER_CHUNK_SIZE * 2:
+            handle.seek(-PREFILTER_CHUNK_SIZE, os.SEEK_END)
+            digest.update(handle.read(PREFILTER_CHUNK_SIZE))
+    return digest.hexdigest()
+
+
+def _full_hash(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(FULL_HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def perceptual_hash(path: Path) -> Optional[int]:
+    """64-bit difference hash (dHash).
+
+    Returns None when Pillow is unavailable or the file cannot be decoded
+    (truncated data, bad headers, decompression bombs); such files are
+    simply not matched perceptually.
+    """
+    if Image is None:
+        return None
+    try:
+        with Image.open(path) as image:
+            # Reduced-scale JPEG decode keeps hashing cheap for large photos
+            image.draft("L", (PERCEPTUAL_HASH_SIZE * 16, PERCEPTUAL_HASH_SIZE * 16))
+            small = image.convert("L").resize(
+                (PERCEPTUAL_HASH_SIZE + 1, PERCEPTUAL_HASH_SIZE),
+                Image.BILINEAR,
+            )
+            pixels = list(small.getdata())
+    except Exception:  # noqa: BLE001
+        return None
+
+    value = 0
+    width = PERCEPTUAL_HASH_SIZE + 1
+    for row in range(PERCEPTUAL_HASH_SIZE):
+        offset = row * width
+        for col in range(PERCEPTUAL_HASH_SIZE):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+class DuplicateDetector:
+    """Index of ingested photos that flags byte-identical and re-encoded copies.
+
+    Files are first bucketed by size and a head/tail hash; the full content
+    hash is only computed when two files land in the same bucket.
+    """
+
+    def __init__(self, use_perceptual_hash: bool = False, perceptual_threshold: int = PERCEPTUAL_HASH_THRESHOLD):
+        self.use_perceptual_hash = use_perceptual_hash and Image is not None
+        self.perceptual_threshold = perceptual_threshold
+        self._buckets: Dict[Tuple[int, str], List[_Fingerprint]] = {}
+        self._by_path: Dict[Path, _Fingerprint] = {}
+
+    def __len__(self) -> int:
+        return len(self._by_path)
+
+    def add(self, path: Path) -> Optional[DuplicateMatch]:
+        """Register ``path`` unless it duplicates an indexed photo.
+
+        Exact duplicates are never registered. Perceptual matches are returned
+        but not registered either; call ``force_add`` to keep them anyway.
+        """
+        fingerprint = self._fingerprint(path)
+        match = self._find_match(fingerprint)
+        if match is None:
+            self._register(fingerprint)
+        return match
+
+    def force_add(self, path: Path) -> None:
+        self._register(self._fingerprint(path))
+
+    def remove(self, path: Path) -> None:
+        key_path = self._key(path)
+        fingerprint = self._by_path.pop(key_path, None)
+        if fingerprint is None:
+            return
+        bucket_key = (fingerprint.size, fingerprint.partial_hash)
+        bucket = self._buckets.get(bucket_key, [])
+        if fingerprint in bucket:
+            bucket.remove(fingerprint)
+        if not bucket:
+            self._buckets.pop(bucket_key, None)
+
+    def clear(self) -> None:
+        self._buckets.clear()
+        self._by_path.clear()
+
+    @staticmethod
+    def _key(path: Path) -> Path:
+        try:
+            return Path(path).resolve()
+        except OSError:
+            return Path(path).absolute()
+
+    def _fingerprint(self, path: Path) -> _Fingerprint:
+        key_path = self._key(path)
+        size = key_path.stat().st_size
+        fingerprint = _Fingerprint(path=key_path, size=size, partial_hash=_partial_hash(key_path, size))
+        if self.use_perceptual_hash:
+            fingerprint.perceptual_hash = perceptual_hash(key_path)
+        return fingerprint
+
+    def _register(self, fingerprint: _Fingerprint) -> None:
+        if fingerprint.path in self._by_path:
+            return
+        self._buckets.setdefault((fingerprint.size, fingerprint.partial_hash), []).append(fingerprint)
+        self._by_path[fingerprint.path] = fingerprint
+
+    def _find_match(self, fingerprint: _Fingerprint) -> Optional[DuplicateMatch]:
+        existing = self._by_path.get(fingerprint.path)
+        if existing is not None:
+            return DuplicateMatch(path=fingerprint.path, original=existing.path, exact=True)
+
+        for candidate in self._buckets.get((fingerprint.size, fingerprint.partial_hash), []):
+            if fingerprint.full_hash is None:
+                fingerprint.full_hash = _full_hash(fingerprint.path)
+            if candidate.full_hash is None:
+                candidate.full_hash = _full_hash(candidate.path)
+            if candidate.full_hash == fingerprint.full_hash:
+                return DuplicateMatch(path=fingerprint.path, original=candidate.path, exact=True)
+
+        if fingerprint.perceptual_hash is None:
+            return None
+        for candidate in self._by_path.values():
+            if candidate.perceptual_hash is None:
+                continue
+            distance = bin(candidate.perceptual_hash ^ fingerprint.perceptual_hash).count("1")
+            if distance <= self.perceptual_threshold:
+                return DuplicateMatch(path=fingerprint.path, original=candidate.path, exact=False)
+        return None
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+
+"""Single-flight request coalescing with a short TTL cache."""
+
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, Generic, Hashable, Tuple, TypeVar
+
+from app.metrics import metrics
+
+T = TypeVar("T")
+
+
+class SingleFlightCache(Generic[T]):
+    """Coalesces concurrent loads of the same key and caches results briefly.
+
+    The first caller for a key runs the loader; callers arriving while it
+    is in flight wait for and share its result (or exception). Successful
+    results are kept for ``ttl_seconds``. ``invalidate`` drops the cached
+    value and detaches any in-flight load, so a read that started before a
+    write can never repopulate the cache with the pre-write value.
+    """
+
+    def __init__(self, name: str, ttl_seconds: float):
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._values: Dict[Hashable, Tuple[float, T]] = {}
+        self._in_flight: Dict[Hashable, Future] = {}
+
+    def get(self, key: Hashable, loader: Callable[[], T]) -> T:
+        with self._lock:
+            cached = self._values.get(key)
+            if cached is not None and time.monotonic() - cached[0] < self.ttl_seconds:
+                hit = True
+            else:
+                hit = False
+                future = self._in_flight.get(key)
+                leader = future is None
+                if leader:
+                    future = self._in_flight[key] = Future()
+        if hit:
+            metrics.counter(f"{self.name}_cache_hits_total", "Reads served from the TTL cache").inc()
+            return cached[1]
+        if not leader:
+            metrics.counter(f"{self.name}_coalesced_total", "Reads that joined an in-flight request").inc()
+            return future.result()
+
+        try:
+            value = loader()
+        except BaseException as exc:
+            with self._lock:
+                if self._in_flight.get(key) is future:
+                    del self._in_flight[key]
+            future.set_exception(exc)
+            raise
+        with self._lock:
+            # Invalidated while loading: hand the value to waiters but do not cache it
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+                self._values[key] = (time.monotonic(), value)
+        future.set_result(value)
+        return value
+
+    def put(self, key: Hashable, value: T) -> None:
+        """Seed the cache with a value the caller just read authoritatively."""
+        with self._lock:
+            self._in_flight.pop(key, None)
+            self._values[key] = (time.monotonic(), value)
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._values.pop(key, None)
+            self._in_flight.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+            self._in_flight.clear()
@@ -3,15 +3,16 @@
 import os
 import sys
 import json
+import multiprocessing
 from pathlib import Path
 
 from PySide6.QtWidgets import QApplication
 import firebase_admin
-from firebase_admin import auth as firebase_auth
 
 from app.ui.login_window import LoginWindow
 from app.ui.main_window import MainWindow
 from app.config import firebase_manager
+from app.metrics import start_exporter_from_env
 
 
 def initialize_firebase():
@@ -118,8 +119,8 @@ class BiyoVesApp:
             uid = data.get("uid")
             if not uid:
                 return None
-            user = firebase_auth.get_user(uid)
-            return user
+            # Profil kredilerle birlikte gelir; ana ekran belgeyi yeniden okumaz
+            return firebase_manager.get_user_profile(uid)
         except Exception as exc:
             print(f"Oturum yüklenemedi: {exc}")
             self._clear_session()
@@ -134,7 +135,10 @@ class BiyoVesApp:
 
 
 if __name__ == "__main__":
+    # Donmuş (PyInstaller) uygulamada motor alt süreçleri için gerekli
+    multiprocessing.freeze_support()
     try:
+        start_exporter_from_env()
         initialize_firebase()
         app = BiyoVesApp()
         app.run()
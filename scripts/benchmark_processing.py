@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+
+"""PhotoProcessor performans ölçümü.
+
+Her fotoğraf tipi × sayfa düzeni × çözünürlük için sabit bir sentetik yüz
+kümesini (isteğe bağlı olarak gerçek örneklerle birlikte) işler; görüntü
+başına gecikme, verim, en yüksek bellek (RSS) ve çıktı boyutunu raporlar.
+Sonuçlar JSON olarak kaydedilir ve önceki bir taban çizgisiyle
+karşılaştırılabilir; eşik aşılırsa çıkış kodu 1 olur.
+
+Örnek::
+
+    python scripts/benchmark_processing.py --save-baseline bench/baseline.json
+    python scripts/benchmark_processing.py --baseline bench/baseline.json --threshold 0.15
+    python scripts/benchmark_processing.py --quick --samples ./ornek_yuzler
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+PHOTO_TYPES = ("biyometrik", "vesikalik", "abd_vizesi", "schengen")
+LAYOUTS = ("2li", "4lu")
+DEFAULT_RESOLUTIONS = ("1200x1600", "3000x4000", "6000x8000")
+CORPUS_SEED = 20240601
+# Gecikme ve bellek için karşılaştırılan alanlar; verim ters yönde değerlendirilir
+COMPARED_METRICS = ("p50_ms", "p95_ms", "peak_rss_mb", "output_bytes")
+
+
+def _parse_resolution(value: str) -> Tuple[int, int]:
+    width, _, height = value.lower().partition("x")
+    return int(width), int(height)
+
+
+def generate_synthetic_face(path: Path, size: Tuple[int, int], seed: int) -> None:
+    """Deterministik, kabaca portre düzeninde bir yüz görüntüsü üretir."""
+    from PIL import Image, ImageDraw, ImageFilter
+
+    rng = random.Random(seed)
+    width, height = size
+    background = tuple(rng.randint(200, 245) for _ in range(3))
+    image = Image.new("RGB", size, background)
+    draw = ImageDraw.Draw(image)
+
+    cx, cy = width // 2, int(height * 0.45)
+    face_w, face_h = int(width * 0.36), int(height * 0.34)
+    skin = (rng.randint(180, 235), rng.randint(140, 190), rng.randint(110, 160))
+    hair = tuple(rng.randint(20, 90) for _ in range(3))
+    shirt = tuple(rng.randint(30, 200) for _ in range(3))
+
+    draw.ellipse((cx - face_w // 2 - width // 30, cy - face_h // 2 - height // 18,
+                  cx + face_w // 2 + width // 30, cy + face_h // 4), fill=hair)
+    draw.rectangle((cx - face_w // 5, cy + face_h // 3, cx + face_w // 5, int(height * 0.82)), fill=skin)
+    draw.ellipse((int(width * 0.12), int(height * 0.78), int(width * 0.88), int(height * 1.3)), fill=shirt)
+    draw.ellipse((cx - face_w // 2, cy - face_h // 2, cx + face_w // 2, cy + face_h // 2), fill=skin)
+
+    eye_y = cy - face_h // 10
+    eye_dx, eye_r = face_w // 5, max(2, face_w // 18)
+    for ex in (cx - eye_dx, cx + eye_dx):
+        draw.ellipse((ex - eye_r * 2, eye_y - eye_r, ex + eye_r * 2, eye_y + eye_r), fill=(250, 250, 250))
+        draw.ellipse((ex - eye_r, eye_y - eye_r, ex + eye_r, eye_y + eye_r), fill=(60, 40, 30))
+    draw.polygon([(cx, eye_y + face_h // 12), (cx - face_w // 16, cy + face_h // 8), (cx + face_w // 16, cy + face_h // 8)],
+                 fill=tuple(max(0, c - 25) for c in skin))
+    mouth_y = cy + face_h // 4
+    draw.arc((cx - face_w // 6, mouth_y - face_h // 16, cx + face_w // 6, mouth_y + face_h // 16), 10, 170,
+             fill=(150, 60, 60), width=max(2, face_w // 60))
+
+    # Sensör gürültüsü ve hafif bulanıklık, JPEG boyutunu gerçekçi tutar
+    noise = Image.effect_noise(size, 12).convert("RGB")
+    image = Image.blend(image, noise, 0.06).filter(ImageFilter.GaussianBlur(radius=max(1, width // 1500)))
+    image.save(path, "JPEG", quality=92)
+
+
+def build_corpus(corpus_dir: Path, resolutions: Sequence[str], faces_per_resolution: int,
+                 samples_dir: Optional[Path]) -> List[Tuple[str, Path]]:
+    """Sentetik yüzleri (gerekirse) üretir ve ``(etiket, yol)`` listesini döndürür."""
+    corpus_dir.mkdir(parents=True, exist_ok=True)
+    corpus: List[Tuple[str, Path]] = []
+    for resolution in resolutions:
+        size = _parse_resolution(resolution)
+        for index in range(faces_per_resolution):
+            path = corpus_dir / f"synthetic_{resolution}_{index}.jpg"
+            if not path.exists():
+                generate_synthetic_face(path, size, CORPUS_SEED + index)
+            corpus.append((f"synthetic-{resolution}", path))
+    if samples_dir is not None:
+        for path in sorted(samples_dir.iterdir()):
+            if path.suffix.lower() in {".jpg", ".jpeg", ".png", ".bmp"}:
+                corpus.append((f"sample-{path.stem}", path))
+    return corpus
+
+
+def _peak_rss_mb() -> Optional[float]:
+    try:
+        import resource
+    except ImportError:
+        try:
+            import psutil
+        except ImportError:
+            return None
+        info = psutil.Process().memory_info()
+        return round(getattr(info, "peak_wset", info.rss) / (1024 * 1024), 1)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux kB, macOS bayt döndürür
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(peak / divisor, 1)
+
+
+def _run_case(inputs: List[str], photo_type: str, layout: str, repeat: int, warmup: int, output_dir: str) -> Dict[str, Any]:
+    """Ayrı süreçte çalışır; böylece en yüksek RSS yalnızca bu duruma aittir."""
+    from app.services.photo_processor import PhotoJob, PhotoProcessor
+
+    processor = PhotoProcessor(Path(output_dir))
+    latencies: List[float] = []
+    output_sizes: List[int] = []
+    try:
+        for input_path in inputs:
+            for iteration in range(warmup + repeat):
+                job = PhotoJob(Path(input_path), photo_type, layout)
+                started = time.perf_counter()
+                result = processor.process_single(job)
+                elapsed = time.perf_counter() - started
+                output_path = Path(result.output_path)
+                if iteration >= warmup:
+                    latencies.append(elapsed)
+                    output_sizes.append(output_path.stat().st_size)
+                output_path.unlink(missing_ok=True)
+    finally:
+        processor.close()
+    return {"latencies": latencies, "output_sizes": output_sizes, "peak_rss_mb": _peak_rss_mb()}
+
+
+def _run_batch_case(inputs: List[str], photo_type: str, layout: str, output_dir: str) -> Dict[str, Any]:
+    from app.services.photo_processor import PhotoJob, PhotoProcessor
+
+    processor = PhotoProcessor(Path(output_dir))
+    jobs = [PhotoJob(Path(path), photo_type, layout) for path in inputs]
+    try:
+        started = time.perf_counter()
+        results, failures = processor.process_batch(jobs)
+        elapsed = time.perf_counter() - started
+    finally:
+        processor.close()
+    return {"elapsed": elapsed, "succeeded": len(results), "failed": len(failures), "peak_rss_mb": _peak_rss_mb()}
+
+
+def _percentile(values: Sequence[float], q: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _summarize(raw: Dict[str, Any]) -> Dict[str, Any]:
+    latencies = raw["latencies"]
+    return {
+        "images": len(latencies),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 2),
+        "p50_ms": round(_percentile(latencies, 0.5) * 1000, 2),
+        "p95_ms": round(_percentile(latencies, 0.95) * 1000, 2),
+        "throughput_per_s": round(len(latencies) / sum(latencies), 3) if sum(latencies) else 0.0,
+        "peak_rss_mb": raw["peak_rss_mb"],
+        "output_bytes": int(statistics.fmean(raw["output_sizes"])) if raw["output_sizes"] else 0,
+    }
+
+
+def _environment() -> Dict[str, Any]:
+    try:
+        from importlib.metadata import version
+        engine_version = version("biyoves")
+    except Exception:  # noqa: BLE001
+        engine_version = "unknown"
+    return {
+        "biyoves": engine_version,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def run_benchmarks(args: argparse.Namespace) -> Dict[str, Any]:
+    corpus_dir = Path(args.corpus_dir) if args.corpus_dir else Path(tempfile.gettempdir()) / "biyoves-bench-corpus"
+    samples_dir = Path(args.samples) if args.samples else None
+    corpus = build_corpus(corpus_dir, args.resolutions, args.faces, samples_dir)
+    groups: Dict[str, List[str]] = {}
+    for label, path in corpus:
+        groups.setdefault(label, []).append(str(path))
+
+    photo_types = args.photo_types or (PHOTO_TYPES[:1] if args.quick else PHOTO_TYPES)
+    layouts = args.layouts or (LAYOUTS[:1] if args.quick else LAYOUTS)
+    output_dir = Path(tempfile.mkdtemp(prefix="biyoves-bench-out-"))
+    context = multiprocessing.get_context("spawn")
+    cases: Dict[str, Any] = {}
+    try:
+        for label, inputs in groups.items():
+            for photo_type in photo_types:
+                for layout in layouts:
+                    key = f"{photo_type}/{layout}/{label}"
+                    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                        raw = executor.submit(_run_case, inputs, photo_type, layout, args.repeat, args.warmup,
+                                              str(output_dir)).result()
+                    cases[key] = _summarize(raw)
+                    _print_case(key, cases[key])
+
+        batch_inputs = [str(path) for _, path in corpus]
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            raw = executor.submit(_run_batch_case, batch_inputs, photo_types[0], layouts[0], str(output_dir)).result()
+        cases["batch/all"] = {
+            "images": raw["succeeded"],
+            "failed": raw["failed"],
+            "elapsed_s": round(raw["elapsed"], 3),
+            "throughput_per_s": round(raw["succeeded"] / raw["elapsed"], 3) if raw["elapsed"] else 0.0,
+            "peak_rss_mb": raw["peak_rss_mb"],
+        }
+        _print_case("batch/all", cases["batch/all"])
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+    return {"environment": _environment(), "cases": cases}
+
+
+def _print_case(key: str, summary: Dict[str, Any]) -> None:
+    parts = [f"{name}={value}" for name, value in summary.items()]
+    print(f"{key:<44} " + "  ".join(parts), flush=True)
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Eşiği aşan gerilemeleri okunabilir satırlar olarak döndürür."""
+    regressions: List[str] = []
+    for key, base in baseline.get("cases", {}).items():
+        now = current["cases"].get(key)
+        if now is None:
+            continue
+        for metric in COMPARED_METRICS:
+            old, new = base.get(metric), now.get(metric)
+            if not old or new is None:
+                continue
+            if new > old * (1 + threshold):
+                regressions.append(f"{key} {metric}: {old} -> {new} (+{(new / old - 1) * 100:.1f}%)")
+        old, new = base.get("throughput_per_s"), now.get("throughput_per_s")
+        if old and new is not None and new < old * (1 - threshold):
+            regressions.append(f"{key} throughput_per_s: {old} -> {new} ({(new / old - 1) * 100:.1f}%)")
+    return regressions
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="BiyoVes işleme performans ölçümü")
+    parser.add_argument("--resolutions", nargs="+", default=list(DEFAULT_RESOLUTIONS), help="GENxYUK listesi")
+    parser.add_argument("--faces", type=int, default=2, help="Çözünürlük başına sentetik yüz sayısı")
+    parser.add_argument("--samples", help="Ek gerçek yüz örneklerinin bulunduğu dizin")
+    parser.add_argument("--corpus-dir", help="Sentetik kümenin önbelleğe alınacağı dizin")
+    parser.add_argument("--photo-types", nargs="+", help="Yalnızca bu fotoğraf tiplerini ölç")
+    parser.add_argument("--layouts", nargs="+", help="Yalnızca bu düzenleri ölç")
+    parser.add_argument("--repeat", type=int, default=3, help="Görüntü başına ölçülen tekrar")
+    parser.add_argument("--warmup", type=int, default=1, help="Ölçüme katılmayan ısınma turu")
+    parser.add_argument("--quick", action="store_true", help="Tek tip ve tek düzenle hızlı tur")
+    parser.add_argument("--output", help="Sonuçların yazılacağı JSON dosyası")
+    parser.add_argument("--baseline", help="Karşılaştırılacak taban çizgisi JSON dosyası")
+    parser.add_argument("--save-baseline", help="Sonuçları taban çizgisi olarak kaydet")
+    parser.add_argument("--threshold", type=float, default=0.15, help="İzin verilen gerileme oranı (0.15 = %%15)")
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    report = run_benchmarks(args)
+
+    for target in (args.output, args.save_baseline):
+        if target:
+            Path(target).parent.mkdir(parents=True, exist_ok=True)
+            Path(target).write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} gerileme (eşik %{args.threshold * 100:.0f}):")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"\nTaban çizgisine göre gerileme yok (eşik %{args.threshold * 100:.0f}).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())